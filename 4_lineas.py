@@ -1,7 +1,14 @@
 import pygame
 import sys
-import random
 import os
+import math
+
+import assets
+import game_host
+import game_loop
+import libro_4_lineas
+import motor_4_lineas
+import text_cache
 
 pygame.init()
 
@@ -10,8 +17,7 @@ SQUARE_SIZE = 100
 RADIUS = SQUARE_SIZE // 2 - 5
 
 WIDTH, HEIGHT = COLS * SQUARE_SIZE, (ROWS+1) * SQUARE_SIZE
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("4 en Línea Animado")
+SCREEN = None  # la ventana la entrega run()
 
 BLUE = (0, 0, 255)
 BLACK = (0, 0, 0)
@@ -22,13 +28,17 @@ GRAY  = (180, 180, 180)
 FPS = 60
 clock = pygame.time.Clock()
 
+# La CPU "piensa" al menos este tiempo (ms) aunque el motor termine antes, para que se vea el turno
+TIEMPO_MINIMO_CPU = 1000
+# Aceleración de las fichas al caer (px/s²): de arriba hasta el fondo tarda ~0.45 s
+GRAVEDAD = 6000
+
 # Cargar imágenes
 def cargar_imagen(nombre_archivo):
     """Intenta cargar una imagen, si falla devuelve None"""
     try:
         ruta = os.path.join("image", nombre_archivo)
-        imagen = pygame.image.load(ruta)
-        return pygame.transform.scale(imagen, (WIDTH, HEIGHT))
+        return assets.cargar(ruta, (WIDTH, HEIGHT), alpha=False)
     except:
         return None
 
@@ -44,20 +54,20 @@ IMG_EMPATE = cargar_imagen("empate_4_lineas.png")
 def create_board():
     return [[0 for _ in range(COLS)] for _ in range(ROWS)]
 
-def draw_board(board):
+def render_board(board):
+    """Dibuja fondo, tablero y fichas en una superficie (se rehace solo cuando cae una ficha)"""
+    superficie = pygame.Surface((WIDTH, HEIGHT))
+    superficie.fill(BLACK)
     for c in range(COLS):
         for r in range(ROWS):
-            pygame.draw.rect(SCREEN, BLUE, (c*SQUARE_SIZE, (r+1)*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+            pygame.draw.rect(superficie, BLUE, (c*SQUARE_SIZE, (r+1)*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
             color = BLACK
             if board[r][c] == 1:
                 color = RED
             elif board[r][c] == 2:
                 color = YELLOW
-            pygame.draw.circle(SCREEN, color, (c*SQUARE_SIZE + SQUARE_SIZE//2, (r+1)*SQUARE_SIZE + SQUARE_SIZE//2), RADIUS)
-    pygame.display.update()
-
-def is_valid_location(board, col):
-    return board[0][col] == 0
+            pygame.draw.circle(superficie, color, (c*SQUARE_SIZE + SQUARE_SIZE//2, (r+1)*SQUARE_SIZE + SQUARE_SIZE//2), RADIUS)
+    return superficie
 
 def get_next_open_row(board, col):
     for r in range(ROWS-1, -1, -1):
@@ -65,47 +75,25 @@ def get_next_open_row(board, col):
             return r
     return -1
 
-def drop_piece_animated(board, col, piece):
-    """Hace que la ficha caiga animada hasta su posición final."""
-    target_row = get_next_open_row(board, col)
-    x = col * SQUARE_SIZE + SQUARE_SIZE//2
-    y = SQUARE_SIZE//2
-    color = RED if piece == 1 else YELLOW
-    while y < (target_row+1)*SQUARE_SIZE + SQUARE_SIZE//2:
-        SCREEN.fill(BLACK)
-        draw_board(board)
-        pygame.draw.circle(SCREEN, color, (x, int(y)), RADIUS)
-        pygame.display.update()
-        y += 20  
-        clock.tick(FPS)
-    board[target_row][col] = piece
+def nueva_caida(board, col, piece):
+    """Ficha que empieza a caer en `col`; el bucle principal la mueve con avanzar_caida()"""
+    fila = get_next_open_row(board, col)
+    y_inicio = SQUARE_SIZE // 2
+    y_fin = (fila + 1) * SQUARE_SIZE + SQUARE_SIZE // 2
+    return {"col": col, "fila": fila, "pieza": piece, "t": 0.0, "y_inicio": y_inicio, "y_fin": y_fin,
+            "duracion": math.sqrt(2 * (y_fin - y_inicio) / GRAVEDAD)}
 
-def winning_move(board, piece):
-    # Horizontal
-    for r in range(ROWS):
-        for c in range(COLS-3):
-            if all(board[r][c+i] == piece for i in range(4)):
-                return True
-    # Vertical
-    for c in range(COLS):
-        for r in range(ROWS-3):
-            if all(board[r+i][c] == piece for i in range(4)):
-                return True
-    # Diagonal positiva
-    for r in range(3, ROWS):
-        for c in range(COLS-3):
-            if all(board[r-i][c+i] == piece for i in range(4)):
-                return True
-    # Diagonal negativa
-    for r in range(ROWS-3):
-        for c in range(COLS-3):
-            if all(board[r+i][c+i] == piece for i in range(4)):
-                return True
-    return False
+def avanzar_caida(caida, dt):
+    """Avanza la animación `dt` segundos; devuelve True cuando la ficha llegó a su lugar"""
+    caida["t"] = min(caida["t"] + dt, caida["duracion"])
+    return caida["t"] >= caida["duracion"]
 
-def is_board_full(board):
-    """Verifica si el tablero está lleno (empate)"""
-    return all(board[0][c] != 0 for c in range(COLS))
+def draw_caida(caida):
+    # Interpolación cuadrática (ease-in): la ficha cae acelerando, como con gravedad
+    progreso = caida["t"] / caida["duracion"] if caida["duracion"] else 1.0
+    y = caida["y_inicio"] + (caida["y_fin"] - caida["y_inicio"]) * progreso * progreso
+    color = RED if caida["pieza"] == 1 else YELLOW
+    pygame.draw.circle(SCREEN, color, (caida["col"] * SQUARE_SIZE + SQUARE_SIZE//2, int(y)), RADIUS)
 
 def menu_jugadores(screen):
     """Menú para seleccionar número de jugadores"""
@@ -114,7 +102,7 @@ def menu_jugadores(screen):
             screen.blit(IMG_MENU_ELECCION, (0, 0))
         else:
             screen.fill(BLACK)
-            font = pygame.font.SysFont(None, 40)
+            font = text_cache.fuente(40, sysfont=True)
             lines = [
                 "Elige número de jugadores:",
                 "1) 2 Jugadores",
@@ -122,12 +110,12 @@ def menu_jugadores(screen):
                 "Presiona 1 o 2"
             ]
             for i, line in enumerate(lines):
-                txt = font.render(line, True, GRAY)
+                txt = text_cache.render(font, line, GRAY)
                 screen.blit(txt, (40, 80 + i*50))
         
-        pygame.display.flip()
+        game_loop.flip()
         
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -146,7 +134,7 @@ def menu_dificultad(screen):
             screen.blit(IMG_MENU_DIFICULTAD, (0, 0))
         else:
             screen.fill(BLACK)
-            font = pygame.font.SysFont(None, 40)
+            font = text_cache.fuente(40, sysfont=True)
             lines = [
                 "Elige dificultad CPU:",
                 "1) Fácil",
@@ -155,12 +143,12 @@ def menu_dificultad(screen):
                 "Presiona 1, 2 o 3"
             ]
             for i, line in enumerate(lines):
-                txt = font.render(line, True, GRAY)
+                txt = text_cache.render(font, line, GRAY)
                 screen.blit(txt, (40, 80 + i*50))
         
-        pygame.display.flip()
+        game_loop.flip()
         
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -188,67 +176,88 @@ def mostrar_pantalla_victoria(screen, winner, players):
         screen.blit(imagen, (0, 0))
     else:
         screen.fill(BLACK)
-        font = pygame.font.SysFont(None, 50)
-        msg_txt = font.render(f"{winner} gana!", True, RED if winner=="Jugador 1" else YELLOW)
+        font = text_cache.fuente(50, sysfont=True)
+        msg_txt = text_cache.render(font, f"{winner} gana!", RED if winner=="Jugador 1" else YELLOW)
         screen.blit(msg_txt, (WIDTH//2 - msg_txt.get_width()//2, HEIGHT//2 - msg_txt.get_height()//2))
     
-    pygame.display.flip()
-    pygame.time.wait(3000)
+    game_loop.flip()
+    game_loop.esperar(3000)
 
 def run_game(screen, players=2, cpu_factor=0.5):
     board = create_board()
+    # Copia en bitboards del tablero: detecta el cuatro en línea sin recorrerlo y la usa la CPU
+    tablero = motor_4_lineas.Tablero()
+    # El libro de aperturas (python libro_4_lineas.py) se mapea en memoria, no se lee al arrancar
+    motor = motor_4_lineas.Motor(libro=libro_4_lineas.abrir())
+    fondo = render_board(board)
     game_over = False
     turn = 0
     winner = None
+    caida = None       # ficha que está cayendo (mientras tanto no se juega)
+    busqueda = None    # jugada de la CPU que se está buscando en otro hilo
+    inicio_cpu = 0
 
-    while True:
-        clock.tick(FPS)
-        SCREEN.fill(BLACK)
-        draw_board(board)
+    try:
+        while True:
+            dt = game_loop.tick(clock, FPS) / 1000.0
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                return  # Volver al menú principal
-            if event.type == pygame.MOUSEBUTTONDOWN and not game_over:
-                x_pos = event.pos[0]
-                col = x_pos // SQUARE_SIZE
-                if (players == 2) or (players==1 and turn==0):
-                    if is_valid_location(board, col):
-                        piece = 1 if turn==0 else 2
-                        drop_piece_animated(board, col, piece)
-                        if winning_move(board, piece):
-                            game_over = True
-                            winner = "Jugador 1" if piece==1 else ("CPU" if players==1 else "Jugador 2")
-                        elif is_board_full(board):
-                            game_over = True
-                            winner = "Empate"
-                        turn = (turn+1)%2
+            for event in game_loop.eventos():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    return  # Volver al menú principal
+                if event.type == pygame.MOUSEBUTTONDOWN and not game_over and caida is None:
+                    x_pos = event.pos[0]
+                    col = x_pos // SQUARE_SIZE
+                    if (players == 2) or (players==1 and turn==0):
+                        if tablero.puede_jugar(col):
+                            caida = nueva_caida(board, col, 1 if turn==0 else 2)
+            game_loop.fase("eventos")
 
-        # Turno de la CPU
-        if players==1 and turn==1 and not game_over:
-            pygame.time.delay(1000)  
-            valid_cols = [c for c in range(COLS) if is_valid_location(board,c)]
-            if valid_cols:
-                col = random.choice(valid_cols)
-                drop_piece_animated(board, col, 2)
-                if winning_move(board, 2):
+            # Turno de la CPU: el motor busca en otro hilo y la jugada se suelta cuando termina.
+            # Grabando o en un replay la búsqueda va por nodos y la jugada se suelta siempre
+            # al cumplirse TIEMPO_MINIMO_CPU (esperando al hilo si hace falta), así el frame
+            # no depende de cuánto tardó el hilo.
+            if players==1 and turn==1 and not game_over and caida is None:
+                determinista = game_loop.simulando() or game_loop.grabando()
+                if busqueda is None:
+                    busqueda = motor_4_lineas.BusquedaEnHilo(motor, tablero, 2, cpu_factor,
+                                                             en_hilo=not game_loop.simulando(),
+                                                             determinista=determinista)
+                    inicio_cpu = game_loop.ticks()
+                elif (determinista or busqueda.terminada()) and game_loop.ticks() - inicio_cpu >= TIEMPO_MINIMO_CPU:
+                    busqueda.esperar()
+                    caida = nueva_caida(board, busqueda.columna, 2)
+                    busqueda = None
+
+            if caida and avanzar_caida(caida, dt):
+                piece = caida["pieza"]
+                board[caida["fila"]][caida["col"]] = piece
+                tablero.jugar(caida["col"], piece)
+                fondo = render_board(board)
+                caida = None
+                if tablero.gano(piece):
                     game_over = True
-                    winner = "CPU"
-                elif is_board_full(board):
+                    winner = "Jugador 1" if piece==1 else ("CPU" if players==1 else "Jugador 2")
+                elif tablero.lleno():
                     game_over = True
                     winner = "Empate"
-                turn = 0
+                turn = (turn+1)%2
+            game_loop.fase("update")
 
-        if game_over:
-            draw_board(board)  
-            pygame.time.delay(1000) 
-            mostrar_pantalla_victoria(screen, winner, players)
-            return
+            SCREEN.blit(fondo, (0, 0))
+            if caida:
+                draw_caida(caida)
+            game_loop.flip()
 
-        pygame.display.update()
+            if game_over:
+                game_loop.esperar(1000)
+                mostrar_pantalla_victoria(screen, winner, players)
+                return
+    finally:
+        if busqueda is not None:
+            busqueda.cancelar()
 
 def menu_principal(screen):
     """Menú principal del juego"""
@@ -257,30 +266,35 @@ def menu_principal(screen):
             screen.blit(IMG_MENU, (0, 0))
         else:
             screen.fill(BLACK)
-            font = pygame.font.SysFont(None, 60)
-            title = font.render("4 EN LÍNEA", True, (255, 165, 0))
+            font = text_cache.fuente(60, sysfont=True)
+            title = text_cache.render(font, "4 EN LÍNEA", (255, 165, 0))
             screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//3))
             
-            font_small = pygame.font.SysFont(None, 35)
-            play_text = font_small.render("ESPACIO PARA JUGAR", True, GRAY)
-            exit_text = font_small.render("ESC PARA SALIR", True, GRAY)
+            font_small = text_cache.fuente(35, sysfont=True)
+            play_text = text_cache.render(font_small, "ESPACIO PARA JUGAR", GRAY)
+            exit_text = text_cache.render(font_small, "ESC PARA SALIR", GRAY)
             screen.blit(play_text, (WIDTH//2 - play_text.get_width()//2, HEIGHT//2))
             screen.blit(exit_text, (WIDTH//2 - exit_text.get_width()//2, HEIGHT//2 + 50))
         
-        pygame.display.flip()
+        game_loop.flip()
         
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
-                return False
+                pygame.quit()
+                sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     return True
                 if event.key == pygame.K_ESCAPE:
                     return False
         
-        clock.tick(30)
+        game_loop.tick(clock, 30)
+
+def run(screen, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    global SCREEN
+    SCREEN = game_host.ajustar_pantalla(screen, (WIDTH, HEIGHT), "4 en Línea Animado")
 
-def main():
     while True:
         # Mostrar menú principal
         if not menu_principal(SCREEN):
@@ -300,7 +314,9 @@ def main():
 
         # Ejecutar el juego
         run_game(SCREEN, jugadores, cpu_dificultad)
-    
+
+def main():
+    run(pygame.display.set_mode((WIDTH, HEIGHT)))
     pygame.quit()
     sys.exit()
 
@@ -3,8 +3,12 @@ import sys
 import random
 import math
 
+import assets
+import game_host
+import game_loop
+import text_cache
+
 pygame.init()
-pygame.display.set_caption("Fall Out")
 
 BLANCO = (255, 255, 255)
 NEGRO = (0, 0, 0)
@@ -29,7 +33,11 @@ def cargar_imagenes():
     errores = []
     for clave, archivo in archivos.items():
         try:
-            imagenes[clave] = pygame.image.load(archivo)
+            # Los fondos se cargan ya escalados a la ventana (variante precompilada si existe)
+            if clave in ('menu', 'fondo', 'game_over'):
+                imagenes[clave] = assets.cargar(archivo, (ANCHO, ALTO), alpha=False)
+            else:
+                imagenes[clave] = assets.cargar(archivo)
             print(f"✓ Cargado: {archivo}")
         except pygame.error as e:
             errores.append(f"✗ No se encontró: {archivo}")
@@ -47,10 +55,10 @@ def cargar_imagenes():
     return imagenes
 
 def menu_principal(pantalla, imagenes):
-    menu_img = pygame.transform.scale(imagenes['menu'], (ANCHO, ALTO))
+    menu_img = imagenes['menu']
     
     while True:
-        for evento in pygame.event.get():
+        for evento in game_loop.eventos():
             if evento.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -58,36 +66,35 @@ def menu_principal(pantalla, imagenes):
                 if evento.key == pygame.K_SPACE:
                     return True
                 elif evento.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+                    return False
         
         pantalla.blit(menu_img, (0, 0))
-        pygame.display.flip()
+        game_loop.flip()
 
 def cuenta_regresiva(pantalla):
-    fuente = pygame.font.Font(None, 144)
+    fuente = text_cache.fuente(144)
     
     for i in range(3, 0, -1):
         pantalla.fill(NEGRO)
         
-        texto = fuente.render(str(i), True, BLANCO)
+        texto = text_cache.render(fuente, i, BLANCO)
         pantalla.blit(texto, (ANCHO//2 - texto.get_width()//2, ALTO//2 - texto.get_height()//2))
         
-        pygame.display.flip()
-        pygame.time.wait(800)
+        game_loop.flip()
+        game_loop.esperar(800)
     
     pantalla.fill(NEGRO)
-    go_texto = fuente.render("¡VAMOS!", True, VERDE)
+    go_texto = text_cache.render(fuente, "¡VAMOS!", VERDE)
     pantalla.blit(go_texto, (ANCHO//2 - go_texto.get_width()//2, ALTO//2 - go_texto.get_height()//2))
-    pygame.display.flip()
-    pygame.time.wait(600)
+    game_loop.flip()
+    game_loop.esperar(600)
 
 def pantalla_fin_juego(pantalla, imagenes):
-    game_over_img = pygame.transform.scale(imagenes['game_over'], (ANCHO, ALTO))
+    game_over_img = imagenes['game_over']
     
     esperando = True
     while esperando:
-        for evento in pygame.event.get():
+        for evento in game_loop.eventos():
             if evento.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -98,7 +105,7 @@ def pantalla_fin_juego(pantalla, imagenes):
                     return False
         
         pantalla.blit(game_over_img, (0, 0))
-        pygame.display.flip()
+        game_loop.flip()
 
 def crear_obstaculo(imagenes, tamaño):
     x = random.randint(0, ANCHO - tamaño)
@@ -127,8 +134,7 @@ def dibujar_jugador(pantalla, x, y, ancho_jugador, alto_jugador, imagen_cangrejo
     pantalla.blit(imagen_escalada, (int(x), int(y)))
 
 def dibujar_fondo(pantalla, imagen_fondo):
-    fondo_escalado = pygame.transform.scale(imagen_fondo, (ANCHO, ALTO))
-    pantalla.blit(fondo_escalado, (0, 0))
+    pantalla.blit(imagen_fondo, (0, 0))
 
 def ejecutar_juego(pantalla, record_actual, imagenes):
     reloj = pygame.time.Clock()
@@ -154,10 +160,10 @@ def ejecutar_juego(pantalla, record_actual, imagenes):
     
     corriendo = True
     while corriendo:
-        dt = reloj.tick(FPS) / 1000.0
+        dt = game_loop.tick(reloj, FPS) / 1000.0
         tiempo_transcurrido += dt
         
-        for evento in pygame.event.get():
+        for evento in game_loop.eventos():
             if evento.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -165,7 +171,9 @@ def ejecutar_juego(pantalla, record_actual, imagenes):
                 if evento.key == pygame.K_ESCAPE:
                     return record_actual, False
         
-        teclas = pygame.key.get_pressed()
+        game_loop.fase("eventos")
+        
+        teclas = game_loop.teclas()
         if teclas[pygame.K_LEFT] or teclas[pygame.K_a]:
             jugador_x -= velocidad_jugador * dt
         if teclas[pygame.K_RIGHT] or teclas[pygame.K_d]:
@@ -197,6 +205,7 @@ def ejecutar_juego(pantalla, record_actual, imagenes):
                 return nuevo_record, jugar_otra_vez
         
         puntuacion += dt * 15 * factor_velocidad
+        game_loop.fase("update")
         
         dibujar_fondo(pantalla, imagenes['fondo'])
         
@@ -205,24 +214,26 @@ def ejecutar_juego(pantalla, record_actual, imagenes):
         
         dibujar_jugador(pantalla, jugador_x, jugador_y, ancho_jugador, alto_jugador, imagenes['cangrejo'])
         
-        fuente_puntos = pygame.font.Font(None, 56)
-        texto_puntos = fuente_puntos.render(f"Puntos: {int(puntuacion)}", True, BLANCO)
+        fuente_puntos = text_cache.fuente(56)
+        texto_puntos = text_cache.render(fuente_puntos, f"Puntos: {int(puntuacion)}", BLANCO)
         pantalla.blit(texto_puntos, (10, 10))
         
         if record_actual > 0:
-            fuente_record = pygame.font.Font(None, 32)
-            texto_record = fuente_record.render(f"Récord: {int(record_actual)}", True, AMARILLO)
+            fuente_record = text_cache.fuente(32)
+            texto_record = text_cache.render(fuente_record, f"Récord: {int(record_actual)}", AMARILLO)
             pantalla.blit(texto_record, (10, 70))
         
-        nivel_texto = pygame.font.Font(None, 32).render(f"Velocidad: x{factor_velocidad:.1f}", True, VERDE)
+        nivel_texto = text_cache.render(text_cache.fuente(32), f"Velocidad: x{factor_velocidad:.1f}", VERDE)
         pantalla.blit(nivel_texto, (ANCHO - nivel_texto.get_width() - 10, 10))
         
-        pygame.display.flip()
+        game_loop.flip()
 
-def main():
-    pantalla = pygame.display.set_mode((ANCHO, ALTO))
+def run(pantalla, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    pantalla = game_host.ajustar_pantalla(pantalla, (ANCHO, ALTO), "Fall Out")
     imagenes = cargar_imagenes()
-    menu_principal(pantalla, imagenes)
+    if not menu_principal(pantalla, imagenes):
+        return
     
     record = 0
     
@@ -232,7 +243,9 @@ def main():
         
         if not continuar:
             break
-    
+
+def main():
+    run(pygame.display.set_mode((ANCHO, ALTO)))
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,151 @@
+"""Compila las imágenes grandes de image/ a variantes ya escaladas para cada resolución.
+
+Uso: python asset_pipeline.py
+
+Genera image/compiladas/ con una copia de cada fondo por tamaño de pantalla
+(JPEG si la imagen es opaca, PNG si tiene transparencia) y un manifest.json
+que assets.cargar() consulta para no decodificar los PNG originales de ~3 MB.
+Las variantes se vuelven a generar cuando cambia el archivo original.
+"""
+import ast
+import json
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+import assets
+
+CARPETA_IMAGENES = os.path.join(assets.BASE_DIR, "image")
+CARPETA_COMPILADAS = os.path.join(CARPETA_IMAGENES, "compiladas")
+MANIFIESTO = os.path.join(CARPETA_COMPILADAS, "manifest.json")
+VERSION = 1
+
+# Solo se compilan las imágenes de al menos este tamaño en disco (fondos de pantalla completa)
+UMBRAL_BYTES = 100 * 1024
+
+# Tamaños de ventana de los juegos, a los que escalan sus fondos
+TAMAÑOS_JUEGOS = [
+    (800, 600),    # snake, pong, flappy, memotest, fast_finger, sky_hopper, crash_run
+    (700, 700),    # 4_lineas
+    (1000, 700),   # fruit_cutter
+    (1000, 800),   # grid
+    (1200, 800),   # f11clubes
+    (1280, 720),   # Fall_out
+    (1400, 800),   # pantalla_de_inicio
+]
+
+
+def resoluciones_menu():
+    """Lee RESOLUTIONS de menu.py sin importarlo (importarlo abre la ventana del menú)"""
+    with open(os.path.join(assets.BASE_DIR, "menu.py"), encoding="utf-8") as f:
+        arbol = ast.parse(f.read())
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Assign) and any(getattr(t, "id", None) == "RESOLUTIONS" for t in nodo.targets):
+            return [(ancho, alto) for _, ancho, alto in ast.literal_eval(nodo.value)]
+    return []
+
+
+def tamaños_objetivo():
+    return sorted(set(resoluciones_menu()) | set(TAMAÑOS_JUEGOS))
+
+
+def ruta_relativa(ruta):
+    return os.path.relpath(ruta, assets.BASE_DIR).replace(os.sep, "/")
+
+
+def huella(ruta):
+    """Tamaño y fecha del original: si cambian, sus variantes dejan de usarse"""
+    info = os.stat(ruta)
+    return {"bytes": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+
+def es_opaca(imagen):
+    if not imagen.get_flags() & pygame.SRCALPHA:
+        return True
+    ancho, alto = imagen.get_size()
+    return all(imagen.get_at((x, y)).a == 255 for y in range(alto) for x in range(ancho))
+
+
+def compilar_imagen(ruta, tamaños):
+    """Escala `ruta` a cada tamaño más chico que el original y devuelve {"AxB": ruta relativa}"""
+    original = pygame.image.load(ruta)
+    opaca = es_opaca(original)
+    # smoothscale necesita 24/32 bits: se copia a una superficie de 32 bits
+    fuente = pygame.Surface(original.get_size(), pygame.SRCALPHA, 32)
+    fuente.blit(original, (0, 0))
+
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    extension = ".jpg" if opaca else ".png"
+    variantes = {}
+    for ancho, alto in tamaños:
+        if ancho * alto >= original.get_width() * original.get_height():
+            continue  # solo se achica: agrandar no ahorra decodificación
+        destino = os.path.join(CARPETA_COMPILADAS, f"{nombre}_{ancho}x{alto}{extension}")
+        escalada = pygame.transform.smoothscale(fuente, (ancho, alto))
+        if opaca:
+            # JPEG no guarda alpha: se pasa a 24 bits
+            plana = pygame.Surface((ancho, alto), 0, 24)
+            plana.blit(escalada, (0, 0))
+            escalada = plana
+        pygame.image.save(escalada, destino)
+        variantes[f"{ancho}x{alto}"] = ruta_relativa(destino)
+    return variantes
+
+
+def leer_manifiesto():
+    try:
+        with open(MANIFIESTO, encoding="utf-8") as f:
+            manifiesto = json.load(f)
+        if manifiesto.get("version") == VERSION:
+            return manifiesto
+    except (OSError, ValueError):
+        pass
+    return {"version": VERSION, "imagenes": {}}
+
+
+def compilar(forzar=False):
+    """Compila las imágenes nuevas o modificadas y reescribe el manifiesto"""
+    os.makedirs(CARPETA_COMPILADAS, exist_ok=True)
+    tamaños = tamaños_objetivo()
+    anterior = leer_manifiesto()["imagenes"]
+    imagenes = {}
+    bytes_originales = bytes_compilados = compiladas = 0
+
+    for nombre in sorted(os.listdir(CARPETA_IMAGENES)):
+        ruta = os.path.join(CARPETA_IMAGENES, nombre)
+        if not nombre.lower().endswith(".png") or os.path.getsize(ruta) < UMBRAL_BYTES:
+            continue
+        clave = ruta_relativa(ruta)
+        entrada = anterior.get(clave)
+        actual = (not forzar and entrada and entrada["fuente"] == huella(ruta)
+                  and sorted(entrada["tamaños"]) == sorted(f"{a}x{b}" for a, b in tamaños)
+                  and all(os.path.exists(os.path.join(assets.BASE_DIR, v)) for v in entrada["variantes"].values()))
+        if not actual:
+            entrada = {"fuente": huella(ruta), "tamaños": [f"{a}x{b}" for a, b in tamaños],
+                       "variantes": compilar_imagen(ruta, tamaños)}
+            compiladas += 1
+        imagenes[clave] = entrada
+
+        bytes_originales += entrada["fuente"]["bytes"]
+        for variante in entrada["variantes"].values():
+            bytes_compilados += os.path.getsize(os.path.join(assets.BASE_DIR, variante))
+
+    # Se borran las variantes que ya no figuran en el manifiesto
+    vigentes = {os.path.basename(v) for e in imagenes.values() for v in e["variantes"].values()}
+    for nombre in os.listdir(CARPETA_COMPILADAS):
+        if nombre != os.path.basename(MANIFIESTO) and nombre not in vigentes:
+            os.remove(os.path.join(CARPETA_COMPILADAS, nombre))
+
+    with open(MANIFIESTO, "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION, "imagenes": imagenes}, f, ensure_ascii=False, indent=1)
+
+    print(f"{len(imagenes)} imágenes ({compiladas} recompiladas), tamaños: "
+          f"{', '.join(f'{a}x{b}' for a, b in tamaños)}")
+    print(f"Originales: {bytes_originales // 1024} KB, variantes: {bytes_compilados // 1024} KB -> {MANIFIESTO}")
+
+
+if __name__ == "__main__":
+    pygame.init()
+    compilar(forzar="--forzar" in sys.argv)
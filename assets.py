@@ -0,0 +1,172 @@
+import json
+import os
+from collections import OrderedDict
+
+import pygame
+
+# Carpeta del proyecto: las rutas relativas ("image/...") se resuelven contra ella
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Máximo de variantes escaladas que se guardan antes de descartar la menos usada
+MAX_ESCALADAS = 256
+
+# Manifiesto de las variantes ya escaladas que genera asset_pipeline.py
+MANIFIESTO = os.path.join(BASE_DIR, "image", "compiladas", "manifest.json")
+
+# (ruta, alpha) -> superficie decodificada en su tamaño original
+_originales = {}
+# Claves de _originales que todavía no se pudieron convertir al formato de pantalla
+_sin_convertir = set()
+# (ruta, tamaño, alpha) -> superficie escalada, en orden de uso (LRU)
+_escaladas = OrderedDict()
+# (ruta, tamaño, alpha) -> clave de _originales de la que salió (el original o su variante precompilada)
+_origen = {}
+
+# ruta original -> entrada del manifiesto (None hasta leerlo)
+_manifiesto = None
+
+_stats = {"hits": 0, "misses": 0, "decodificadas": 0, "escaladas": 0, "descartadas": 0, "precompiladas": 0}
+
+
+def resolver_ruta(ruta):
+    """Devuelve la ruta absoluta de un recurso del proyecto"""
+    if os.path.isabs(ruta):
+        return os.path.normpath(ruta)
+    return os.path.normpath(os.path.join(BASE_DIR, ruta))
+
+
+def _leer_manifiesto():
+    """Carga el manifiesto de asset_pipeline.py con rutas absolutas, o {} si no se compiló"""
+    try:
+        with open(MANIFIESTO, encoding="utf-8") as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {resolver_ruta(ruta): entrada for ruta, entrada in datos.get("imagenes", {}).items()}
+
+
+def _variante_compilada(ruta, tamaño):
+    """Ruta de la variante precompilada de `ruta` en `tamaño`, si existe y el original no cambió"""
+    global _manifiesto
+    if tamaño is None:
+        return None
+    if _manifiesto is None:
+        _manifiesto = _leer_manifiesto()
+
+    entrada = _manifiesto.get(ruta)
+    variante = entrada and entrada["variantes"].get(f"{tamaño[0]}x{tamaño[1]}")
+    if not variante:
+        return None
+    try:
+        info = os.stat(ruta)
+    except OSError:
+        return None
+    if (info.st_size, info.st_mtime_ns) != (entrada["fuente"]["bytes"], entrada["fuente"]["mtime_ns"]):
+        return None
+    variante = resolver_ruta(variante)
+    return variante if os.path.exists(variante) else None
+
+
+def _convertir(imagen, alpha):
+    """Pasa la superficie al formato de la pantalla para que el blit no tenga que convertir"""
+    return imagen.convert_alpha() if alpha else imagen.convert()
+
+
+def _original(ruta, alpha):
+    """Decodifica el archivo una sola vez y lo convierte cuando ya hay ventana"""
+    clave = (ruta, alpha)
+    hay_pantalla = pygame.display.get_init() and pygame.display.get_surface() is not None
+
+    if clave not in _originales:
+        imagen = pygame.image.load(ruta)
+        _stats["decodificadas"] += 1
+        if hay_pantalla:
+            imagen = _convertir(imagen, alpha)
+        else:
+            _sin_convertir.add(clave)
+        _originales[clave] = imagen
+    elif clave in _sin_convertir and hay_pantalla:
+        # Se cargó antes de crear la ventana: se convierte ahora y se tiran las
+        # variantes escaladas que salieron de la versión sin convertir
+        _originales[clave] = _convertir(_originales[clave], alpha)
+        _sin_convertir.discard(clave)
+        for clave_escalada in [c for c in _escaladas if _origen.get(c) == clave]:
+            del _escaladas[clave_escalada]
+            del _origen[clave_escalada]
+
+    return _originales[clave]
+
+
+def cargar(ruta, tamaño=None, alpha=True):
+    """Devuelve la imagen de `ruta` (opcionalmente escalada a `tamaño`) desde la caché.
+
+    alpha=True usa convert_alpha() (sprites con transparencia); alpha=False usa
+    convert(), más rápido para fondos opacos. Si el archivo no existe se lanza
+    la misma excepción que pygame.image.load.
+    """
+    ruta = resolver_ruta(ruta)
+    if tamaño is not None:
+        tamaño = (int(tamaño[0]), int(tamaño[1]))
+    clave = (ruta, tamaño, alpha)
+
+    if clave in _escaladas and _origen[clave] not in _sin_convertir:
+        _escaladas.move_to_end(clave)
+        _stats["hits"] += 1
+        return _escaladas[clave]
+
+    _stats["misses"] += 1
+    # Si asset_pipeline.py dejó una variante de este tamaño se decodifica esa
+    # (ya escalada, unos cientos de KB) en lugar del original
+    origen = (_variante_compilada(ruta, tamaño) or ruta, alpha)
+    if origen[0] != ruta and origen not in _originales:
+        _stats["precompiladas"] += 1
+    imagen = _original(*origen)
+    if tamaño is not None and imagen.get_size() != tamaño:
+        imagen = pygame.transform.scale(imagen, tamaño)
+        _stats["escaladas"] += 1
+
+    _escaladas[clave] = imagen
+    _origen[clave] = origen
+    if len(_escaladas) > MAX_ESCALADAS:
+        descartada, _ = _escaladas.popitem(last=False)
+        del _origen[descartada]
+        _stats["descartadas"] += 1
+    return imagen
+
+
+def cargar_opcional(ruta, tamaño=None, alpha=True):
+    """Como cargar(), pero devuelve None e informa por consola si la imagen no se puede leer"""
+    try:
+        return cargar(ruta, tamaño, alpha)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"No se pudo cargar la imagen {ruta}: {e}")
+        return None
+
+
+def estadisticas():
+    """Devuelve una copia de los contadores de la caché"""
+    datos = dict(_stats)
+    datos["originales"] = len(_originales)
+    datos["en_cache"] = len(_escaladas)
+    return datos
+
+
+def imprimir_estadisticas():
+    """Muestra por consola los aciertos y fallos de la caché"""
+    datos = estadisticas()
+    print(f"Assets: {datos['hits']} hits, {datos['misses']} misses, "
+          f"{datos['decodificadas']} archivos decodificados ({datos['precompiladas']} precompilados), "
+          f"{datos['escaladas']} escalados, "
+          f"{datos['descartadas']} descartados, {datos['en_cache']} en caché")
+
+
+def limpiar():
+    """Vacía la caché (por ejemplo al cambiar el modo de pantalla)"""
+    global _manifiesto
+    _manifiesto = None
+    _originales.clear()
+    _sin_convertir.clear()
+    _escaladas.clear()
+    _origen.clear()
+    for clave in _stats:
+        _stats[clave] = 0
@@ -0,0 +1,82 @@
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# (tipo, tamaño, parámetros) -> fondo ya dibujado
+_fondos = {}
+
+_stats = {"hits": 0, "misses": 0}
+
+
+def _colores_gradiente(alto, inicio, fin):
+    """Color de cada fila interpolando de `inicio` (arriba) a `fin` (abajo), truncado como int()"""
+    if numpy is not None:
+        ratio = (numpy.arange(alto, dtype=numpy.float64) / alto)[:, None]
+        filas = numpy.array(inicio, dtype=numpy.float64) * (1 - ratio) + numpy.array(fin, dtype=numpy.float64) * ratio
+        return filas.astype(numpy.int64)
+    return [tuple(int(inicio[c] * (1 - y / alto) + fin[c] * (y / alto)) for c in range(3)) for y in range(alto)]
+
+
+def _colores_escalonados(alto, base, divisores):
+    """Color de cada fila como base + y // divisor en cada canal"""
+    if numpy is not None:
+        y = numpy.arange(alto, dtype=numpy.int64)[:, None]
+        return numpy.array(base, dtype=numpy.int64) + y // numpy.array(divisores, dtype=numpy.int64)
+    return [tuple(base[c] + y // divisores[c] for c in range(3)) for y in range(alto)]
+
+
+def _dibujar_filas(tamaño, filas):
+    """Crea una superficie de `tamaño` pintando cada fila con su color"""
+    ancho, alto = tamaño
+    if numpy is not None:
+        filas = numpy.clip(filas, 0, 255).astype(numpy.uint8)
+        # surfarray usa (x, y, canal): se repite la columna de colores en todo el ancho
+        superficie = pygame.surfarray.make_surface(numpy.broadcast_to(filas[None, :, :], (ancho, alto, 3)))
+    else:
+        superficie = pygame.Surface(tamaño)
+        for y, color in enumerate(filas):
+            color = tuple(max(0, min(255, c)) for c in color)
+            pygame.draw.line(superficie, color, (0, y), (ancho, y))
+
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        superficie = superficie.convert()
+    return superficie
+
+
+def _obtener(clave, crear):
+    fondo = _fondos.get(clave)
+    if fondo is not None:
+        _stats["hits"] += 1
+        return fondo
+    _stats["misses"] += 1
+    fondo = _fondos[clave] = crear()
+    return fondo
+
+
+def gradiente(tamaño, inicio, fin):
+    """Fondo con gradiente vertical de `inicio` a `fin`, dibujado una sola vez por tamaño"""
+    tamaño = (int(tamaño[0]), int(tamaño[1]))
+    clave = ("gradiente", tamaño, tuple(inicio), tuple(fin))
+    return _obtener(clave, lambda: _dibujar_filas(tamaño, _colores_gradiente(tamaño[1], inicio, fin)))
+
+
+def escalonado(tamaño, base, divisores):
+    """Fondo cuyo color en la fila y es base + y // divisores (canal por canal)"""
+    tamaño = (int(tamaño[0]), int(tamaño[1]))
+    clave = ("escalonado", tamaño, tuple(base), tuple(divisores))
+    return _obtener(clave, lambda: _dibujar_filas(tamaño, _colores_escalonados(tamaño[1], base, divisores)))
+
+
+def estadisticas():
+    """Devuelve una copia de los contadores de la caché"""
+    datos = dict(_stats)
+    datos["en_cache"] = len(_fondos)
+    return datos
+
+
+def limpiar():
+    """Descarta los fondos dibujados (por ejemplo al cambiar la resolución)"""
+    _fondos.clear()
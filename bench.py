@@ -0,0 +1,238 @@
+"""Benchmark sin ventana de los bucles de los juegos.
+
+Uso: python bench.py [juego ...] [--frames N] [--semilla S] [--json archivo]
+
+Cada juego corre con SDL_VIDEODRIVER=dummy, reloj sin límite y una entrada
+guionada (game_loop.EntradaScript). Se informa frames por segundo, el tiempo
+promedio de cada fase del frame (eventos, update, draw, flip) y cuánta memoria
+se asigna por frame (pico de tracemalloc, en una segunda pasada más corta).
+"""
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+
+import game_host
+import game_loop
+
+FASES = ["eventos", "update", "draw", "flip", "espera", "otros"]
+
+
+# ---------------------------------------------------------------------------
+# Cada juego: preparar(pantalla) carga recursos y devuelve jugar(), que corre
+# partidas sin fin (la simulación la corta game_loop.FinSimulacion).
+# script(frame) describe la entrada de ese frame.
+# ---------------------------------------------------------------------------
+
+def preparar_snake(pantalla):
+    import snake
+    snake.screen = game_host.ajustar_pantalla(pantalla, (snake.WIDTH, snake.HEIGHT))
+    if snake.imagenes is None:
+        snake.imagenes = snake.cargar_imagenes()
+
+    def jugar():
+        while True:
+            snake.jugar_partida()
+    return jugar
+
+
+def script_snake(frame):
+    # Gira en sentido horario cada 6 pasos (da vueltas en un cuadrado) y reinicia con ESPACIO
+    giros = [pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP, pygame.K_RIGHT]
+    pulsar = [pygame.K_SPACE] if frame % 10 == 0 else []
+    if frame % 6 == 0:
+        pulsar.append(giros[(frame // 6) % 4])
+    return {"pulsar": pulsar}
+
+
+def preparar_pong(pantalla):
+    import pong
+    pantalla = game_host.ajustar_pantalla(pantalla, (pong.W, pong.H))
+
+    def jugar():
+        while True:
+            pong.run_game(pantalla, 1, pong.DIFICULTADES["2"])
+    return jugar
+
+
+def script_pong(frame):
+    return {"teclas": [pygame.K_w if (frame // 40) % 2 else pygame.K_s],
+            "pulsar": [pygame.K_SPACE] if frame % 60 == 0 else []}
+
+
+def preparar_flappy(pantalla):
+    import flappy
+    pantalla = game_host.ajustar_pantalla(pantalla, (800, 600))
+
+    def jugar():
+        while True:
+            flappy.run_game(pantalla, 800, 600)
+    return jugar
+
+
+def script_flappy(frame):
+    # Con un salto cada ~38 frames el pájaro se mantiene a la misma altura
+    return {"pulsar": [pygame.K_SPACE] if frame % 38 == 0 else []}
+
+
+def preparar_fall_out(pantalla):
+    fall_out = game_host.cargar_juego("Fall_out.py")
+    pantalla = game_host.ajustar_pantalla(pantalla, (fall_out.ANCHO, fall_out.ALTO))
+    imagenes = fall_out.cargar_imagenes()
+
+    def jugar():
+        record = 0
+        while True:
+            record, _ = fall_out.ejecutar_juego(pantalla, record, imagenes)
+    return jugar
+
+
+def script_lateral(frame):
+    """Izquierda y derecha alternadas; ESPACIO para salir de las pantallas de fin"""
+    return {"teclas": [pygame.K_LEFT if (frame // 45) % 2 else pygame.K_RIGHT],
+            "pulsar": [pygame.K_SPACE] if frame % 30 == 0 else []}
+
+
+def preparar_crash_run(pantalla):
+    import crash_run
+    crash_run.crear_pantalla(pantalla)
+    imagenes = crash_run.cargar_imagenes()
+
+    def jugar():
+        while True:
+            crash_run.reiniciar_juego()
+            crash_run.juego_activo(imagenes)
+    return jugar
+
+
+def preparar_fruit_cutter(pantalla):
+    import fruit_cutter
+    fruit_cutter.pantalla = game_host.ajustar_pantalla(pantalla, (fruit_cutter.ANCHO, fruit_cutter.ALTO))
+    fruit_cutter.cargar_imagenes()
+
+    def jugar():
+        while True:
+            fruit_cutter.estado_juego = "menu"
+            fruit_cutter.reiniciar_juego()
+            fruit_cutter.ejecutar_juego()
+    return jugar
+
+
+def script_fruit_cutter(frame):
+    # El mouse da vueltas con el botón apretado y lo suelta un momento cada 100 frames
+    angulo = frame / 10
+    return {"mouse": (int(500 + 300 * math.cos(angulo)), int(350 + 200 * math.sin(angulo))),
+            "botones": (frame % 100 >= 5, False, False),
+            "pulsar": [pygame.K_SPACE] if frame % 60 == 0 else []}
+
+
+JUEGOS = {
+    "snake": (preparar_snake, script_snake),
+    "pong": (preparar_pong, script_pong),
+    "flappy": (preparar_flappy, script_flappy),
+    "fall_out": (preparar_fall_out, script_lateral),
+    "crash_run": (preparar_crash_run, script_lateral),
+    "fruit_cutter": (preparar_fruit_cutter, script_fruit_cutter),
+}
+
+
+class MedidorMemoria(game_loop.Medidor):
+    """Además de los tiempos guarda el pico de memoria asignada en cada frame (tracemalloc)"""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_por_frame = []
+        self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+
+    def fin_frame(self, fps=None):
+        super().fin_frame(fps)
+        actual, pico = tracemalloc.get_traced_memory()
+        self.bytes_por_frame.append(pico - self._memoria_inicial)
+        tracemalloc.reset_peak()
+        self._memoria_inicial = actual
+
+
+def _simular(jugar, script, frames, medidor, semilla):
+    random.seed(semilla)
+    with game_loop.simular(game_loop.EntradaScript(script), frames), game_loop.medir(medidor):
+        try:
+            jugar()
+        except game_loop.FinSimulacion:
+            pass
+
+
+def correr(nombre, frames=2000, semilla=1):
+    """Corre un juego y devuelve sus números (fps, ms por fase, KB asignados por frame)"""
+    preparar, script = JUEGOS[nombre]
+    jugar = preparar(pygame.display.get_surface())
+
+    medidor = game_loop.Medidor()
+    inicio = time.perf_counter()
+    _simular(jugar, script, frames, medidor, semilla)
+    segundos = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    try:
+        memoria = MedidorMemoria()
+        _simular(jugar, script, min(frames, 300), memoria, semilla)
+    finally:
+        tracemalloc.stop()
+
+    resumen = medidor.resumen()
+    por_frame = memoria.bytes_por_frame or [0]
+    return {
+        "juego": nombre,
+        "frames": len(medidor.frames),
+        "fps": len(medidor.frames) / segundos if segundos else 0.0,
+        "ms": {fase: resumen.get(fase, 0.0) for fase in FASES + ["total"]},
+        "kb_por_frame": sum(por_frame) / len(por_frame) / 1024,
+        "kb_por_frame_max": max(por_frame) / 1024,
+    }
+
+
+def imprimir(resultados):
+    columnas = "".join(f"{fase:>9}" for fase in FASES)
+    print(f"{'juego':<14}{'frames':>7}{'fps':>9}{columnas}{'total':>9}{'KB/frame':>10}{'KB max':>9}")
+    for r in resultados:
+        fases = "".join(f"{r['ms'][fase]:>9.3f}" for fase in FASES)
+        print(f"{r['juego']:<14}{r['frames']:>7}{r['fps']:>9.0f}{fases}{r['ms']['total']:>9.3f}"
+              f"{r['kb_por_frame']:>10.1f}{r['kb_por_frame_max']:>9.1f}")
+    print("(tiempos en ms promedio por frame)")
+
+
+def main(argumentos):
+    frames, semilla, salida_json, nombres = 2000, 1, None, []
+    i = 0
+    while i < len(argumentos):
+        if argumentos[i] == "--frames":
+            frames = int(argumentos[i + 1]); i += 1
+        elif argumentos[i] == "--semilla":
+            semilla = int(argumentos[i + 1]); i += 1
+        elif argumentos[i] == "--json":
+            salida_json = argumentos[i + 1]; i += 1
+        elif argumentos[i] in JUEGOS:
+            nombres.append(argumentos[i])
+        else:
+            print(f"Argumento desconocido: {argumentos[i]} (juegos: {', '.join(JUEGOS)})")
+            return 2
+        i += 1
+
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+    resultados = [correr(nombre, frames, semilla) for nombre in nombres or JUEGOS]
+    imprimir(resultados)
+    if salida_json:
+        with open(salida_json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
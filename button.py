@@ -1,6 +1,7 @@
 import pygame
 
 class Button():
+    """Botón con imagen que se crea una sola vez y recibe los clics por eventos"""
     def __init__(self,x,y,image,scale):
         width = image.get_width()
         height = image.get_height()
@@ -8,20 +9,57 @@ class Button():
         self.rect = self .image.get_rect()
         self.rect.topleft = (x,y)
         self.clicked = False
+        self.pending = False
 
-    def draw(self,surface):
-        action = False
-        pos = pygame.mouse.get_pos()
+    def handle_event(self,event):
+        """Actualiza el clic con un evento del mouse; devuelve True si el evento fue un clic sobre el botón"""
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.rect.collidepoint(event.pos) and not self.clicked:
+                self.clicked = True
+                self.pending = True
+                return True
 
-        if self.rect.collidepoint(pos):
-            if pygame.mouse.get_pressed()[0] == 1 and self.clicked == False:
-                self.clicked = True 
-                action = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.clicked = False
 
+        return False
 
-        if pygame.mouse.get_pressed()[0] == 0:
-            self.clicked == False
+    def draw(self,surface):
+        """Dibuja el botón y devuelve True una vez por cada clic recibido desde el último draw"""
+        action = self.pending
+        self.pending = False
 
         surface.blit(self.image,(self.rect.x, self.rect.y))
 
-        return action
\ No newline at end of file
+        return action
+
+    def reset(self):
+        """Olvida clics pendientes (al entrar a una pantalla con el mouse ya apretado)"""
+        self.clicked = False
+        self.pending = False
+
+
+class ButtonGroup():
+    """Conjunto de botones con nombre de una misma pantalla"""
+    def __init__(self, buttons):
+        self.buttons = dict(buttons)
+
+    def __getitem__(self, name):
+        return self.buttons[name]
+
+    def handle_event(self, event):
+        """Pasa el evento a todos los botones; devuelve el nombre del clickeado o None"""
+        clicked = None
+        for name, button in self.buttons.items():
+            if button.handle_event(event):
+                clicked = name
+        return clicked
+
+    def draw(self, surface):
+        """Dibuja todos los botones y devuelve {nombre: fue_clickeado}"""
+        return {name: button.draw(surface) for name, button in self.buttons.items()}
+
+    def reset(self):
+        """Olvida los clics de todos los botones (al cambiar de pantalla)"""
+        for button in self.buttons.values():
+            button.reset()
@@ -2,6 +2,12 @@ import pygame
 import random
 import math
 import os
+import sys
+
+import assets
+import game_host
+import game_loop
+import text_cache
 
 pygame.init()
 
@@ -26,33 +32,21 @@ estado_juego = "menu"
 tiempo_inicio_cuenta = 0
 
 def cargar_imagenes():
-    """Carga todas las imágenes del juego"""
+    """Obtiene todas las imágenes del juego desde la caché compartida"""
     imagenes = {}
     try:
         
-        imagenes['jugador'] = pygame.image.load(os.path.join("image", "autoesquivaverde.png"))
-        imagenes['jugador'] = pygame.transform.scale(imagenes['jugador'], (90, 120))
-        
-       
-        imagenes['auto_naranja'] = pygame.image.load(os.path.join("image", "autoesquivanaranja.png"))
-        imagenes['auto_naranja'] = pygame.transform.scale(imagenes['auto_naranja'], (90, 120))
+        imagenes['jugador'] = assets.cargar(os.path.join("image", "autoesquivaverde.png"), (90, 120))
         
-        imagenes['auto_violeta'] = pygame.image.load(os.path.join("image", "autoesquivavioleta.png"))
-        imagenes['auto_violeta'] = pygame.transform.scale(imagenes['auto_violeta'], (90, 120))
-        
-        imagenes['auto_azul'] = pygame.image.load(os.path.join("image", "autoesquivaazul.png"))
-        imagenes['auto_azul'] = pygame.transform.scale(imagenes['auto_azul'], (90, 120))
+        imagenes['auto_naranja'] = assets.cargar(os.path.join("image", "autoesquivanaranja.png"), (90, 120))
+        imagenes['auto_violeta'] = assets.cargar(os.path.join("image", "autoesquivavioleta.png"), (90, 120))
+        imagenes['auto_azul'] = assets.cargar(os.path.join("image", "autoesquivaazul.png"), (90, 120))
 
-       
-        imagenes['camion'] = pygame.image.load(os.path.join("image", "camionesquiva.png"))
-        imagenes['camion'] = pygame.transform.scale(imagenes['camion'], (100, 150))
+        imagenes['camion'] = assets.cargar(os.path.join("image", "camionesquiva.png"), (100, 150))
         
         # Cargar imágenes de menú y game over
-        imagenes['game_over'] = pygame.image.load(os.path.join("image", "game_over_crash_run.png"))
-        imagenes['game_over'] = pygame.transform.scale(imagenes['game_over'], (ANCHO_PANTALLA, ALTO_PANTALLA))
-        
-        imagenes['menu'] = pygame.image.load(os.path.join("image", "menu_crash_run.png"))
-        imagenes['menu'] = pygame.transform.scale(imagenes['menu'], (ANCHO_PANTALLA, ALTO_PANTALLA))
+        imagenes['game_over'] = assets.cargar(os.path.join("image", "game_over_crash_run.png"), (ANCHO_PANTALLA, ALTO_PANTALLA), alpha=False)
+        imagenes['menu'] = assets.cargar(os.path.join("image", "menu_crash_run.png"), (ANCHO_PANTALLA, ALTO_PANTALLA), alpha=False)
         
         print("Imágenes cargadas correctamente")
     except Exception as e:
@@ -61,11 +55,9 @@ def cargar_imagenes():
     
     return imagenes
 
-def crear_pantalla():
-    """Crea la ventana del juego"""
-    pantalla = pygame.display.set_mode((ANCHO_PANTALLA, ALTO_PANTALLA))
-    pygame.display.set_caption("Juego de Carreras - Esquiva Autos")
-    return pantalla
+def crear_pantalla(pantalla=None):
+    """Prepara la ventana del juego reutilizando la existente"""
+    return game_host.ajustar_pantalla(pantalla, (ANCHO_PANTALLA, ALTO_PANTALLA), "Juego de Carreras - Esquiva Autos")
 
 def crear_coche():
     """Crea el coche del jugador"""
@@ -214,16 +206,16 @@ def dibujar_potenciador_detallado(pantalla, potenciador):
 
 def dibujar_interfaz(pantalla, fuente):
     """Dibuja la interfaz del usuario"""
-    texto_puntos = fuente.render(f"Puntos: {puntuacion}", True, BLANCO)
+    texto_puntos = text_cache.render(fuente, f"Puntos: {puntuacion}", BLANCO)
     pantalla.blit(texto_puntos, (10, 10))
     
-    texto_nivel = fuente.render(f"Nivel: {nivel}", True, BLANCO)
+    texto_nivel = text_cache.render(fuente, f"Nivel: {nivel}", BLANCO)
     pantalla.blit(texto_nivel, (10, 40))
 
-    texto_vidas = fuente.render(f"Vidas: {vidas}", True, BLANCO)
+    texto_vidas = text_cache.render(fuente, f"Vidas: {vidas}", BLANCO)
     pantalla.blit(texto_vidas, (10, 70))
     
-    texto_velocidad = fuente.render(f"Velocidad: {velocidad_base}", True, BLANCO)
+    texto_velocidad = text_cache.render(fuente, f"Velocidad: {velocidad_base}", BLANCO)
     pantalla.blit(texto_velocidad, (ANCHO_PANTALLA - 150, 10))
 
 def actualizar_nivel():
@@ -243,19 +235,19 @@ def pantalla_game_over(pantalla, fuente, imagenes):
     else:
         pantalla.fill(NEGRO)
         
-        titulo = pygame.font.Font(None, 72).render("GAME OVER", True, ROJO)
+        titulo = text_cache.texto("GAME OVER", 72, ROJO)
         rect_titulo = titulo.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2 - 100))
         pantalla.blit(titulo, rect_titulo)
         
-        texto_puntos = fuente.render(f"Puntuación Final: {puntuacion}", True, BLANCO)
+        texto_puntos = text_cache.render(fuente, f"Puntuación Final: {puntuacion}", BLANCO)
         rect_puntos = texto_puntos.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2 - 20))
         pantalla.blit(texto_puntos, rect_puntos)
 
-        texto_nivel = fuente.render(f"Nivel Alcanzado: {nivel}", True, BLANCO)
+        texto_nivel = text_cache.render(fuente, f"Nivel Alcanzado: {nivel}", BLANCO)
         rect_nivel = texto_nivel.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2 + 20))
         pantalla.blit(texto_nivel, rect_nivel)
 
-        texto_reiniciar = fuente.render("Presiona ESPACIO para jugar de nuevo o ESC para salir", True, AMARILLO)
+        texto_reiniciar = text_cache.render(fuente, "Presiona ESPACIO para jugar de nuevo o ESC para salir", AMARILLO)
         rect_reiniciar = texto_reiniciar.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2 + 80))
         pantalla.blit(texto_reiniciar, rect_reiniciar)
 
@@ -263,7 +255,7 @@ def dibujar_cuenta_regresiva(pantalla, fuente):
     """Dibuja la pantalla de cuenta regresiva"""
     global tiempo_inicio_cuenta
 
-    tiempo_transcurrido = pygame.time.get_ticks() - tiempo_inicio_cuenta
+    tiempo_transcurrido = game_loop.ticks() - tiempo_inicio_cuenta
     tiempo_restante = 3 - int(tiempo_transcurrido / 1000)
     
     if tiempo_restante > 0:
@@ -272,11 +264,11 @@ def dibujar_cuenta_regresiva(pantalla, fuente):
         overlay.fill(NEGRO)
         pantalla.blit(overlay, (0, 0))
         
-        texto_cuenta = pygame.font.Font(None, 150).render(str(tiempo_restante), True, AMARILLO)
+        texto_cuenta = text_cache.texto(tiempo_restante, 150, AMARILLO)
         rect_cuenta = texto_cuenta.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2))
         pantalla.blit(texto_cuenta, rect_cuenta)
         
-        texto_preparate = fuente.render("¡PREPÁRATE!", True, BLANCO)
+        texto_preparate = text_cache.render(fuente, "¡PREPÁRATE!", BLANCO)
         rect_preparate = texto_preparate.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2 + 80))
         pantalla.blit(texto_preparate, rect_preparate)
 
@@ -296,50 +288,58 @@ def mostrar_menu(pantalla, fuente, imagenes):
     else:
         pantalla.fill(NEGRO)
         
-        titulo = pygame.font.Font(None, 72).render("Esquiva Autos", True, VERDE)
+        titulo = text_cache.texto("Esquiva Autos", 72, VERDE)
         rect_titulo = titulo.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2 - 100))
         pantalla.blit(titulo, rect_titulo)
         
-        opcion_jugar = fuente.render("Presiona ESPACIO para Jugar", True, AMARILLO)
+        opcion_jugar = text_cache.render(fuente, "Presiona ESPACIO para Jugar", AMARILLO)
         rect_jugar = opcion_jugar.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2))
         pantalla.blit(opcion_jugar, rect_jugar)
         
-        opcion_salir = fuente.render("Presiona ESC para Salir", True, AMARILLO)
+        opcion_salir = text_cache.render(fuente, "Presiona ESC para Salir", AMARILLO)
         rect_salir = opcion_salir.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2 + 50))
         pantalla.blit(opcion_salir, rect_salir)
         
-        controles = fuente.render("Usa las flechas o WASD para moverte", True, BLANCO)
+        controles = text_cache.render(fuente, "Usa las flechas o WASD para moverte", BLANCO)
         rect_controles = controles.get_rect(center=(ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2 + 120))
         pantalla.blit(controles, rect_controles)
     
-    pygame.display.flip()
+    game_loop.flip()
 
-def juego_principal():
-    """Función principal del juego"""
+def run(pantalla, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
     global puntuacion, vidas
     
-    pantalla = crear_pantalla()
+    pantalla = crear_pantalla(pantalla)
     reloj = pygame.time.Clock()
-    fuente = pygame.font.Font(None, 36)
+    fuente = text_cache.fuente(36)
 
     imagenes = cargar_imagenes()
 
-    mostrar_menu(pantalla, fuente, imagenes)
-
     ejecutando = True
     while ejecutando:
-        for evento in pygame.event.get():
+        # Un frame de verdad por vuelta: sin tick el bucle giraba sin parar y cada vuelta
+        # era un frame más en la grabación
+        mostrar_menu(pantalla, fuente, imagenes)
+        game_loop.tick(reloj, FPS)
+
+        for evento in game_loop.eventos():
             if evento.type == pygame.QUIT:
-                ejecutando = False
+                pygame.quit()
+                sys.exit()
             elif evento.type == pygame.KEYDOWN:
                 if evento.key == pygame.K_SPACE:
                     # Iniciar el juego
+                    reiniciar_juego()
                     juego_activo(imagenes)
                     ejecutando = False
                 elif evento.key == pygame.K_ESCAPE:
                     # Salir del juego
                     ejecutando = False
 
+def juego_principal():
+    """Función principal del juego"""
+    run(pygame.display.set_mode((ANCHO_PANTALLA, ALTO_PANTALLA)))
     pygame.quit()
 
 def juego_activo(imagenes):
@@ -348,7 +348,7 @@ def juego_activo(imagenes):
     
     pantalla = crear_pantalla()
     reloj = pygame.time.Clock()
-    fuente = pygame.font.Font(None, 36)
+    fuente = text_cache.fuente(36)
 
     coche = crear_coche()
 
@@ -362,16 +362,17 @@ def juego_activo(imagenes):
     tiempo_mensaje = 0
 
     estado_juego = "cuenta_regresiva"
-    tiempo_inicio_cuenta = pygame.time.get_ticks()
+    tiempo_inicio_cuenta = game_loop.ticks()
     
     ejecutando = True
     
     while ejecutando:
-        dt = reloj.tick(FPS)
+        dt = game_loop.tick(reloj, FPS)
 
-        for evento in pygame.event.get():
+        for evento in game_loop.eventos():
             if evento.type == pygame.QUIT:
-                ejecutando = False
+                pygame.quit()
+                sys.exit()
             elif evento.type == pygame.KEYDOWN:
                 if estado_juego == "game_over":
                     if evento.key == pygame.K_SPACE:
@@ -383,12 +384,14 @@ def juego_activo(imagenes):
                         tiempo_potenciador = 0
                         mensaje_potenciador = ""
                         tiempo_mensaje = 0
-                        tiempo_inicio_cuenta = pygame.time.get_ticks()
+                        tiempo_inicio_cuenta = game_loop.ticks()
                     elif evento.key == pygame.K_ESCAPE:
                         ejecutando = False
         
+        game_loop.fase("eventos")
+        
         if estado_juego == "cuenta_regresiva":
-            tiempo_transcurrido = pygame.time.get_ticks() - tiempo_inicio_cuenta
+            tiempo_transcurrido = game_loop.ticks() - tiempo_inicio_cuenta
             if tiempo_transcurrido >= 3000:
                 estado_juego = "jugando"
             
@@ -401,7 +404,7 @@ def juego_activo(imagenes):
         elif estado_juego == "jugando":
             offset_carretera += velocidad_base
             
-            teclas = pygame.key.get_pressed()
+            teclas = game_loop.teclas()
             
             mover_coche(coche, teclas)
             
@@ -429,13 +432,14 @@ def juego_activo(imagenes):
                 if detectar_colision(coche, potenciador):
                     potenciadores.remove(potenciador)
                     mensaje_potenciador = aplicar_potenciador(potenciador, coche)
-                    tiempo_mensaje = pygame.time.get_ticks()
+                    tiempo_mensaje = game_loop.ticks()
 
             puntuacion += 1
 
             if actualizar_nivel():
                 mensaje_potenciador = f"¡Nivel {nivel}!"
-                tiempo_mensaje = pygame.time.get_ticks()
+                tiempo_mensaje = game_loop.ticks()
+            game_loop.fase("update")
 
             dibujar_carretera(pantalla, offset_carretera)
 
@@ -449,19 +453,17 @@ def juego_activo(imagenes):
 
             dibujar_interfaz(pantalla, fuente)
 
-            if mensaje_potenciador and pygame.time.get_ticks() - tiempo_mensaje < 2000:
-                texto_mensaje = fuente.render(mensaje_potenciador, True, AMARILLO)
+            if mensaje_potenciador and game_loop.ticks() - tiempo_mensaje < 2000:
+                texto_mensaje = text_cache.render(fuente, mensaje_potenciador, AMARILLO)
                 rect_mensaje = texto_mensaje.get_rect(center=(ANCHO_PANTALLA // 2, 150))
                 pantalla.blit(texto_mensaje, rect_mensaje)
-            elif pygame.time.get_ticks() - tiempo_mensaje >= 2000:
+            elif game_loop.ticks() - tiempo_mensaje >= 2000:
                 mensaje_potenciador = ""
         
         elif estado_juego == "game_over":
             pantalla_game_over(pantalla, fuente, imagenes)
         
-        pygame.display.flip()
-    
-    pygame.quit()
+        game_loop.flip()
 
 if __name__ == "__main__":
     juego_principal()
\ No newline at end of file
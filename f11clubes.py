@@ -1,16 +1,19 @@
 import pygame
 import json
 import random
-import time
+import sys
+
+import game_host
+import game_loop
+import player_db
 
 # Inicializar Pygame
 pygame.init()
 
-# Configuración de pantalla
+# Configuración de pantalla (la ventana la entrega run())
 ANCHO = 1200
 ALTO = 800
-pantalla = pygame.display.set_mode((ANCHO, ALTO))
-pygame.display.set_caption("Fútbol 11 - Clubes")
+pantalla = None
 
 # Colores
 VERDE_OSCURO = (34, 139, 34)
@@ -29,10 +32,8 @@ fuente_mediana = pygame.font.Font(None, 32)
 fuente_pequena = pygame.font.Font(None, 24)
 fuente_mini = pygame.font.Font(None, 18)
 
-# Cargar datos
-with open('basededatos.json', 'r', encoding='utf-8') as f:
-    datos = json.load(f)
-    jugadores = datos['jugadores']
+# Base de jugadores compilada (se comparte con los demás juegos que usan la base)
+indice = player_db.abrir('basededatos.json')
 
 with open('config.json', 'r', encoding='utf-8') as f:
     config = json.load(f)
@@ -165,11 +166,12 @@ class Juego:
         self.mensaje_original = self.mensaje
         self.juego_completo = False
         self.formacion_actual = random.choice(list(FORMACIONES.keys()))
-        self.tiempo_mensaje_error = 0
+        self.tiempo_mensaje_error = None
         self.jugador_pendiente = None
         self.posiciones_disponibles_jugador = []
         self.mostrando_selector_posicion = False
         self.mostrando_menu_pausa = False
+        self._cache_disponibles = (None, [])
     
     def obtener_posiciones_formacion(self):
         """Obtener todos los IDs de posiciones en la formación actual"""
@@ -203,7 +205,7 @@ class Juego:
         # Verificar si el jugador es del equipo correcto
         if club_actual != self.equipo_actual:
             self.mensaje = f"❌ {nombre_completo} no juega en {self.equipo_actual}"
-            self.tiempo_mensaje_error = time.time()
+            self.tiempo_mensaje_error = game_loop.ticks()
             return
         
         # Obtener posiciones válidas y disponibles
@@ -212,7 +214,7 @@ class Juego:
         
         if not posiciones_disponibles:
             self.mensaje = f"❌ No hay lugar para {nombre_completo} en la formación"
-            self.tiempo_mensaje_error = time.time()
+            self.tiempo_mensaje_error = game_loop.ticks()
             return
         
         # Si hay más de una posición disponible, mostrar selector
@@ -260,34 +262,23 @@ class Juego:
         if not self.busqueda:
             return []
         
-        disponibles = []
-        busqueda_lower = self.busqueda.lower()
+        # Se llama en cada frame: solo se vuelve a buscar si cambió el texto o la formación
+        clave = (self.busqueda, len(self.jugadores_colocados))
+        if self._cache_disponibles[0] == clave:
+            return self._cache_disponibles[1]
         
-        for j in jugadores:
-            if not any(jc['jugador']['id'] == j['id'] for jc in self.jugadores_colocados):
-                # Buscar por nombre completo (que puede incluir apellido)
-                nombre_completo = j.get('nombre', '').lower()
-                apodo = j.get('apodo', '').lower()
-                
-                # Dividir el nombre en palabras para buscar por cualquier parte
-                palabras_nombre = nombre_completo.split()
-                palabras_apodo = apodo.split()
-                
-                # Coincide si alguna palabra empieza con la búsqueda
-                if any(palabra.startswith(busqueda_lower) for palabra in palabras_nombre):
-                    disponibles.append(j)
-                elif any(palabra.startswith(busqueda_lower) for palabra in palabras_apodo):
-                    disponibles.append(j)
-        
-        # Ordenar alfabéticamente por nombre completo
-        disponibles.sort(key=lambda x: x.get('nombre', '').lower())
+        # Coincide si alguna palabra del nombre o apodo empieza con la búsqueda
+        # (el índice ya devuelve en orden alfabético por nombre completo)
+        colocados = {jc['jugador']['id'] for jc in self.jugadores_colocados}
+        disponibles = indice.buscar_prefijo(self.busqueda, excluir_ids=colocados)
+        self._cache_disponibles = (clave, disponibles)
         return disponibles
     
     def actualizar_mensaje(self):
         """Restaurar el mensaje original después de 3 segundos"""
-        if self.tiempo_mensaje_error > 0 and time.time() - self.tiempo_mensaje_error > 3:
+        if self.tiempo_mensaje_error is not None and game_loop.ticks() - self.tiempo_mensaje_error > 3000:
             self.mensaje = self.mensaje_original
-            self.tiempo_mensaje_error = 0
+            self.tiempo_mensaje_error = None
 
 def dibujar_campo():
     # Fondo del campo
@@ -392,7 +383,7 @@ def dibujar_panel_jugadores(juego):
                 
                 # Botón seleccionar
                 boton_rect = pygame.Rect(840, y, 320, 45)
-                if boton_rect.collidepoint(pygame.mouse.get_pos()):
+                if boton_rect.collidepoint(game_loop.mouse_pos()):
                     pygame.draw.rect(pantalla, AMARILLO, (840, y, 320, 45), 2)
     else:
         # Juego completo
@@ -462,7 +453,7 @@ def dibujar_selector_posicion(juego):
         pygame.draw.rect(pantalla, BLANCO, boton_rect, 2)
         
         # Hover effect
-        if boton_rect.collidepoint(pygame.mouse.get_pos()):
+        if boton_rect.collidepoint(game_loop.mouse_pos()):
             pygame.draw.rect(pantalla, AMARILLO, boton_rect, 3)
         
         # Texto con nombre completo y abreviatura
@@ -476,7 +467,7 @@ def dibujar_selector_posicion(juego):
     pygame.draw.rect(pantalla, ROJO, boton_cancelar)
     pygame.draw.rect(pantalla, BLANCO, boton_cancelar, 2)
     
-    if boton_cancelar.collidepoint(pygame.mouse.get_pos()):
+    if boton_cancelar.collidepoint(game_loop.mouse_pos()):
         pygame.draw.rect(pantalla, AMARILLO, boton_cancelar, 3)
     
     texto_cancelar = fuente_mediana.render("Cancelar", True, BLANCO)
@@ -512,7 +503,7 @@ def dibujar_menu_pausa():
         {"texto": "Salir", "y": panel_y + 260, "color": ROJO}
     ]
     
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = game_loop.mouse_pos()
     
     for boton in botones:
         boton_rect = pygame.Rect(panel_x + 50, boton["y"], panel_w - 100, 50)
@@ -529,7 +520,10 @@ def dibujar_menu_pausa():
     
     return botones, panel_x, panel_w
 
-def main():
+def run(surface, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale desde el menú"""
+    global pantalla
+    pantalla = game_host.ajustar_pantalla(surface, (ANCHO, ALTO), "Fútbol 11 - Clubes")
     reloj = pygame.time.Clock()
     juego = Juego()
     ejecutando = True
@@ -538,9 +532,10 @@ def main():
         # Actualizar mensaje si hay error temporal
         juego.actualizar_mensaje()
         
-        for evento in pygame.event.get():
+        for evento in game_loop.eventos():
             if evento.type == pygame.QUIT:
-                ejecutando = False
+                pygame.quit()
+                sys.exit()
             
             elif evento.type == pygame.KEYDOWN:
                 if juego.mostrando_selector_posicion:
@@ -569,7 +564,7 @@ def main():
                     juego.reiniciar()
             
             elif evento.type == pygame.MOUSEBUTTONDOWN:
-                x, y = pygame.mouse.get_pos()
+                x, y = game_loop.mouse_pos()
                 
                 # Click en menú de pausa
                 if juego.mostrando_menu_pausa:
@@ -684,9 +679,11 @@ def main():
         if juego.mostrando_menu_pausa:
             dibujar_menu_pausa()
         
-        pygame.display.flip()
-        reloj.tick(60)
-    
+        game_loop.flip()
+        game_loop.tick(reloj, 60)
+
+def main():
+    run(pygame.display.set_mode((ANCHO, ALTO)))
     pygame.quit()
 
 if __name__ == "__main__":
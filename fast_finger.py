@@ -1,8 +1,12 @@
 import pygame
 import sys
-import time
 import os
 
+import assets
+import game_host
+import game_loop
+import text_cache
+
 pygame.init()
 
 ANCHO = 800
@@ -19,34 +23,44 @@ AMARILLO = (255, 255, 100)
 GRIS = (128, 128, 128)
 GRIS_CLARO = (200, 200, 200)
 
-pantalla = pygame.display.set_mode((ANCHO, ALTO))
-pygame.display.set_caption("Carrera de Teclas")
+CAPTION = "Carrera de Teclas"
+
+pantalla = None
 reloj = pygame.time.Clock()
-fuente_grande = pygame.font.Font(None, 48)
-fuente_mediana = pygame.font.Font(None, 32)
-fuente_pequeña = pygame.font.Font(None, 24)
-
-try:
-    auto_rojo = pygame.image.load(os.path.join("image", "carreraautorojo.png"))
-    auto_azul = pygame.image.load(os.path.join("image", "carreraautoazul.png"))
-    auto_rojo = pygame.transform.scale(auto_rojo, (50, 50))
-    auto_azul = pygame.transform.scale(auto_azul, (50, 50))
-except:
-    auto_rojo = None
-    auto_azul = None
-    print("Advertencia: No se pudieron cargar las imágenes de los autos")
-
-try:
-    menu_image = pygame.image.load(os.path.join("image", "menu_fast_fingers.png"))
-    victoria_j1_image = pygame.image.load(os.path.join("image", "jugador_1_victoria_fast_fingers.png"))
-    victoria_j2_image = pygame.image.load(os.path.join("image", "jugador_2_victoria_fast_fingers.png"))
-    usar_imagenes = True
-except:
-    menu_image = None
-    victoria_j1_image = None
-    victoria_j2_image = None
-    usar_imagenes = False
-    print("Advertencia: No se pudieron cargar las imágenes del menú/victoria")
+fuente_grande = text_cache.fuente(48)
+fuente_mediana = text_cache.fuente(32)
+fuente_pequeña = text_cache.fuente(24)
+
+auto_rojo = None
+auto_azul = None
+menu_image = None
+victoria_j1_image = None
+victoria_j2_image = None
+usar_imagenes = False
+
+def cargar_imagenes():
+    """Obtiene las imágenes del juego desde la caché compartida, ya escaladas y convertidas"""
+    global auto_rojo, auto_azul, menu_image, victoria_j1_image, victoria_j2_image, usar_imagenes
+
+    try:
+        auto_rojo = assets.cargar(os.path.join("image", "carreraautorojo.png"), (50, 50))
+        auto_azul = assets.cargar(os.path.join("image", "carreraautoazul.png"), (50, 50))
+    except:
+        auto_rojo = None
+        auto_azul = None
+        print("Advertencia: No se pudieron cargar las imágenes de los autos")
+
+    try:
+        menu_image = assets.cargar(os.path.join("image", "menu_fast_fingers.png"), (ANCHO, ALTO), alpha=False)
+        victoria_j1_image = assets.cargar(os.path.join("image", "jugador_1_victoria_fast_fingers.png"), (ANCHO, ALTO), alpha=False)
+        victoria_j2_image = assets.cargar(os.path.join("image", "jugador_2_victoria_fast_fingers.png"), (ANCHO, ALTO), alpha=False)
+        usar_imagenes = True
+    except:
+        menu_image = None
+        victoria_j1_image = None
+        victoria_j2_image = None
+        usar_imagenes = False
+        print("Advertencia: No se pudieron cargar las imágenes del menú/victoria")
 
 estado_juego = "menu" 
 posicion_j1 = 50
@@ -57,16 +71,15 @@ tiempo_inicio_cuenta = 0
 def dibujar_menu():
     """Dibuja el menú principal"""
     if usar_imagenes and menu_image:
-        scaled_image = pygame.transform.scale(menu_image, (ANCHO, ALTO))
-        pantalla.blit(scaled_image, (0, 0))
+        pantalla.blit(menu_image, (0, 0))
     else:
         pantalla.fill(AZUL)
 
-        titulo = fuente_grande.render("CARRERA DE TECLAS", True, BLANCO)
+        titulo = text_cache.render(fuente_grande, "CARRERA DE TECLAS", BLANCO)
         rect_titulo = titulo.get_rect(center=(ANCHO//2, 150))
         pantalla.blit(titulo, rect_titulo)
 
-        subtitulo = fuente_mediana.render("¡Presiona las teclas más rápido para ganar!", True, BLANCO)
+        subtitulo = text_cache.render(fuente_mediana, "¡Presiona las teclas más rápido para ganar!", BLANCO)
         rect_subtitulo = subtitulo.get_rect(center=(ANCHO//2, 200))
         pantalla.blit(subtitulo, rect_subtitulo)
 
@@ -87,12 +100,12 @@ def dibujar_menu():
                 else:
                     color = BLANCO
                 
-                texto = fuente_pequeña.render(linea, True, color)
+                texto = text_cache.render(fuente_pequeña, linea, color)
                 rect_texto = texto.get_rect(center=(ANCHO//2, y_inicio + i*30))
                 pantalla.blit(texto, rect_texto)
 
         pygame.draw.rect(pantalla, VERDE, (ANCHO//2 - 100, 450, 200, 50))
-        texto_boton = fuente_mediana.render("INICIAR", True, NEGRO)
+        texto_boton = text_cache.render(fuente_mediana, "INICIAR", NEGRO)
         rect_boton = texto_boton.get_rect(center=(ANCHO//2, 475))
         pantalla.blit(texto_boton, rect_boton)
 
@@ -108,13 +121,13 @@ def dibujar_pista():
 
     pygame.draw.line(pantalla, AMARILLO, (META, 100), (META, 500), 5)
 
-    texto_j1 = fuente_mediana.render("Jugador 1 - Tecla 'A'", True, ROJO)
+    texto_j1 = text_cache.render(fuente_mediana, "Jugador 1 - Tecla 'A'", ROJO)
     pantalla.blit(texto_j1, (50, 120))
     
-    texto_j2 = fuente_mediana.render("Jugador 2 - Tecla 'L'", True, AZUL)
+    texto_j2 = text_cache.render(fuente_mediana, "Jugador 2 - Tecla 'L'", AZUL)
     pantalla.blit(texto_j2, (50, 320))
 
-    texto_meta = fuente_pequeña.render("META", True, NEGRO)
+    texto_meta = text_cache.render(fuente_pequeña, "META", NEGRO)
     pantalla.blit(texto_meta, (META + 10, 300))
 
 def dibujar_corredores():
@@ -145,10 +158,10 @@ def dibujar_progreso():
     pygame.draw.rect(pantalla, AZUL, (500, 50, ancho_barra_j2, 20))
     pygame.draw.rect(pantalla, NEGRO, (500, 50, 200, 20), 2)
 
-    texto_prog1 = fuente_pequeña.render(f"J1: {int(progreso_j1*100)}%", True, NEGRO)
+    texto_prog1 = text_cache.render(fuente_pequeña, f"J1: {int(progreso_j1*100)}%", NEGRO)
     pantalla.blit(texto_prog1, (50, 25))
     
-    texto_prog2 = fuente_pequeña.render(f"J2: {int(progreso_j2*100)}%", True, NEGRO)
+    texto_prog2 = text_cache.render(fuente_pequeña, f"J2: {int(progreso_j2*100)}%", NEGRO)
     pantalla.blit(texto_prog2, (500, 25))
 
 def dibujar_juego():
@@ -157,7 +170,7 @@ def dibujar_juego():
     dibujar_corredores()
     dibujar_progreso()
     
-    texto_inst = fuente_pequeña.render("¡Presiona tu tecla repetidamente! ESC para volver al menú", True, NEGRO)
+    texto_inst = text_cache.render(fuente_pequeña, "¡Presiona tu tecla repetidamente! ESC para volver al menú", NEGRO)
     rect_inst = texto_inst.get_rect(center=(ANCHO//2, ALTO - 30))
     pantalla.blit(texto_inst, rect_inst)
 
@@ -167,8 +180,8 @@ def dibujar_cuenta_regresiva():
     dibujar_corredores()
     dibujar_progreso()
 
-    tiempo_transcurrido = time.time() - tiempo_inicio_cuenta
-    tiempo_restante = 3 - int(tiempo_transcurrido)
+    tiempo_transcurrido = game_loop.ticks() - tiempo_inicio_cuenta
+    tiempo_restante = 3 - tiempo_transcurrido // 1000
     
     if tiempo_restante > 0:
         overlay = pygame.Surface((ANCHO, ALTO))
@@ -176,11 +189,11 @@ def dibujar_cuenta_regresiva():
         overlay.fill(NEGRO)
         pantalla.blit(overlay, (0, 0))
         
-        texto_cuenta = pygame.font.Font(None, 150).render(str(tiempo_restante), True, AMARILLO)
+        texto_cuenta = text_cache.render(text_cache.fuente(150), tiempo_restante, AMARILLO)
         rect_cuenta = texto_cuenta.get_rect(center=(ANCHO//2, ALTO//2))
         pantalla.blit(texto_cuenta, rect_cuenta)
         
-        texto_preparate = fuente_mediana.render("¡PREPÁRATE!", True, BLANCO)
+        texto_preparate = text_cache.render(fuente_mediana, "¡PREPÁRATE!", BLANCO)
         rect_preparate = texto_preparate.get_rect(center=(ANCHO//2, ALTO//2 + 80))
         pantalla.blit(texto_preparate, rect_preparate)
 
@@ -188,23 +201,21 @@ def dibujar_pantalla_ganador():
     """Dibuja la pantalla del ganador"""
     if usar_imagenes:
         if ganador == 1 and victoria_j1_image:
-            scaled_image = pygame.transform.scale(victoria_j1_image, (ANCHO, ALTO))
-            pantalla.blit(scaled_image, (0, 0))
+            pantalla.blit(victoria_j1_image, (0, 0))
             return
         elif ganador == 2 and victoria_j2_image:
-            scaled_image = pygame.transform.scale(victoria_j2_image, (ANCHO, ALTO))
-            pantalla.blit(scaled_image, (0, 0))
+            pantalla.blit(victoria_j2_image, (0, 0))
             return
     
     pantalla.fill(VERDE)
 
     color_ganador = ROJO if ganador == 1 else AZUL
     
-    texto_ganador = fuente_grande.render(f"¡JUGADOR {ganador} GANA!", True, color_ganador)
+    texto_ganador = text_cache.render(fuente_grande, f"¡JUGADOR {ganador} GANA!", color_ganador)
     rect_ganador = texto_ganador.get_rect(center=(ANCHO//2, 200))
     pantalla.blit(texto_ganador, rect_ganador)
 
-    felicitacion = fuente_mediana.render("¡Felicitaciones por tu victoria!", True, BLANCO)
+    felicitacion = text_cache.render(fuente_mediana, "¡Felicitaciones por tu victoria!", BLANCO)
     rect_felicitacion = felicitacion.get_rect(center=(ANCHO//2, 280))
     pantalla.blit(felicitacion, rect_felicitacion)
 
@@ -214,7 +225,7 @@ def dibujar_pantalla_ganador():
     ]
     
     for i, opcion in enumerate(opciones):
-        texto_opcion = fuente_pequeña.render(opcion, True, BLANCO)
+        texto_opcion = text_cache.render(fuente_pequeña, opcion, BLANCO)
         rect_opcion = texto_opcion.get_rect(center=(ANCHO//2, 350 + i*30))
         pantalla.blit(texto_opcion, rect_opcion)
 
@@ -226,7 +237,7 @@ def manejar_eventos():
     """Maneja todos los eventos del juego"""
     global estado_juego, posicion_j1, posicion_j2, ganador
     
-    for evento in pygame.event.get():
+    for evento in game_loop.eventos():
         if evento.type == pygame.QUIT:
             pygame.quit()
             sys.exit()
@@ -236,15 +247,13 @@ def manejar_eventos():
                 if evento.key == pygame.K_SPACE:
                     iniciar_cuenta_regresiva()
                 elif evento.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+                    return False
 
             elif estado_juego == "ganador":
                 if evento.key == pygame.K_SPACE:
                     iniciar_cuenta_regresiva()
                 elif evento.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+                    return False
 
             elif estado_juego == "juego":
                 if evento.key == pygame.K_ESCAPE:
@@ -255,6 +264,8 @@ def manejar_eventos():
                 elif evento.key == pygame.K_l:
                     mover_jugador(2)
 
+    return True
+
 def iniciar_cuenta_regresiva():
     """Inicia la cuenta regresiva antes del juego"""
     global estado_juego, posicion_j1, posicion_j2, ganador, tiempo_inicio_cuenta
@@ -262,7 +273,7 @@ def iniciar_cuenta_regresiva():
     posicion_j1 = 75
     posicion_j2 = 75
     ganador = None
-    tiempo_inicio_cuenta = time.time()
+    tiempo_inicio_cuenta = game_loop.ticks()
 
 def iniciar_juego():
     """Inicia una nueva partida"""
@@ -292,16 +303,26 @@ def actualizar_juego():
     global estado_juego
 
     if estado_juego == "cuenta_regresiva":
-        tiempo_transcurrido = time.time() - tiempo_inicio_cuenta
-        if tiempo_transcurrido >= 3:
+        tiempo_transcurrido = game_loop.ticks() - tiempo_inicio_cuenta
+        if tiempo_transcurrido >= 3000:
             iniciar_juego()
 
+def run(surface, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    global pantalla, estado_juego
+    pantalla = game_host.ajustar_pantalla(surface, (ANCHO, ALTO), CAPTION)
+    cargar_imagenes()
+    estado_juego = "menu"
+    ejecutar_juego()
+
 def ejecutar_juego():
     """Bucle principal del juego"""
     ejecutando = True
     
     while ejecutando:
-        manejar_eventos()
+        ejecutando = manejar_eventos()
+        if not ejecutando:
+            break
 
         actualizar_juego()
 
@@ -314,10 +335,9 @@ def ejecutar_juego():
         elif estado_juego == "ganador":
             dibujar_pantalla_ganador()
 
-        pygame.display.flip()
-        reloj.tick(FPS)
-    
-    pygame.quit()
+        game_loop.flip()
+        game_loop.tick(reloj, FPS)
 
 if __name__ == "__main__":
-    ejecutar_juego()
\ No newline at end of file
+    run(pygame.display.set_mode((ANCHO, ALTO)))
+    pygame.quit()
\ No newline at end of file
@@ -1,10 +1,15 @@
 import pygame
 import sys
 import random
+from collections import OrderedDict
+
+import assets
+import game_host
+import game_loop
+import text_cache
 
 
 pygame.init()
-pygame.display.set_caption("Flappy Bird - Pygame")
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -15,32 +20,44 @@ PIPE_SPEED = 3
 PIPE_GAP = 200
 BIRD_SIZE = 40
 
-fondo_img = pygame.image.load("image/fondo.png")
-bird_img = pygame.image.load("image/pajaro.png")
-pipe_img = pygame.image.load("image/tuberiapro.png")
-menu_img = pygame.image.load("image/menu_flappy.png")
-game_over_img = pygame.image.load("image/game_over_flappy.png")
+FONDO_IMG = "image/fondo.png"
+BIRD_IMG = "image/pajaro.png"
+PIPE_IMG = "image/tuberiapro.png"
+MENU_IMG = "image/menu_flappy.png"
+GAME_OVER_IMG = "image/game_over_flappy.png"
 
-bird_img = pygame.transform.scale(bird_img, (BIRD_SIZE, BIRD_SIZE))
 PIPE_WIDTH = 60  
 
+# Tubos ya escalados (y volteados los de arriba) por (alto, arriba), en orden de uso.
+# Las alturas salen de create_pipe y cada tubo se dibuja en cientos de frames seguidos
+MAX_PIPES = 64
+pipe_cache = OrderedDict()
+
 def draw_background(screen, W, H):
-    fondo_escalado = pygame.transform.scale(fondo_img, (W, H))
-    screen.blit(fondo_escalado, (0,0))
+    screen.blit(assets.cargar(FONDO_IMG, (W, H), alpha=False), (0,0))
 
 def draw_bird(screen, x, y):
-    screen.blit(bird_img, (int(x), int(y)))
+    screen.blit(assets.cargar(BIRD_IMG, (BIRD_SIZE, BIRD_SIZE)), (int(x), int(y)))
+
+def pipe_surface(height, top):
+    """Devuelve el tubo escalado a `height` (volteado si es el de arriba), creándolo una sola vez"""
+    key = (height, top)
+    if key in pipe_cache:
+        pipe_cache.move_to_end(key)
+        return pipe_cache[key]
+
+    surface = pygame.transform.scale(assets.cargar(PIPE_IMG), (PIPE_WIDTH, height))
+    if top:
+        surface = pygame.transform.flip(surface, False, True)
+    pipe_cache[key] = surface
+    if len(pipe_cache) > MAX_PIPES:
+        pipe_cache.popitem(last=False)
+    return surface
 
 def draw_pipes(screen, pipes):
     for pipe in pipes:
-        top_height = pipe["top"].height
-        top_scaled = pygame.transform.scale(pipe_img, (PIPE_WIDTH, top_height))
-        top_flipped = pygame.transform.flip(top_scaled, False, True)
-        screen.blit(top_flipped, (pipe["top"].x, pipe["top"].y))
-
-        bottom_height = pipe["bottom"].height
-        bottom_scaled = pygame.transform.scale(pipe_img, (PIPE_WIDTH, bottom_height))
-        screen.blit(bottom_scaled, (pipe["bottom"].x, pipe["bottom"].y))
+        screen.blit(pipe_surface(pipe["top"].height, True), (pipe["top"].x, pipe["top"].y))
+        screen.blit(pipe_surface(pipe["bottom"].height, False), (pipe["bottom"].x, pipe["bottom"].y))
 
 def check_collision(bird_rect, pipes, H):
     if bird_rect.top <= 0 or bird_rect.bottom >= H:
@@ -70,22 +87,22 @@ def update_score(pipes, bird_x, score):
     return score
 
 def draw_score(screen, score):
-    font = pygame.font.SysFont(None, 48)
-    txt = font.render(f"Puntaje: {score}", True, WHITE)
+    font = text_cache.fuente(48, sysfont=True)
+    txt = text_cache.render(font, f"Puntaje: {score}", WHITE)
     screen.blit(txt, (10,10))
 
 def countdown_screen(screen, W, H, bird_x, bird_y):
     """Muestra un contador de 3 segundos antes de iniciar el juego"""
     clock = pygame.time.Clock()
-    font = pygame.font.SysFont(None, 120)
+    font = text_cache.fuente(120, sysfont=True)
     
     for count in range(3, 0, -1):
-        start_time = pygame.time.get_ticks()
+        start_time = game_loop.ticks()
         
-        while pygame.time.get_ticks() - start_time < 1000:
-            clock.tick(FPS)
+        while game_loop.ticks() - start_time < 1000:
+            game_loop.tick(clock, FPS)
             
-            for event in pygame.event.get():
+            for event in game_loop.eventos():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 if event.type == pygame.KEYDOWN:
@@ -95,15 +112,15 @@ def countdown_screen(screen, W, H, bird_x, bird_y):
             draw_background(screen, W, H)
             draw_bird(screen, bird_x, bird_y)
             
-            txt = font.render(str(count), True, WHITE)
+            txt = text_cache.render(font, str(count), WHITE)
             txt_rect = txt.get_rect(center=(W//2, H//2))
             
-            shadow = font.render(str(count), True, BLACK)
+            shadow = text_cache.render(font, str(count), BLACK)
             shadow_rect = shadow.get_rect(center=(W//2 + 3, H//2 + 3))
             screen.blit(shadow, shadow_rect)
             screen.blit(txt, txt_rect)
             
-            pygame.display.flip()
+            game_loop.flip()
     
     return True
 
@@ -111,24 +128,24 @@ def wait_for_start(screen, W, H):
     clock = pygame.time.Clock()
     
     while True:
-        clock.tick(FPS)
+        game_loop.tick(clock, FPS)
         
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    return
+                    return True
                 if event.key == pygame.K_ESCAPE:
-                    pygame.quit(); sys.exit()
+                    return False
         
-        menu_escalado = pygame.transform.scale(menu_img, (W, H))
-        screen.blit(menu_escalado, (0, 0))
+        screen.blit(assets.cargar(MENU_IMG, (W, H), alpha=False), (0, 0))
         
-        pygame.display.flip()
+        game_loop.flip()
 
 def run_game(screen, W, H):
-    wait_for_start(screen, W, H)
+    if not wait_for_start(screen, W, H):
+        return None
     
     clock = pygame.time.Clock()
     bird_x = W//4
@@ -143,9 +160,9 @@ def run_game(screen, W, H):
         return score
 
     while True:
-        clock.tick(FPS)
+        game_loop.tick(clock, FPS)
 
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
@@ -154,6 +171,8 @@ def run_game(screen, W, H):
                 if event.key == pygame.K_ESCAPE:
                     return score
 
+        game_loop.fase("eventos")
+
         bird_vy += GRAVITY
         bird_y += bird_vy
         bird_rect = pygame.Rect(bird_x, bird_y, BIRD_SIZE, BIRD_SIZE)
@@ -170,41 +189,48 @@ def run_game(screen, W, H):
             return score
 
         score = update_score(pipes, bird_x, score)
+        game_loop.fase("update")
 
         draw_background(screen, W, H)
         draw_bird(screen, bird_x, bird_y)
         draw_pipes(screen, pipes)
         draw_score(screen, score)
 
-        pygame.display.flip()
+        game_loop.flip()
 
 def game_over_screen(screen, W, H, final_score):
     clock = pygame.time.Clock()
     
     while True:
-        clock.tick(FPS)
+        game_loop.tick(clock, FPS)
         
-        game_over_escalado = pygame.transform.scale(game_over_img, (W, H))
-        screen.blit(game_over_escalado, (0, 0))
+        screen.blit(assets.cargar(GAME_OVER_IMG, (W, H), alpha=False), (0, 0))
         
-        pygame.display.flip()
+        game_loop.flip()
         
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    return
+                    return True
                 elif event.key == pygame.K_ESCAPE:
-                    pygame.quit(); sys.exit()
+                    return False
 
-def main():
+def run(screen, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
     W,H = 800,600
-    screen = pygame.display.set_mode((W,H))
+    screen = game_host.ajustar_pantalla(screen, (W,H), "Flappy Bird - Pygame")
 
     while True:
         final_score = run_game(screen, W, H)
-        game_over_screen(screen, W, H, final_score)
+        if final_score is None:
+            return
+        if not game_over_screen(screen, W, H, final_score):
+            return
+
+def main():
+    run(pygame.display.set_mode((800,600)))
 
 if __name__ == "__main__":
     try:
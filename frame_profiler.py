@@ -0,0 +1,222 @@
+"""Overlay de rendimiento y trazas de los últimos segundos, común a todos los juegos.
+
+F3 (en cualquier juego) activa el perfilador: mide cada frame con las marcas de
+game_loop (eventos, update, draw, flip, espera) y dibuja arriba a la derecha los
+FPS, el 1% low y los milisegundos por fase. Mientras está activo, cuando un frame
+tarda más que su presupuesto (1/fps sin contar la espera del reloj) se guarda en
+trazas/ un JSON con los últimos SEGUNDOS_TRAZA segundos en formato Chrome trace
+(se abre con chrome://tracing o https://ui.perfetto.dev). F4 guarda una a mano.
+"""
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+
+import game_loop
+import text_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CARPETA_TRAZAS = os.path.join(BASE_DIR, "trazas")
+
+# Segundos de historia que se guardan en cada traza
+SEGUNDOS_TRAZA = 5.0
+# Mínimo de segundos entre dos trazas automáticas (escribir una ya demora un frame)
+PAUSA_ENTRE_TRAZAS = 10.0
+# Cada cuánto se vuelve a dibujar el texto del overlay
+REFRESCO_OVERLAY = 0.25
+
+FASES = ["eventos", "update", "draw", "flip", "espera", "otros"]
+
+
+class Perfilador(game_loop.Medidor):
+    """Medidor que guarda solo los últimos segundos, con el inicio y la duración de cada fase"""
+
+    def __init__(self, segundos=SEGUNDOS_TRAZA):
+        super().__init__()
+        self.segundos = segundos
+        # (inicio, fin, fps, [(fase, inicio, duración), ...]) de cada frame, en segundos de perf_counter
+        self.historial = deque()
+        self.trazas = []
+        self._segmentos = []
+        self._inicio_frame = self._ultima_marca
+        self._ultima_traza = float("-inf")
+        self._panel = None
+        self._panel_hasta = 0.0
+
+    def marcar(self, fase):
+        ahora = time.perf_counter()
+        self._segmentos.append((fase, self._ultima_marca, ahora - self._ultima_marca))
+        self._ultima_marca = ahora
+
+    def fin_frame(self, fps=None):
+        fin = self._ultima_marca
+        segmentos = self._segmentos
+        self.historial.append((self._inicio_frame, fin, fps, segmentos))
+        while self.historial and self.historial[0][1] < fin - self.segundos:
+            self.historial.popleft()
+        self._inicio_frame = fin
+        self._segmentos = []
+
+        # Los frames de carga justo después de activar no cuentan como tirones
+        if fps and fin - self._ultima_traza >= PAUSA_ENTRE_TRAZAS and fin - self.historial[0][0] >= 1.0:
+            trabajo = sum(duracion for fase, _, duracion in segmentos if fase != "espera")
+            if trabajo > 1 / fps:
+                self.volcar(f"frame de {trabajo * 1000:.1f} ms (presupuesto {1000 / fps:.1f} ms)")
+
+    def reiniciar(self):
+        """Descarta la historia (al activar, para no mezclar con lo medido antes)"""
+        self.historial.clear()
+        self._segmentos = []
+        self._ultima_marca = self._inicio_frame = time.perf_counter()
+        self._panel = None
+
+    # ------------------------------------------------------------------
+    # Estadísticas
+    # ------------------------------------------------------------------
+
+    def resumen(self, segundos=1.0):
+        """{fase: ms promedio por frame}, "total", "fps" y "1%_low" (ms) del último tramo medido"""
+        if not self.historial:
+            return {}
+        fin = self.historial[-1][1]
+        recientes = [frame for frame in self.historial if frame[1] >= fin - segundos]
+        fases = {}
+        for _, _, _, segmentos in recientes:
+            for fase, _, duracion in segmentos:
+                fases[fase] = fases.get(fase, 0.0) + duracion
+        resumen = {fase: total * 1000 / len(recientes) for fase, total in fases.items()}
+        resumen["total"] = sum(resumen.values())
+
+        duraciones = sorted(fin_frame - inicio for inicio, fin_frame, _, _ in self.historial)
+        peores = duraciones[-max(1, len(duraciones) // 100):]
+        resumen["1%_low"] = sum(peores) * 1000 / len(peores)
+        tramo = recientes[-1][1] - recientes[0][0]
+        resumen["fps"] = len(recientes) / tramo if tramo > 0 else 0.0
+        return resumen
+
+    # ------------------------------------------------------------------
+    # Overlay
+    # ------------------------------------------------------------------
+
+    def _crear_panel(self):
+        r = self.resumen()
+        if not r:
+            return None
+        lineas = [f"FPS {r['fps']:5.1f}   1% low {r['1%_low']:6.2f} ms"]
+        for fase in FASES:
+            if fase in r:
+                lineas.append(f"{fase:<8}{r[fase]:7.2f} ms")
+        if "perfil" in r:
+            lineas.append(f"{'overlay':<8}{r['perfil']:7.2f} ms")
+
+        font = text_cache.fuente(18, "consolas", sysfont=True)
+        alto_linea = font.get_linesize()
+        textos = [font.render(linea, True, (230, 230, 230)) for linea in lineas]
+        panel = pygame.Surface((max(t.get_width() for t in textos) + 12, alto_linea * len(textos) + 8),
+                               pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, superficie in enumerate(textos):
+            panel.blit(superficie, (6, 4 + i * alto_linea))
+        return panel
+
+    def dibujar(self, superficie):
+        if superficie is None:
+            return None
+        ahora = time.perf_counter()
+        if self._panel is None or ahora >= self._panel_hasta:
+            self._panel = self._crear_panel()
+            self._panel_hasta = ahora + REFRESCO_OVERLAY
+        pintado = None
+        if self._panel is not None:
+            pintado = superficie.blit(self._panel, (superficie.get_width() - self._panel.get_width() - 4, 4))
+        # El overlay no se cuenta como parte del juego
+        self.marcar("perfil")
+        return pintado
+
+    # ------------------------------------------------------------------
+    # Trazas
+    # ------------------------------------------------------------------
+
+    def eventos_traza(self):
+        """Historial en el formato de eventos de Chrome trace (microsegundos)"""
+        if not self.historial:
+            return []
+        origen = self.historial[0][0]
+        eventos = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "minijuegos"}},
+                   {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "bucle del juego"}}]
+        for numero, (inicio, fin, fps, segmentos) in enumerate(self.historial):
+            eventos.append({"name": "frame", "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                            "ts": (inicio - origen) * 1e6, "dur": (fin - inicio) * 1e6,
+                            "args": {"frame": numero, "fps": fps}})
+            for fase, comienzo, duracion in segmentos:
+                eventos.append({"name": fase, "cat": "fase", "ph": "X", "pid": 1, "tid": 1,
+                                "ts": (comienzo - origen) * 1e6, "dur": duracion * 1e6})
+        return eventos
+
+    def volcar(self, motivo, carpeta=CARPETA_TRAZAS):
+        """Guarda la traza de los últimos segundos y devuelve la ruta del archivo"""
+        self._ultima_traza = self._ultima_marca
+        if not self.historial:
+            return None
+        os.makedirs(carpeta, exist_ok=True)
+        nombre = time.strftime("traza_%Y%m%d_%H%M%S") + f"_{len(self.trazas)}.json"
+        ruta = os.path.join(carpeta, nombre)
+        try:
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": self.eventos_traza(), "displayTimeUnit": "ms",
+                           "otherData": {"motivo": motivo, "titulo": (pygame.display.get_caption() or ("",))[0]}}, f)
+        except OSError as error:
+            print(f"No se pudo guardar la traza: {error}")
+            return None
+        self.trazas.append(ruta)
+        print(f"Traza guardada en {ruta} ({motivo})")
+        # Escribir el archivo no es parte del frame siguiente
+        self._ultima_marca = time.perf_counter()
+        return ruta
+
+
+# Perfilador que maneja F3/F4 (se crea la primera vez que se activa)
+_perfilador = None
+# Medidor que estaba activo antes de prender el perfilador
+_anterior = None
+
+
+def activo():
+    return _perfilador is not None and game_loop.medidor_activo() is _perfilador
+
+
+def activar():
+    global _perfilador, _anterior
+    if activo():
+        return _perfilador
+    if _perfilador is None:
+        _perfilador = Perfilador()
+    _perfilador.reiniciar()
+    _anterior = game_loop.usar_medidor(_perfilador)
+    return _perfilador
+
+
+def desactivar():
+    global _anterior
+    if activo():
+        game_loop.usar_medidor(_anterior)
+        _anterior = None
+
+
+def alternar():
+    """F3: prende o apaga el overlay (y la medición que lo alimenta)"""
+    if activo():
+        desactivar()
+    else:
+        activar()
+
+
+def volcar_traza(motivo="manual"):
+    """F4: guarda la traza de los últimos segundos (activa el perfilador si estaba apagado)"""
+    if not activo():
+        activar()
+        print("Perfilador activado: la traza tendrá datos dentro de unos segundos (F3 para ver el overlay)")
+        return None
+    return _perfilador.volcar(motivo)
@@ -3,6 +3,12 @@ import sys
 import random
 import math
 
+import assets
+import backgrounds
+import game_host
+import game_loop
+import text_cache
+
 pygame.init()
 
 ANCHO = 1000
@@ -22,48 +28,49 @@ MARRON = (139, 69, 19)
 GRIS = (128, 128, 128)
 GRIS_OSCURO = (64, 64, 64)
 
-pantalla = pygame.display.set_mode((ANCHO, ALTO))
-pygame.display.set_caption("Corta Frutas - Fruit Ninja Style")
+CAPTION = "Corta Frutas - Fruit Ninja Style"
+
+pantalla = None
 reloj = pygame.time.Clock()
-fuente_grande = pygame.font.Font(None, 48)
-fuente_mediana = pygame.font.Font(None, 32)
-fuente_pequeña = pygame.font.Font(None, 24)
-
-try:
-    bg_menu = pygame.image.load("image/fondo_menu_ninja_fruit.png")
-    bg_menu = pygame.transform.scale(bg_menu, (ANCHO, ALTO))
-    print("Fondo de menú cargado correctamente")
-except Exception as e:
-    print(f"Error al cargar fondo de menú: {e}")
-    bg_menu = None
-
-try:
-    bg_game = pygame.image.load("image/fondo_ninja_fruit.png")
-    bg_game = pygame.transform.scale(bg_game, (ANCHO, ALTO))
-    print("Fondo de juego cargado correctamente")
-except Exception as e:
-    print(f"Error al cargar fondo de juego: {e}")
-    bg_game = None
-
-try:
-    bg_gameover = pygame.image.load("image/fondo_game_over_ninja_fruit.png")
-    bg_gameover = pygame.transform.scale(bg_gameover, (ANCHO, ALTO))
-    print("Fondo de game over cargado correctamente")
-except Exception as e:
-    print(f"Error al cargar fondo de game over: {e}")
-    bg_gameover = None
+fuente_grande = text_cache.fuente(48)
+fuente_mediana = text_cache.fuente(32)
+fuente_pequeña = text_cache.fuente(24)
+
+bg_menu = None
+bg_game = None
+bg_gameover = None
 
 imagenes_frutas = {}
 frutas_nombres = ["banana", "manzanafinal", "sandia", "anana"]
 
-for fruta in frutas_nombres:
+def cargar_imagenes():
+    """Obtiene fondos y frutas desde la caché compartida, ya escalados y convertidos"""
+    global bg_menu, bg_game, bg_gameover
+
+    try:
+        bg_menu = assets.cargar("image/fondo_menu_ninja_fruit.png", (ANCHO, ALTO), alpha=False)
+    except Exception as e:
+        print(f"Error al cargar fondo de menú: {e}")
+        bg_menu = None
+
+    try:
+        bg_game = assets.cargar("image/fondo_ninja_fruit.png", (ANCHO, ALTO), alpha=False)
+    except Exception as e:
+        print(f"Error al cargar fondo de juego: {e}")
+        bg_game = None
+
     try:
-        img = pygame.image.load(f"image/{fruta}.png")
-        img = pygame.transform.scale(img, (80, 80))
-        imagenes_frutas[fruta] = img
-    except:
-        print(f"No se pudo cargar la imagen: {fruta}.png")
-        imagenes_frutas[fruta] = None
+        bg_gameover = assets.cargar("image/fondo_game_over_ninja_fruit.png", (ANCHO, ALTO), alpha=False)
+    except Exception as e:
+        print(f"Error al cargar fondo de game over: {e}")
+        bg_gameover = None
+
+    for fruta in frutas_nombres:
+        try:
+            imagenes_frutas[fruta] = assets.cargar(f"image/{fruta}.png", (80, 80))
+        except:
+            print(f"No se pudo cargar la imagen: {fruta}.png")
+            imagenes_frutas[fruta] = None
 
 estado_juego = "menu" 
 puntuacion = 0
@@ -345,19 +352,17 @@ def dibujar_menu():
     if bg_menu:
         pantalla.blit(bg_menu, (0, 0))
     else:
-        for y in range(ALTO):
-            color = (20 + y//10, 30 + y//15, 50 + y//8)
-            pygame.draw.line(pantalla, color, (0, y), (ANCHO, y))
+        pantalla.blit(backgrounds.escalonado((ANCHO, ALTO), (20, 30, 50), (10, 15, 8)), (0, 0))
 
 def dibujar_hud():
-    texto_puntos = fuente_mediana.render(f"Puntos: {puntuacion}", True, AMARILLO)
+    texto_puntos = text_cache.render(fuente_mediana, f"Puntos: {puntuacion}", AMARILLO)
     pantalla.blit(texto_puntos, (20, 20))
     
-    texto_vidas = fuente_mediana.render(f"Vidas: {vidas}", True, ROJO)
+    texto_vidas = text_cache.render(fuente_mediana, f"Vidas: {vidas}", ROJO)
     pantalla.blit(texto_vidas, (ANCHO - 150, 20))
     
     tiempo_seg = tiempo_juego // FPS
-    texto_tiempo = fuente_pequeña.render(f"Tiempo: {tiempo_seg}s", True, BLANCO)
+    texto_tiempo = text_cache.render(fuente_pequeña, f"Tiempo: {tiempo_seg}s", BLANCO)
     pantalla.blit(texto_tiempo, (ANCHO//2 - 50, 20))
     
     for i in range(vidas):
@@ -377,9 +382,7 @@ def dibujar_juego():
     if bg_game:
         pantalla.blit(bg_game, (0, 0))
     else:
-        for y in range(ALTO):
-            color = (10 + y//20, 20 + y//25, 40 + y//15)
-            pygame.draw.line(pantalla, color, (0, y), (ANCHO, y))
+        pantalla.blit(backgrounds.escalonado((ANCHO, ALTO), (10, 20, 40), (20, 25, 15)), (0, 0))
     
     dibujar_trail_mouse()
     
@@ -437,15 +440,14 @@ def reiniciar_juego():
 def manejar_eventos():
     global estado_juego, trail_mouse
     
-    for evento in pygame.event.get():
+    for evento in game_loop.eventos():
         if evento.type == pygame.QUIT:
             pygame.quit()
             sys.exit()
         
         if evento.type == pygame.KEYDOWN:
             if evento.key == pygame.K_ESCAPE:
-                pygame.quit()
-                sys.exit()
+                return False
             
             if estado_juego == "menu":
                 if evento.key == pygame.K_SPACE:
@@ -463,14 +465,16 @@ def manejar_eventos():
                 if evento.key == pygame.K_p:
                     estado_juego = "menu"
     
-    if pygame.mouse.get_pressed()[0] and estado_juego == "juego":
-        pos_mouse = pygame.mouse.get_pos()
+    if game_loop.mouse_botones()[0] and estado_juego == "juego":
+        pos_mouse = game_loop.mouse_pos()
         trail_mouse.append(pos_mouse)
         if len(trail_mouse) > 20:
             trail_mouse.pop(0)
     else:
         trail_mouse.clear()
 
+    return True
+
 def actualizar_juego():
     global tiempo_spawn, puntuacion, vidas, estado_juego, tiempo_juego
     
@@ -507,8 +511,8 @@ def actualizar_juego():
         if not particula.esta_viva():
             particulas.remove(particula)
     
-    if pygame.mouse.get_pressed()[0] and len(trail_mouse) >= 2:
-        pos_actual = pygame.mouse.get_pos()
+    if game_loop.mouse_botones()[0] and len(trail_mouse) >= 2:
+        pos_actual = game_loop.mouse_pos()
         pos_anterior = trail_mouse[-2] if len(trail_mouse) >= 2 else trail_mouse[-1]
         
         for fruta in frutas:
@@ -522,12 +526,25 @@ def actualizar_juego():
                     vidas = 0
                     estado_juego = "game_over"
 
+def run(surface, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    global pantalla, estado_juego
+    pantalla = game_host.ajustar_pantalla(surface, (ANCHO, ALTO), CAPTION)
+    cargar_imagenes()
+    estado_juego = "menu"
+    reiniciar_juego()
+    ejecutar_juego()
+
 def ejecutar_juego():
     ejecutando = True
     
     while ejecutando:
-        manejar_eventos()
+        ejecutando = manejar_eventos()
+        if not ejecutando:
+            break
+        game_loop.fase("eventos")
         actualizar_juego()
+        game_loop.fase("update")
         
         if estado_juego == "menu":
             dibujar_menu()
@@ -536,10 +553,9 @@ def ejecutar_juego():
         elif estado_juego == "game_over":
             dibujar_game_over()
         
-        pygame.display.flip()
-        reloj.tick(FPS)
-    
-    pygame.quit()
+        game_loop.flip()
+        game_loop.tick(reloj, FPS)
 
 if __name__ == "__main__":
-    ejecutar_juego()
+    run(pygame.display.set_mode((ANCHO, ALTO)))
+    pygame.quit()
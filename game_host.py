@@ -0,0 +1,66 @@
+import importlib
+import os
+import sys
+
+import pygame
+
+# Módulos de juegos ya importados (nombre de módulo -> módulo)
+_modulos = {}
+
+
+def nombre_modulo(archivo):
+    """Convierte el nombre de archivo de un juego ('4_lineas.py') en su nombre de módulo"""
+    return os.path.splitext(os.path.basename(archivo))[0]
+
+
+def cargar_juego(archivo):
+    """Importa el módulo de un juego una sola vez y lo devuelve"""
+    nombre = nombre_modulo(archivo)
+    if nombre not in _modulos:
+        carpeta = os.path.dirname(os.path.abspath(__file__))
+        if carpeta not in sys.path:
+            sys.path.insert(0, carpeta)
+        modulo = importlib.import_module(nombre)
+        if not hasattr(modulo, "run"):
+            raise AttributeError(f"{archivo} no define run(screen, settings)")
+        _modulos[nombre] = modulo
+    return _modulos[nombre]
+
+
+def ajustar_pantalla(screen, tamaño, titulo=None):
+    """Devuelve la superficie de la ventana con el tamaño pedido.
+
+    Si la ventana ya tiene ese tamaño se reutiliza tal cual; si no, se
+    redimensiona la misma ventana (pygame 2 no la recrea) conservando el modo
+    pantalla completa.
+    """
+    if screen is None:
+        screen = pygame.display.get_surface()
+    tamaño = (int(tamaño[0]), int(tamaño[1]))
+    if screen is None or screen.get_size() != tamaño:
+        flags = screen.get_flags() & pygame.FULLSCREEN if screen else 0
+        screen = pygame.display.set_mode(tamaño, flags)
+    if titulo:
+        pygame.display.set_caption(titulo)
+    return screen
+
+
+def ejecutar_juego(archivo, screen, settings=None):
+    """Ejecuta un juego dentro del mismo proceso usando la ventana actual.
+
+    Devuelve True si se volvió normalmente al launcher y False si el juego
+    cerró la ventana (pygame.quit()).
+    """
+    modulo = cargar_juego(archivo)
+    tamaño = screen.get_size()
+    titulo = pygame.display.get_caption()[0]
+
+    try:
+        modulo.run(screen, settings or {})
+    finally:
+        # Restaurar la ventana para quien lanzó el juego
+        if pygame.display.get_init():
+            ajustar_pantalla(None, tamaño, titulo)
+            pygame.event.clear()
+
+    return pygame.display.get_init()
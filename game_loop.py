@@ -0,0 +1,311 @@
+"""Entrada, reloj y medición compartidos por los bucles de los juegos.
+
+Los juegos leen eventos, teclas y mouse a través de este módulo en lugar de
+llamar directo a pygame. Normalmente todo va a pygame; dentro de simular()
+la entrada sale de un script, el reloj no espera (cada frame dura 1/fps de
+tiempo virtual) y la simulación corta sola al llegar a la cantidad de frames
+pedida. Con medir() se registra cuánto tarda cada fase de cada frame.
+"""
+import time
+from contextlib import contextmanager
+
+import pygame
+
+# Entrada simulada activa (None = teclado y mouse reales)
+_entrada = None
+# Grabadora de la entrada real (None = sin grabar), ver replay.py
+_grabadora = None
+# Medidor activo (None = sin medir)
+_medidor = None
+# Frames que quedan en la simulación actual
+_frames_restantes = 0
+# Reloj virtual de la simulación, en milisegundos
+_tiempo_virtual = 0
+
+# Teclas globales del perfilador (frame_profiler): F3 muestra/oculta el overlay, F4 guarda una traza
+TECLA_PERFIL = pygame.K_F3
+TECLA_TRAZA = pygame.K_F4
+
+
+class FinSimulacion(Exception):
+    """La simulación llegó a la cantidad de frames pedida"""
+
+
+class _Teclas:
+    """Imita a pygame.key.get_pressed(): teclas[pygame.K_x] -> bool"""
+
+    def __init__(self, apretadas):
+        self.apretadas = frozenset(apretadas)
+
+    def __getitem__(self, tecla):
+        return tecla in self.apretadas
+
+
+class EntradaScript:
+    """Entrada generada frame a frame por una función.
+
+    `script(frame)` devuelve un diccionario con cualquiera de:
+      "teclas":  teclas mantenidas en ese frame (KEYDOWN/KEYUP al cambiar)
+      "pulsar":  teclas que solo generan un KEYDOWN en ese frame
+      "mouse":   posición del mouse
+      "botones": (izquierdo, medio, derecho) como bool
+
+    Cada frame dura exactamente 1/fps y get_ticks() es la suma de esos frames.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.frame = 0
+        self.apretadas = frozenset()
+        self.mouse = (0, 0)
+        self.botones = (False, False, False)
+
+    def _tecla(self, tipo, tecla):
+        nombre = pygame.key.name(tecla)
+        return pygame.event.Event(tipo, key=tecla, mod=0, scancode=0,
+                                  unicode=nombre if len(nombre) == 1 else "")
+
+    def siguiente_frame(self):
+        """Avanza un frame y devuelve los eventos que lo producen"""
+        estado = self.script(self.frame) or {}
+        self.frame += 1
+        eventos = []
+
+        apretadas = frozenset(estado.get("teclas", ()))
+        for tecla in apretadas - self.apretadas:
+            eventos.append(self._tecla(pygame.KEYDOWN, tecla))
+        for tecla in self.apretadas - apretadas:
+            eventos.append(self._tecla(pygame.KEYUP, tecla))
+        for tecla in estado.get("pulsar", ()):
+            eventos.append(self._tecla(pygame.KEYDOWN, tecla))
+        self.apretadas = apretadas
+
+        mouse = tuple(estado.get("mouse", self.mouse))
+        botones = tuple(bool(b) for b in estado.get("botones", self.botones))
+        if mouse != self.mouse:
+            eventos.append(pygame.event.Event(pygame.MOUSEMOTION, pos=mouse, buttons=botones,
+                                              rel=(mouse[0] - self.mouse[0], mouse[1] - self.mouse[1])))
+        for i, (antes, ahora) in enumerate(zip(self.botones, botones)):
+            if antes != ahora:
+                tipo = pygame.MOUSEBUTTONDOWN if ahora else pygame.MOUSEBUTTONUP
+                eventos.append(pygame.event.Event(tipo, pos=mouse, button=i + 1))
+        self.mouse, self.botones = mouse, botones
+        return eventos
+
+    def dt(self, fps):
+        """Milisegundos que devuelve tick() en este frame"""
+        return round(1000 / fps)
+
+    def ticks(self, tiempo_virtual):
+        """Valor de get_ticks() en este momento de la simulación"""
+        return tiempo_virtual
+
+
+class Medidor:
+    """Acumula el tiempo de cada fase (eventos, update, draw, flip, espera) por frame"""
+
+    def __init__(self):
+        self.frames = []
+        self._actual = {}
+        self._ultima_marca = time.perf_counter()
+
+    def marcar(self, fase):
+        """Atribuye a `fase` el tiempo transcurrido desde la marca anterior"""
+        ahora = time.perf_counter()
+        self._actual[fase] = self._actual.get(fase, 0.0) + ahora - self._ultima_marca
+        self._ultima_marca = ahora
+
+    def fin_frame(self, fps=None):
+        """Cierra el frame; `fps` es el objetivo que el juego le pasó a tick()"""
+        self.frames.append(self._actual)
+        self._actual = {}
+
+    def dibujar(self, superficie):
+        """Se llama justo antes de display.flip(); devuelve el rect que pintó (el base no pinta nada)"""
+        return None
+
+    def resumen(self):
+        """{fase: milisegundos promedio por frame} y el total por frame"""
+        if not self.frames:
+            return {}
+        fases = {}
+        for frame in self.frames:
+            for fase, segundos in frame.items():
+                fases[fase] = fases.get(fase, 0.0) + segundos
+        resumen = {fase: total * 1000 / len(self.frames) for fase, total in fases.items()}
+        resumen["total"] = sum(resumen.values())
+        return resumen
+
+
+def simulando():
+    return _entrada is not None
+
+
+def grabando():
+    return _grabadora is not None
+
+
+@contextmanager
+def simular(entrada, frames):
+    """Corre el bloque con entrada simulada y reloj sin espera; FinSimulacion corta a los `frames`"""
+    global _entrada, _frames_restantes, _tiempo_virtual
+    anterior = (_entrada, _frames_restantes, _tiempo_virtual)
+    _entrada, _frames_restantes, _tiempo_virtual = entrada, frames, 0
+    try:
+        yield
+    finally:
+        _entrada, _frames_restantes, _tiempo_virtual = anterior
+
+
+@contextmanager
+def grabar(grabadora):
+    """Pasa a `grabadora` todo lo que los juegos leen de la entrada y del reloj reales"""
+    global _grabadora
+    anterior = _grabadora
+    _grabadora = grabadora
+    try:
+        yield grabadora
+    finally:
+        _grabadora = anterior
+
+
+def usar_medidor(medidor):
+    """Activa `medidor` (o ninguno con None) y devuelve el que estaba activo"""
+    global _medidor
+    anterior = _medidor
+    _medidor = medidor
+    if medidor is not None:
+        medidor._ultima_marca = time.perf_counter()
+    return anterior
+
+
+def medidor_activo():
+    return _medidor
+
+
+@contextmanager
+def medir(medidor):
+    """Registra en `medidor` los tiempos por fase de los frames que corran dentro del bloque"""
+    anterior = usar_medidor(medidor)
+    try:
+        yield medidor
+    finally:
+        usar_medidor(anterior)
+
+
+def _atajos_perfil(lista):
+    """Atiende F3/F4 antes que el juego y los saca de la lista de eventos"""
+    if not any(e.type == pygame.KEYDOWN and e.key in (TECLA_PERFIL, TECLA_TRAZA) for e in lista):
+        return lista
+
+    import frame_profiler
+    resto = []
+    for evento in lista:
+        if evento.type == pygame.KEYDOWN and evento.key == TECLA_PERFIL:
+            frame_profiler.alternar()
+        elif evento.type == pygame.KEYDOWN and evento.key == TECLA_TRAZA:
+            frame_profiler.volcar_traza("manual")
+        else:
+            resto.append(evento)
+    return resto
+
+
+def eventos():
+    """Reemplazo de pygame.event.get(): cada llamada es un frame de entrada"""
+    global _frames_restantes
+    if _entrada is None:
+        lista = _atajos_perfil(pygame.event.get())
+        if _grabadora:
+            _grabadora.frame(lista)
+        return lista
+
+    if _frames_restantes <= 0:
+        raise FinSimulacion()
+    _frames_restantes -= 1
+    # La cola real se vacía igual para que la ventana no quede colgada
+    pygame.event.pump()
+    pygame.event.clear()
+    return _entrada.siguiente_frame()
+
+
+def teclas():
+    """Reemplazo de pygame.key.get_pressed()"""
+    if _entrada is None:
+        return pygame.key.get_pressed()
+    return _Teclas(_entrada.apretadas)
+
+
+def mouse_pos():
+    if _entrada is None:
+        return pygame.mouse.get_pos()
+    return _entrada.mouse
+
+
+def mouse_botones():
+    if _entrada is None:
+        return pygame.mouse.get_pressed()
+    return _entrada.botones
+
+
+def ticks():
+    """Reemplazo de pygame.time.get_ticks() (tiempo virtual dentro de simular())"""
+    if _entrada is None:
+        valor = pygame.time.get_ticks()
+        if _grabadora:
+            _grabadora.ticks(valor)
+        return valor
+    return _entrada.ticks(_tiempo_virtual)
+
+
+def esperar(ms):
+    """Reemplazo de pygame.time.wait(): en simulación solo avanza el reloj virtual"""
+    global _tiempo_virtual
+    if _entrada is None:
+        pygame.time.wait(ms)
+    else:
+        _tiempo_virtual += ms
+
+
+def tick(reloj, fps):
+    """Reemplazo de reloj.tick(fps); marca el fin del frame para el medidor"""
+    global _tiempo_virtual
+    if _medidor:
+        _medidor.marcar("otros")
+    if _entrada is None:
+        dt = reloj.tick(fps)
+        if _grabadora:
+            _grabadora.tick(dt)
+    else:
+        reloj.tick()
+        dt = _entrada.dt(fps)
+        _tiempo_virtual += dt
+    if _medidor:
+        _medidor.marcar("espera")
+        _medidor.fin_frame(fps)
+    return dt
+
+
+def fase(nombre):
+    """Marca el fin de una fase del frame: los juegos marcan "eventos" y "update"; flip() marca "draw" """
+    if _medidor:
+        _medidor.marcar(nombre)
+
+
+def flip(rects=None):
+    """Reemplazo de pygame.display.flip() que cuenta su tiempo como fase "flip".
+
+    Con `rects` solo se actualizan esas zonas (pygame.display.update). Devuelve
+    el rect que pintó el medidor encima del juego (el overlay de F3) o None:
+    quien actualiza por zonas tiene que repintar lo que quedó debajo.
+    """
+    pintado = None
+    if _medidor:
+        _medidor.marcar("draw")
+        pintado = _medidor.dibujar(pygame.display.get_surface())
+    if rects is None:
+        pygame.display.flip()
+    else:
+        pygame.display.update(list(rects) + [pintado] if pintado else rects)
+    if _medidor:
+        _medidor.marcar("flip")
+    return pintado
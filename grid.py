@@ -4,6 +4,13 @@ import json
 import random
 import sys
 
+import assets
+import game_host
+import game_loop
+import player_db
+import player_index
+import text_cache
+
 # Inicializar Pygame
 pygame.init()
 
@@ -29,21 +36,14 @@ NARANJA = (255, 165, 0)
 # Cargar base de datos
 def cargar_datos():
     try:
-        with open('basededatos.json', 'r', encoding='utf-8') as f:
-            datos = json.load(f)
+        # La base compilada se abre sin leer todos los jugadores: cada consulta trae solo lo que usa
+        indice = player_db.abrir('basededatos.json')
         with open('config.json', 'r', encoding='utf-8') as f:
             config = json.load(f)
         
-        if isinstance(datos, dict) and "jugadores" in datos:
-            jugadores = datos["jugadores"]
-        else:
-            jugadores = datos
-            
-        print(f"Cargados {len(jugadores)} jugadores")
-        if jugadores:
-            print(f"Ejemplo de jugador: {jugadores[0]}")
+        print(f"Cargados {indice.contar()} jugadores")
         
-        return jugadores, config
+        return indice, config
     except FileNotFoundError as e:
         print(f"Error: No se encontró el archivo {e.filename}")
         sys.exit(1)
@@ -51,86 +51,28 @@ def cargar_datos():
         print(f"Error al leer JSON: {e}")
         sys.exit(1)
 
-def cargar_imagenes():
+def cargar_imagenes(config):
+    """Obtiene los escudos de todos los equipos y selecciones del config desde la caché compartida"""
     imagenes = {}
-    try:
-        imagenes['AC Milan'] = pygame.image.load(os.path.join("image", "image_fut", "AC Milan.png"))
-        imagenes['AC Milan'] = pygame.transform.scale(imagenes['AC Milan'], (50,50))
-
-        imagenes['Inter de Milán'] = pygame.image.load(os.path.join("image", "image_fut", "Inter de Milán.png"))
-        imagenes['Inter de Milán'] = pygame.transform.scale(imagenes['Inter de Milán'], (50,50))
-
-        imagenes['Juventus'] = pygame.image.load(os.path.join("image", "image_fut", "Juventus.png"))
-        imagenes['Juventus'] = pygame.transform.scale(imagenes['Juventus'], (50,50))
-
-        imagenes['Real Madrid'] = pygame.image.load(os.path.join("image", "image_fut", "Real Madrid.png"))
-        imagenes['Real Madrid'] = pygame.transform.scale(imagenes['Real Madrid'], (50,50))
-
-        imagenes['Barcelona'] = pygame.image.load(os.path.join("image", "image_fut", "Barcelona.png"))
-        imagenes['Barcelona'] = pygame.transform.scale(imagenes['Barcelona'], (50,50))
-
-        imagenes['Atlético de Madrid'] = pygame.image.load(os.path.join("image", "image_fut", "Atlético de Madrid.png"))
-        imagenes['Atlético de Madrid'] = pygame.transform.scale(imagenes['Atlético de Madrid'], (50,50))
-
-        imagenes['Manchester United'] = pygame.image.load(os.path.join("image", "image_fut", "Manchester United.png"))
-        imagenes['Manchester United'] = pygame.transform.scale(imagenes['Manchester United'], (50,50))
-
-        imagenes['Liverpool'] = pygame.image.load(os.path.join("image", "image_fut", "Liverpool.png"))
-        imagenes['Liverpool'] = pygame.transform.scale(imagenes['Liverpool'], (50,50))
-
-        imagenes['Chelsea'] = pygame.image.load(os.path.join("image", "image_fut", "Chelsea.png"))
-        imagenes['Chelsea'] = pygame.transform.scale(imagenes['Chelsea'], (50,50))
-
-        imagenes['Manchester City'] = pygame.image.load(os.path.join("image", "image_fut", "Manchester City.png"))
-        imagenes['Manchester City'] = pygame.transform.scale(imagenes['Manchester City'], (50,50))
-
-        imagenes['Arsenal'] = pygame.image.load(os.path.join("image", "image_fut", "Arsenal.png"))
-        imagenes['Arsenal'] = pygame.transform.scale(imagenes['Arsenal'], (50,50))
-
-        imagenes['Tottenham Hotspur'] = pygame.image.load(os.path.join("image", "image_fut", "Tottenham Hotspur.png"))
-        imagenes['Tottenham Hotspur'] = pygame.transform.scale(imagenes['Tottenham Hotspur'], (50,50))
-
-        imagenes['Bayern de Múnich'] = pygame.image.load(os.path.join("image", "image_fut", "Bayern de Múnich.png"))
-        imagenes['Bayern de Múnich'] = pygame.transform.scale(imagenes["Bayern de Múnich"], (50,50))
-
-        imagenes['Borussia Dortmund'] = pygame.image.load(os.path.join("image", "image_fut", "Borussia Dortmund.png"))
-        imagenes['Borussia Dortmund'] = pygame.transform.scale(imagenes['Borussia Dortmund'], (50,50))
-
-        imagenes['Paris Saint-Germain'] = pygame.image.load(os.path.join("image", "image_fut", "Paris Saint-Germain.png"))
-        imagenes['Paris Saint-Germain'] = pygame.transform.scale(imagenes['Paris Saint-Germain'], (50,50))
-
-        imagenes["Argentina"] = pygame.image.load(os.path.join("image", "image_fut", "Argentina.png"))
-        imagenes["Argentina"] = pygame.transform.scale(imagenes["Argentina"], (50,50))
-
-        imagenes["Brasil"] = pygame.image.load(os.path.join("image", "image_fut", "Brasil.png"))
-        imagenes["Brasil"] = pygame.transform.scale(imagenes["Brasil"], (50,50))
-
-        imagenes["Alemania"] = pygame.image.load(os.path.join("image", "image_fut", "Alemania.png"))
-        imagenes["Alemania"] = pygame.transform.scale(imagenes["Alemania"], (50,50))
-
-        imagenes["Francia"] = pygame.image.load(os.path.join("image", "image_fut", "Francia.png"))
-        imagenes["Francia"] = pygame.transform.scale(imagenes["Francia"], (50,50))
-
-        imagenes["España"] = pygame.image.load(os.path.join("image", "image_fut", "España.png"))
-        imagenes["España"] = pygame.transform.scale(imagenes["España"], (50,50))
-
-        imagenes["Italia"] = pygame.image.load(os.path.join("image", "image_fut", "Italia.png"))
-        imagenes["Italia"] = pygame.transform.scale(imagenes["Italia"], (50,50))
+    for nombre in config["equipos"] + config["selecciones"]:
+        try:
+            imagenes[nombre] = assets.cargar(os.path.join("image", "image_fut", f"{nombre}.png"), (50,50))
+        except Exception as e:
+            print(f"Error al cargar imagen de {nombre}: {e}")
 
-        imagenes["Inglaterra"] = pygame.image.load(os.path.join("image", "image_fut", "Inglaterra.png"))
-        imagenes["Inglaterra"] = pygame.transform.scale(imagenes["Inglaterra"], (50,50))
+    print(f"{len(imagenes)} imágenes cargadas")
+    return imagenes
 
-        imagenes["Países Bajos"] = pygame.image.load(os.path.join("image", "image_fut", "Países Bajos.png"))
-        imagenes["Países Bajos"] = pygame.transform.scale(imagenes["Países Bajos"], (50,50))
+# Mínimo de jugadores que tiene que admitir cada celda del grid
+MIN_CANDIDATOS = 2
+# Intentos de sorteo antes de rendirse y usar el último grid sorteado
+MAX_INTENTOS = 500
 
-        print("Imágenes cargadas correctamente")
-    except Exception as e:
-        print(f"Error al cargar imágenes: {e}")
-        imagenes = None
-    
-    return imagenes
+# Precálculo por base de jugadores (índice -> (bitsets, conteos, posiciones)). La clave es el
+# objeto y no su id(): el diccionario lo mantiene vivo y el id no puede pasar a otro índice
+_precalculado = {}
 
-def generar_grid(config):
+def sortear_categorias(config):
     selecciones_en_filas = random.choice([True, False])
     
     categorias_filas = []
@@ -165,31 +107,94 @@ def generar_grid(config):
     
     return categorias_filas, categorias_cols
 
+def calcular_bitsets(indice, config):
+    """Bitset de jugadores (bit i = i-ésimo jugador de la base) que cumple cada categoría del config.
+
+    Los arma el índice desde sus listas por club y nacionalidad (en la base
+    compilada, desde las tablas de relación) sin leer los jugadores; después
+    cada celda es un AND de dos enteros.
+    """
+    return indice.bitsets(config["equipos"], config["selecciones"])
+
+def matriz_conteos(bitsets):
+    """(categoría, categoría) -> cantidad de jugadores que cumplen ambas"""
+    return {(a, b): bin(bitsets[a] & bitsets[b]).count("1") for a in bitsets for b in bitsets}
+
+def existe_asignacion(mascaras):
+    """True si cada celda puede tener un jugador distinto (matching bipartito celdas-jugadores)"""
+    dueño = {}
+
+    def asignar(celda, visitados):
+        libres = mascaras[celda] & ~visitados[0]
+        while libres:
+            bit = libres & -libres
+            libres ^= bit
+            visitados[0] |= bit
+            if bit not in dueño or asignar(dueño[bit], visitados):
+                dueño[bit] = celda
+                return True
+        return False
+
+    return all(asignar(celda, [0]) for celda in range(len(mascaras)))
+
+def precalcular(indice, config):
+    """Bitsets, matriz de conteos y posición de bit de cada jugador, calculados una sola vez por índice"""
+    if indice not in _precalculado:
+        bitsets = calcular_bitsets(indice, config)
+        _precalculado[indice] = (bitsets, matriz_conteos(bitsets), indice.posiciones_en_base())
+    return _precalculado[indice]
+
+def celdas_por_jugador(mascaras_celdas):
+    """Posición de bit de jugador -> máscara de 9 bits con las celdas (i*3 + j) que puede ocupar.
+
+    Solo se recorren los jugadores que entran en alguna celda.
+    """
+    celdas = {}
+    pendientes = 0
+    for mascara in mascaras_celdas:
+        pendientes |= mascara
+    while pendientes:
+        bit = pendientes & -pendientes
+        pendientes ^= bit
+        celdas[bit.bit_length() - 1] = sum(1 << k for k, mascara in enumerate(mascaras_celdas) if mascara & bit)
+    return celdas
+
+def grid_resoluble(bitsets, conteos, categorias_filas, categorias_cols, minimo=MIN_CANDIDATOS):
+    # Primero el filtro barato con la matriz y solo si pasa se busca el matching
+    if any(conteos[(f, c)] < minimo for f in categorias_filas for c in categorias_cols):
+        return False
+    return existe_asignacion([bitsets[f] & bitsets[c] for f in categorias_filas for c in categorias_cols])
+
+def generar_grid(config, indice=None, minimo=MIN_CANDIDATOS):
+    """Sortea categorías hasta encontrar un grid donde todas las celdas se pueden completar"""
+    if indice is None:
+        return sortear_categorias(config)
+
+    bitsets, conteos, _ = precalcular(indice, config)
+    for _ in range(MAX_INTENTOS):
+        categorias_filas, categorias_cols = sortear_categorias(config)
+        if grid_resoluble(bitsets, conteos, categorias_filas, categorias_cols, minimo):
+            return categorias_filas, categorias_cols
+
+    print(f"Aviso: no se encontró un grid resoluble en {MAX_INTENTOS} intentos")
+    return categorias_filas, categorias_cols
+
+def cumple_categoria(jugador, categoria):
+    tipo, valor = categoria
+    if tipo == "equipo":
+        return valor in player_index.clubes_de(jugador)
+    # Comparación exacta: buscar dentro del texto daba falsos positivos
+    return valor in player_index.nacionalidades_de(jugador)
+
 def jugador_cumple(jugador, cat_fila, cat_col):
-    cumple_fila = False
-    cumple_col = False
-    
-    tipo_fila, valor_fila = cat_fila
-    tipo_col, valor_col = cat_col
-    
-    if tipo_fila == "equipo":
-        cumple_fila = valor_fila in jugador["clubes totales"]
-    else:
-        cumple_fila = valor_fila in jugador["nacionalidad"]
-    
-    if tipo_col == "equipo":
-        cumple_col = valor_col in jugador["clubes totales"]
-    else:
-        cumple_col = valor_col in jugador["nacionalidad"]
-    
-    return cumple_fila and cumple_col
+    return cumple_categoria(jugador, cat_fila) and cumple_categoria(jugador, cat_col)
 
 class MenuPrincipal:
     def __init__(self, pantalla):
         self.pantalla = pantalla
-        self.fuente_titulo = pygame.font.Font(None, 80)
-        self.fuente_opcion = pygame.font.Font(None, 40)
-        self.fuente_pequena = pygame.font.Font(None, 30)
+        self.fuente_titulo = text_cache.fuente(80)
+        self.fuente_opcion = text_cache.fuente(40)
+        self.fuente_pequena = text_cache.fuente(30)
         
         # Definir botones del menú
         self.botones = [
@@ -206,17 +211,17 @@ class MenuPrincipal:
         self.pantalla.fill(AZUL)
         
         # Título
-        titulo = self.fuente_titulo.render("FÚTBOL GRID", True, AMARILLO)
+        titulo = text_cache.render(self.fuente_titulo, "FÚTBOL GRID", AMARILLO)
         rect_titulo = titulo.get_rect(center=(ANCHO // 2, 120))
         self.pantalla.blit(titulo, rect_titulo)
         
         # Subtítulo
-        subtitulo = self.fuente_pequena.render("Selecciona el modo de juego:", True, BLANCO)
+        subtitulo = text_cache.render(self.fuente_pequena, "Selecciona el modo de juego:", BLANCO)
         rect_subtitulo = subtitulo.get_rect(center=(ANCHO // 2, 190))
         self.pantalla.blit(subtitulo, rect_subtitulo)
         
         # Dibujar botones
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = game_loop.mouse_pos()
         
         for i, boton in enumerate(self.botones):
             # Color según hover
@@ -236,7 +241,7 @@ class MenuPrincipal:
             pygame.draw.rect(self.pantalla, NEGRO, boton["rect"], 3)
             
             # Texto del botón
-            texto = self.fuente_opcion.render(boton["texto"], True, color_texto)
+            texto = text_cache.render(self.fuente_opcion, boton["texto"], color_texto)
             rect_texto = texto.get_rect(center=boton["rect"].center)
             self.pantalla.blit(texto, rect_texto)
     
@@ -248,18 +253,23 @@ class MenuPrincipal:
 
 class FutbolGrid:
     def __init__(self, tiempo_limite=None):
-        self.pantalla = pygame.display.set_mode((ANCHO, ALTO))
-        pygame.display.set_caption("Fútbol Grid")
+        self.pantalla = game_host.ajustar_pantalla(None, (ANCHO, ALTO), "Fútbol Grid")
         self.reloj = pygame.time.Clock()
-        self.fuente = pygame.font.Font(None, 28)
-        self.fuente_pequena = pygame.font.Font(None, 20)
-        self.fuente_grande = pygame.font.Font(None, 36)
-        self.fuente_titulo = pygame.font.Font(None, 64)
-        self.fuente_tiempo = pygame.font.Font(None, 48)
+        self.fuente = text_cache.fuente(28)
+        self.fuente_pequena = text_cache.fuente(20)
+        self.fuente_grande = text_cache.fuente(36)
+        self.fuente_titulo = text_cache.fuente(64)
+        self.fuente_tiempo = text_cache.fuente(48)
         
-        self.jugadores, self.config = cargar_datos()
-        self.categorias_filas, self.categorias_cols = generar_grid(self.config)
-        self.imagenes = cargar_imagenes()
+        self.indice, self.config = cargar_datos()
+        self.categorias_filas, self.categorias_cols = generar_grid(self.config, self.indice)
+        
+        # Qué celdas puede ocupar cada jugador: AND de los bitsets de fila y columna
+        self.bitsets, _, self.posiciones_bit = precalcular(self.indice, self.config)
+        mascaras_celdas = [self.bitsets[fila] & self.bitsets[col]
+                           for fila in self.categorias_filas for col in self.categorias_cols]
+        self.celdas_por_jugador = celdas_por_jugador(mascaras_celdas)
+        self.imagenes = cargar_imagenes(self.config)
         
         self.grid = [[None for _ in range(3)] for _ in range(3)]
         self.input_texto = ""
@@ -273,7 +283,7 @@ class FutbolGrid:
         # Sistema de tiempo
         self.tiempo_limite = tiempo_limite
         self.tiempo_restante = tiempo_limite if tiempo_limite else None
-        self.tiempo_inicio = pygame.time.get_ticks() if tiempo_limite else None
+        self.tiempo_inicio = game_loop.ticks() if tiempo_limite else None
         self.tiempo_perdido = False
         
         # Variables para el sistema de mensajes
@@ -283,7 +293,7 @@ class FutbolGrid:
         
     def actualizar_tiempo(self):
         if self.tiempo_limite and not self.juego_terminado and not self.tiempo_perdido:
-            tiempo_actual = pygame.time.get_ticks()
+            tiempo_actual = game_loop.ticks()
             tiempo_transcurrido = (tiempo_actual - self.tiempo_inicio) / 1000
             self.tiempo_restante = max(0, self.tiempo_limite - tiempo_transcurrido)
             
@@ -299,37 +309,23 @@ class FutbolGrid:
         return True
     
     def buscar_jugador(self, nombre):
-        nombre_lower = nombre.lower().strip()
-        for jugador in self.jugadores:
-            nombre_jugador = jugador["nombre"].lower().strip()
-            if nombre_jugador == nombre_lower:
-                return jugador
-            if nombre_jugador.split()[-1] == nombre_lower:
-                return jugador
-            if "apodo" in jugador:
-                apodo_lower = jugador["apodo"].lower().strip()
-                if apodo_lower == nombre_lower:
-                    return jugador
-        return None
+        # Nombre completo, apellido o apodo (sin distinguir mayúsculas ni tildes)
+        return self.indice.buscar_exacto(nombre)
     
     def obtener_sugerencias(self, texto):
         if len(texto) < 1:
             return []
-        sugerencias = []
-        texto_lower = texto.lower().strip()
-        for jugador in self.jugadores:
-            nombre_completo = jugador["nombre"]
-            nombre_lower = nombre_completo.lower()
-            if texto_lower in nombre_lower:
-                sugerencias.append(nombre_completo)
-            elif "apodo" in jugador and texto_lower in jugador["apodo"].lower():
-                sugerencias.append(nombre_completo)
-            
-            if len(sugerencias) >= 5:
-                break
-        return sugerencias
+        # Cada palabra escrita tiene que ser el comienzo de una palabra del nombre o apodo
+        return [jugador["nombre"] for jugador in self.indice.buscar_prefijo(texto, limite=5)]
     
     def encontrar_celdas_validas(self, jugador):
+        posicion = self.posiciones_bit.get(jugador.get("id"))
+        if posicion is not None:
+            mascara = self.celdas_por_jugador.get(posicion, 0)
+            return [(i, j) for i in range(3) for j in range(3)
+                    if mascara >> (i * 3 + j) & 1 and self.grid[i][j] is None]
+        
+        # Jugador que no está en la base indexada: se comprueba celda por celda
         celdas = []
         for i in range(3):
             for j in range(3):
@@ -341,7 +337,7 @@ class FutbolGrid:
     def mostrar_mensaje(self, mensaje, duracion=3000):
         """Muestra un mensaje temporal en pantalla (duracion en milisegundos)"""
         self.mensaje_error = mensaje
-        self.tiempo_mensaje = pygame.time.get_ticks() + duracion
+        self.tiempo_mensaje = game_loop.ticks() + duracion
     
     def dibujar_tiempo(self):
         """Dibuja el temporizador en la parte superior"""
@@ -357,7 +353,7 @@ class FutbolGrid:
             segundos = int(self.tiempo_restante % 60)
             texto_tiempo = f"{minutos:02d}:{segundos:02d}"
             
-            texto = self.fuente_tiempo.render(texto_tiempo, True, color)
+            texto = text_cache.render(self.fuente_tiempo, texto_tiempo, color)
             rect_texto = texto.get_rect(center=(ANCHO // 2, 60))
             
             # Fondo para el tiempo
@@ -368,7 +364,7 @@ class FutbolGrid:
     
     def dibujar_mensaje_error(self):
         """Dibuja el mensaje de error si hay uno activo"""
-        if self.mensaje_error and pygame.time.get_ticks() < self.tiempo_mensaje:
+        if self.mensaje_error and game_loop.ticks() < self.tiempo_mensaje:
             # Fondo del mensaje
             ancho_msg = 700
             alto_msg = 60
@@ -379,10 +375,10 @@ class FutbolGrid:
             pygame.draw.rect(self.pantalla, NEGRO, (x, y, ancho_msg, alto_msg), 3)
             
             # Texto del mensaje
-            texto = self.fuente.render(self.mensaje_error, True, BLANCO)
+            texto = text_cache.render(self.fuente, self.mensaje_error, BLANCO)
             rect_texto = texto.get_rect(center=(ANCHO // 2, y + 30))
             self.pantalla.blit(texto, rect_texto)
-        elif pygame.time.get_ticks() >= self.tiempo_mensaje:
+        elif game_loop.ticks() >= self.tiempo_mensaje:
             # Limpiar el mensaje cuando expire
             self.mensaje_error = ""
     
@@ -410,7 +406,7 @@ class FutbolGrid:
                 rect_img = imagen.get_rect(center=(x + TAMANO_CELDA // 2, y - 25))
                 self.pantalla.blit(imagen, rect_img)
 
-            texto = self.fuente_pequena.render(valor, True, color)
+            texto = text_cache.render(self.fuente_pequena, valor, color)
             rect_texto = texto.get_rect(center=(x + TAMANO_CELDA // 2, y + 10))
             self.pantalla.blit(texto, rect_texto)
 
@@ -434,7 +430,7 @@ class FutbolGrid:
                 rect_img = imagen.get_rect(center=(x + 75, y + 30))
                 self.pantalla.blit(imagen, rect_img)
 
-            texto = self.fuente_pequena.render(valor, True, color)
+            texto = text_cache.render(self.fuente_pequena, valor, color)
             rect_texto = texto.get_rect(center=(x + 75, y + TAMANO_CELDA // 2))
             self.pantalla.blit(texto, rect_texto)
 
@@ -459,7 +455,7 @@ class FutbolGrid:
                     else:
                         nombre = jugador["nombre"].split()[-1]
                     
-                    texto = self.fuente_pequena.render(nombre, True, NEGRO)
+                    texto = text_cache.render(self.fuente_pequena, nombre, NEGRO)
                     rect_texto = texto.get_rect(center=(x + TAMANO_CELDA // 2, y + TAMANO_CELDA // 2))
                     self.pantalla.blit(texto, rect_texto)
 
@@ -469,10 +465,10 @@ class FutbolGrid:
         pygame.draw.rect(self.pantalla, color_fondo, (50, 625, 900, 40))
         pygame.draw.rect(self.pantalla, NEGRO, (50, 625, 900, 40), 3)
         
-        texto = self.fuente.render(self.input_texto, True, NEGRO)
+        texto = text_cache.render(self.fuente, self.input_texto, NEGRO)
         self.pantalla.blit(texto, (60, y + 8))
         
-        if self.input_activo and pygame.time.get_ticks() % 1000 < 500:
+        if self.input_activo and game_loop.ticks() % 1000 < 500:
             cursor_x = 60 + texto.get_width() + 2
             pygame.draw.line(self.pantalla, NEGRO, (cursor_x, y + 8), (cursor_x, y + 32), 2)
         
@@ -482,7 +478,7 @@ class FutbolGrid:
                 rect_sug = pygame.Rect(50, y_sug + i * 35, 900, 33)
                 pygame.draw.rect(self.pantalla, GRIS, rect_sug)
                 pygame.draw.rect(self.pantalla, NEGRO, rect_sug, 1)
-                texto = self.fuente_pequena.render(sugerencia, True, NEGRO)
+                texto = text_cache.render(self.fuente_pequena, sugerencia, NEGRO)
                 self.pantalla.blit(texto, (60, y_sug + i * 35 + 8))
     
     def dibujar_menu_celdas(self):
@@ -494,7 +490,7 @@ class FutbolGrid:
         pygame.draw.rect(self.pantalla, BLANCO, (x, y, ancho_menu, alto_menu))
         pygame.draw.rect(self.pantalla, NEGRO, (x, y, ancho_menu, alto_menu), 3)
         
-        texto = self.fuente_grande.render("Elige una celda:", True, NEGRO)
+        texto = text_cache.render(self.fuente_grande, "Elige una celda:", NEGRO)
         self.pantalla.blit(texto, (x + 20, y + 20))
         
         y_celda = y + 70
@@ -506,7 +502,7 @@ class FutbolGrid:
             pygame.draw.rect(self.pantalla, NEGRO, (x + 20, y_celda + idx * 50, 360, 45), 2)
             
             texto_celda = f"{valor_fila} x {valor_col}"
-            texto = self.fuente.render(texto_celda, True, NEGRO)
+            texto = text_cache.render(self.fuente, texto_celda, NEGRO)
             self.pantalla.blit(texto, (x + 30, y_celda + idx * 50 + 10))
     
     def manejar_clic_menu(self, pos):
@@ -570,12 +566,13 @@ class FutbolGrid:
         ejecutando = True
         
         while ejecutando:
-            self.reloj.tick(FPS)
+            game_loop.tick(self.reloj, FPS)
             
             # Actualizar tiempo si hay límite
             self.actualizar_tiempo()
+            game_loop.fase("update")
             
-            for evento in pygame.event.get():
+            for evento in game_loop.eventos():
                 if evento.type == pygame.QUIT:
                     ejecutando = False
                 
@@ -615,6 +612,7 @@ class FutbolGrid:
                         rect_input = pygame.Rect(50, 625, 900, 40)
                         if rect_input.collidepoint(evento.pos):
                             self.input_activo = True
+            game_loop.fase("eventos")
             
             # Determinar color de fondo según el estado
             if self.juego_terminado:
@@ -627,7 +625,7 @@ class FutbolGrid:
             
             # Título y tiempo
             if not self.juego_terminado:
-                titulo = self.fuente_grande.render("FÚTBOL GRID", True, NEGRO)
+                titulo = text_cache.render(self.fuente_grande, "FÚTBOL GRID", NEGRO)
                 self.pantalla.blit(titulo, (ANCHO // 2 - 100, 10))
                 self.dibujar_tiempo()
             
@@ -636,22 +634,22 @@ class FutbolGrid:
             if self.juego_terminado:
                 if self.tiempo_perdido:
                     # Perdiste por tiempo
-                    texto_terminado = self.fuente_titulo.render("TIEMPO AGOTADO", True, BLANCO)
+                    texto_terminado = text_cache.render(self.fuente_titulo, "TIEMPO AGOTADO", BLANCO)
                     rect_terminado = texto_terminado.get_rect(center=(ANCHO // 2, 650))
                     self.pantalla.blit(texto_terminado, rect_terminado)
                 else:
                     # Ganaste completando el grid
-                    texto_terminado = self.fuente_titulo.render("¡COMPLETADO!", True, BLANCO)
+                    texto_terminado = text_cache.render(self.fuente_titulo, "¡COMPLETADO!", BLANCO)
                     rect_terminado = texto_terminado.get_rect(center=(ANCHO // 2, 650))
                     self.pantalla.blit(texto_terminado, rect_terminado)
                 
                 # Texto "Presiona ESC para volver al menú" debajo
-                texto_esc = self.fuente_grande.render("Presiona ESC para volver al menú", True, BLANCO)
+                texto_esc = text_cache.render(self.fuente_grande, "Presiona ESC para volver al menú", BLANCO)
                 rect_esc = texto_esc.get_rect(center=(ANCHO // 2, 720))
                 self.pantalla.blit(texto_esc, rect_esc)
             elif not self.mostrando_menu_celdas:
                 self.dibujar_input()
-                inst = self.fuente_pequena.render("Escribe el nombre de un jugador (presiona ESC para volver al menú)", True, GRIS_OSCURO)
+                inst = text_cache.render(self.fuente_pequena, "Escribe el nombre de un jugador (presiona ESC para volver al menú)", GRIS_OSCURO)
                 self.pantalla.blit(inst, (50, 600))
             else:
                 self.dibujar_menu_celdas()
@@ -659,13 +657,13 @@ class FutbolGrid:
             # Mostrar mensajes de error si los hay
             self.dibujar_mensaje_error()
             
-            pygame.display.flip()
+            game_loop.flip()
         
         return "salir"
 
-def main():
-    pantalla = pygame.display.set_mode((ANCHO, ALTO))
-    pygame.display.set_caption("Fútbol Grid")
+def run(pantalla, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    pantalla = game_host.ajustar_pantalla(pantalla, (ANCHO, ALTO), "Fútbol Grid")
     reloj = pygame.time.Clock()
     
     estado = "menu"
@@ -675,30 +673,28 @@ def main():
             menu = MenuPrincipal(pantalla)
             
             while estado == "menu":
-                reloj.tick(FPS)
+                game_loop.tick(reloj, FPS)
                 
-                for evento in pygame.event.get():
+                for evento in game_loop.eventos():
                     if evento.type == pygame.QUIT:
                         pygame.quit()
                         sys.exit()
                     
                     elif evento.type == pygame.KEYDOWN:
                         if evento.key == pygame.K_ESCAPE:
-                            pygame.quit()
-                            sys.exit()
+                            return
                     
                     elif evento.type == pygame.MOUSEBUTTONDOWN:
                         opcion = menu.manejar_clic(evento.pos)
                         if opcion == "salir":
-                            pygame.quit()
-                            sys.exit()
+                            return
                         elif opcion is not False:
                             estado = "juego"
                             tiempo_seleccionado = opcion
                             break
                 
                 menu.dibujar()
-                pygame.display.flip()
+                game_loop.flip()
         
         elif estado == "juego":
             juego = FutbolGrid(tiempo_limite=tiempo_seleccionado)
@@ -710,5 +706,10 @@ def main():
                 pygame.quit()
                 sys.exit()
 
+def main():
+    run(pygame.display.set_mode((ANCHO, ALTO)))
+    pygame.quit()
+    sys.exit()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""Libro de aperturas de 4 en línea: jugada y valor precalculados para las primeras jugadas.
+
+Uso: python libro_4_lineas.py [--jugadas N] [--segundos S] [--procesos P]
+
+Recorre las posiciones de las primeras N jugadas (de cada par de posiciones
+espejadas se analiza una sola), busca cada una con motor_4_lineas en un pool
+de procesos y guarda el resultado en libro_4_lineas.bin. El archivo es una
+tabla hash de direccionamiento abierto con celdas de tamaño fijo: el juego
+lo abre con mmap y cada consulta lee solo las celdas que prueba, sin parsear
+nada al arrancar.
+"""
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import time
+
+import motor_4_lineas
+from motor_4_lineas import ABAJO, ALTO, ARRIBA, CASILLAS, COLUMNA, COLUMNAS, GANA
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVO = os.path.join(BASE_DIR, "libro_4_lineas.bin")
+
+MAGIA = b"L4LB"
+VERSION = 1
+# magia, versión, cantidad de celdas (potencia de 2), posiciones guardadas
+_CABECERA = struct.Struct("<4sB3xII")
+# clave de la posición (0 = celda vacía), valor, columna, profundidad buscada
+_CELDA = struct.Struct("<QhBB")
+# Profundidad que indica que el valor es exacto (ganada, perdida o empate demostrados)
+EXACTA = 255
+
+_MULTIPLICADOR = 0x9E3779B97F4A7C15
+_MASCARA_64 = (1 << 64) - 1
+
+
+def clave(actual, mascara):
+    """Clave única de la posición (fichas del que mueve + ocupadas + fila de abajo, nunca 0)"""
+    return actual + mascara + ABAJO
+
+
+def espejo(clave_posicion):
+    """Clave de la posición reflejada: en la clave cada columna ocupa sus propios ALTO bits"""
+    resultado = 0
+    grupo = (1 << ALTO) - 1
+    for c in range(COLUMNAS):
+        resultado |= ((clave_posicion >> (c * ALTO)) & grupo) << ((COLUMNAS - 1 - c) * ALTO)
+    return resultado
+
+
+def canonica(clave_posicion):
+    """(clave canónica, True si hubo que espejar) para guardar una sola de cada par"""
+    reflejada = espejo(clave_posicion)
+    if reflejada < clave_posicion:
+        return reflejada, True
+    return clave_posicion, False
+
+
+def _indice(clave_posicion, bits):
+    # Hash de Fibonacci: los bits altos del producto reparten bien claves parecidas
+    return ((clave_posicion * _MULTIPLICADOR) & _MASCARA_64) >> (64 - bits)
+
+
+class Libro:
+    """Libro abierto con mmap (solo lectura)"""
+
+    def __init__(self, ruta):
+        with open(ruta, "rb") as f:
+            self._datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, version, self.celdas, self.posiciones = _CABECERA.unpack_from(self._datos, 0)
+        if magia != MAGIA or version != VERSION or \
+                len(self._datos) != _CABECERA.size + self.celdas * _CELDA.size:
+            self._datos.close()
+            raise ValueError(f"{ruta} no es un libro de 4 en línea de la versión {VERSION}")
+        self._bits = self.celdas.bit_length() - 1
+
+    def consultar(self, actual, mascara):
+        """(columna, valor, profundidad) guardados para la posición, o None si no está en el libro"""
+        buscada, espejada = canonica(clave(actual, mascara))
+        i = _indice(buscada, self._bits)
+        while True:
+            guardada, valor, col, profundidad = _CELDA.unpack_from(self._datos, _CABECERA.size + i * _CELDA.size)
+            if guardada == buscada:
+                return (COLUMNAS - 1 - col if espejada else col), valor, profundidad
+            if guardada == 0:
+                return None
+            i = (i + 1) & (self.celdas - 1)
+
+    def jugada(self, tablero, pieza):
+        """Columna del libro para que `pieza` juegue en `tablero`, o None"""
+        encontrada = self.consultar(tablero.fichas[pieza], tablero.mascara)
+        return encontrada[0] if encontrada else None
+
+    def cerrar(self):
+        self._datos.close()
+
+
+# Libros ya abiertos en este proceso, por ruta (None si no había archivo)
+_abiertos = {}
+
+
+def abrir(ruta=ARCHIVO):
+    """Libro de `ruta` (se mapea una sola vez por proceso) o None si no existe o es inválido"""
+    if ruta not in _abiertos:
+        libro = None
+        if os.path.exists(ruta):
+            try:
+                libro = Libro(ruta)
+            except (OSError, ValueError) as error:
+                print(f"No se pudo abrir el libro de aperturas: {error}")
+        _abiertos[ruta] = libro
+    return _abiertos[ruta]
+
+
+# ---------------------------------------------------------------------------
+# Construcción
+# ---------------------------------------------------------------------------
+
+def posiciones(jugadas):
+    """(actual, mascara) de cada posición sin ganador de las primeras `jugadas` jugadas, una por par espejado"""
+    vistas = set()
+    resultado = []
+    nivel = [(0, 0)]
+    for ply in range(jugadas + 1):
+        siguiente = []
+        for actual, mascara in nivel:
+            clave_canonica, _ = canonica(clave(actual, mascara))
+            if clave_canonica in vistas:
+                continue
+            vistas.add(clave_canonica)
+            resultado.append((actual, mascara))
+            if ply == jugadas:
+                continue
+            for col in range(COLUMNAS):
+                if mascara & ARRIBA[col]:
+                    continue
+                bit = (mascara + (1 << (col * ALTO))) & COLUMNA[col]
+                if motor_4_lineas.hay_cuatro(actual | bit):
+                    continue  # la partida terminó: no hace falta libro
+                # Después de jugar, el que mueve es el rival
+                siguiente.append((actual ^ mascara, mascara | bit))
+        nivel = siguiente
+    return resultado
+
+
+# Motor de cada proceso del pool: su tabla de transposición sirve para las posiciones siguientes
+_motor = None
+
+
+def _analizar(tarea):
+    global _motor
+    actual, mascara, segundos = tarea
+    if _motor is None:
+        _motor = motor_4_lineas.Motor(max_entradas=500_000)
+    tablero = motor_4_lineas.Tablero()
+    tablero.fichas = {1: actual, 2: actual ^ mascara}
+    tablero.mascara = mascara
+    tablero.jugadas = mascara.bit_count()
+    col, valor = _motor.buscar(tablero, 1, segundos=segundos)
+    exacta = abs(valor) > GANA or _motor.profundidad >= CASILLAS - tablero.jugadas
+    return clave(actual, mascara), col, valor, EXACTA if exacta else min(_motor.profundidad, EXACTA - 1)
+
+
+def escribir(entradas, ruta=ARCHIVO):
+    """Guarda [(clave, columna, valor, profundidad)] como tabla hash (carga máxima 50%)"""
+    bits = max(4, (2 * len(entradas) - 1).bit_length())
+    celdas = 1 << bits
+    datos = bytearray(_CABECERA.size + celdas * _CELDA.size)
+    _CABECERA.pack_into(datos, 0, MAGIA, VERSION, celdas, len(entradas))
+    for clave_posicion, col, valor, profundidad in entradas:
+        guardada, espejada = canonica(clave_posicion)
+        if espejada:
+            col = COLUMNAS - 1 - col
+        i = _indice(guardada, bits)
+        while _CELDA.unpack_from(datos, _CABECERA.size + i * _CELDA.size)[0] not in (0, guardada):
+            i = (i + 1) & (celdas - 1)
+        _CELDA.pack_into(datos, _CABECERA.size + i * _CELDA.size, guardada, valor, col, profundidad)
+
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(datos)
+    os.replace(temporal, ruta)
+
+
+def construir(jugadas=4, segundos=2.0, procesos=None, ruta=ARCHIVO):
+    lista = posiciones(jugadas)
+    print(f"{len(lista)} posiciones hasta {jugadas} jugadas, {segundos} s por posición")
+    inicio = time.perf_counter()
+    entradas = []
+    tareas = [(actual, mascara, segundos) for actual, mascara in lista]
+    with multiprocessing.Pool(procesos) as pool:
+        for i, entrada in enumerate(pool.imap_unordered(_analizar, tareas, chunksize=4), 1):
+            entradas.append(entrada)
+            if i % 100 == 0 or i == len(tareas):
+                print(f"  {i}/{len(tareas)} ({time.perf_counter() - inicio:.0f} s)")
+    escribir(entradas, ruta)
+    exactas = sum(1 for entrada in entradas if entrada[3] == EXACTA)
+    print(f"Libro guardado en {ruta}: {len(entradas)} posiciones ({exactas} con valor exacto), "
+          f"{os.path.getsize(ruta) // 1024} KB")
+
+
+def main(argumentos):
+    opciones = {"--jugadas": 4, "--segundos": 2.0, "--procesos": None}
+    i = 0
+    while i < len(argumentos):
+        if argumentos[i] in opciones and i + 1 < len(argumentos):
+            tipo = float if argumentos[i] == "--segundos" else int
+            opciones[argumentos[i]] = tipo(argumentos[i + 1])
+            i += 2
+        else:
+            print(__doc__.strip().splitlines()[2])
+            return 2
+    construir(opciones["--jugadas"], opciones["--segundos"], opciones["--procesos"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
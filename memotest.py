@@ -1,12 +1,14 @@
 import pygame
 import sys
 import random
-import time
 import math
 
-pygame.init()
+import assets
+import game_host
+import game_loop
+import text_cache
 
-pygame.display.set_caption("Memotest Pro - Pygame")
+pygame.init()
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -73,7 +75,7 @@ def create_card(x, y, w, h, color, symbol):
         'glow_intensity': 0.0
     }
 
-def update_card(card, dt):
+def update_card(card, dt, now):
     target_flip = 1.0 if (card['flipped'] or card['matched']) else 0.0
     if card['flip_progress'] != target_flip:
         speed = 8.0
@@ -91,7 +93,7 @@ def update_card(card, dt):
             card['scale'] = max(target_scale, card['scale'] - scale_speed * dt)
     
     if card['matched']:
-        card['glow_intensity'] = (math.sin(time.time() * 3) + 1) / 2
+        card['glow_intensity'] = (math.sin(now * 3) + 1) / 2
 
 def draw_card(screen, card):
     center_x = card['rect'].centerx
@@ -123,8 +125,8 @@ def draw_card(screen, card):
     
     if card['flip_progress'] > 0.5 and card['symbol']:
         font_size = min(scaled_w, scaled_h) // 3
-        font = pygame.font.Font(None, font_size)
-        text = font.render(card['symbol'], True, WHITE)
+        font = text_cache.fuente(font_size)
+        text = text_cache.render(font, card['symbol'], WHITE)
         text_rect = text.get_rect(center=scaled_rect.center)
         screen.blit(text, text_rect)
     
@@ -138,72 +140,70 @@ def draw_card(screen, card):
 
 def menu_principal(screen):
     try:
-        menu_image = pygame.image.load("image/menu_memotest.png")
+        menu_image = assets.cargar("image/menu_memotest.png", (W, H), alpha=False)
         use_image = True
     except:
         use_image = False
     
     while True:
         if use_image:
-            scaled_image = pygame.transform.scale(menu_image, (W, H))
-            screen.blit(scaled_image, (0, 0))
+            screen.blit(menu_image, (0, 0))
         else:
             for y in range(H):
                 color = (0, 0, min(100, y // 6))
                 pygame.draw.line(screen, color, (0, y), (W, y))
             
-            font_title = pygame.font.Font(None, 72)
-            title = font_title.render("MEMOTEST PRO", True, GOLD)
+            font_title = text_cache.fuente(72)
+            title = text_cache.render(font_title, "MEMOTEST PRO", GOLD)
             title_rect = title.get_rect(center=(W//2, H//2 - 100))
             
-            shadow = font_title.render("MEMOTEST PRO", True, DARK_GRAY)
+            shadow = text_cache.render(font_title, "MEMOTEST PRO", DARK_GRAY)
             shadow_rect = shadow.get_rect(center=(title_rect.centerx + 3, title_rect.centery + 3))
             screen.blit(shadow, shadow_rect)
             screen.blit(title, title_rect)
             
-            font_options = pygame.font.Font(None, 48)
-            space_text = font_options.render("ESPACIO = Jugar", True, LIME)
+            font_options = text_cache.fuente(48)
+            space_text = text_cache.render(font_options, "ESPACIO = Jugar", LIME)
             space_rect = space_text.get_rect(center=(W//2, H//2 + 50))
             screen.blit(space_text, space_rect)
             
-            esc_text = font_options.render("ESC = Salir", True, RED)
+            esc_text = text_cache.render(font_options, "ESC = Salir", RED)
             esc_rect = esc_text.get_rect(center=(W//2, H//2 + 100))
             screen.blit(esc_text, esc_rect)
         
-        pygame.display.flip()
+        game_loop.flip()
         
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    return
+                    return True
                 elif event.key == pygame.K_ESCAPE:
-                    pygame.quit(); sys.exit()
+                    return False
 
 def menu_modo(screen):
     try:
-        menu_eleccion_image = pygame.image.load("image/menu_eleccion_memotest.png")
+        menu_eleccion_image = assets.cargar("image/menu_eleccion_memotest.png", (W, H), alpha=False)
         use_image = True
     except:
         use_image = False
     
     while True:
         if use_image:
-            scaled_image = pygame.transform.scale(menu_eleccion_image, (W, H))
-            screen.blit(scaled_image, (0, 0))
+            screen.blit(menu_eleccion_image, (0, 0))
         else:
             for y in range(H):
                 color = (0, min(100, y // 6), 0)
                 pygame.draw.line(screen, color, (0, y), (W, y))
             
-            font_title = pygame.font.Font(None, 48)
-            font_options = pygame.font.Font(None, 36)
+            font_title = text_cache.fuente(48)
+            font_options = text_cache.fuente(36)
             
-            title = font_title.render("SELECCIONAR MODO", True, LIME)
+            title = text_cache.render(font_title, "SELECCIONAR MODO", LIME)
             title_rect = title.get_rect(center=(W//2, 100))
             
-            shadow = font_title.render("SELECCIONAR MODO", True, DARK_GRAY)
+            shadow = text_cache.render(font_title, "SELECCIONAR MODO", DARK_GRAY)
             shadow_rect = shadow.get_rect(center=(title_rect.centerx + 2, title_rect.centery + 2))
             screen.blit(shadow, shadow_rect)
             screen.blit(title, title_rect)
@@ -220,13 +220,13 @@ def menu_modo(screen):
             for i, option in enumerate(options):
                 if option:
                     color = CYAN if option.startswith(("1)", "2)")) else WHITE
-                    text = font_options.render(option, True, color)
+                    text = text_cache.render(font_options, option, color)
                     text_rect = text.get_rect(center=(W//2, 180 + i*40))
                     screen.blit(text, text_rect)
         
-        pygame.display.flip()
+        game_loop.flip()
         
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
@@ -271,7 +271,7 @@ def draw_hud(screen, modo, score1, score2, turn, moves, time_elapsed):
     pygame.draw.rect(screen, (20, 20, 40), hud_rect)
     pygame.draw.line(screen, WHITE, (0, H - 80), (W, H - 80), 2)
     
-    font = pygame.font.Font(None, 32)
+    font = text_cache.fuente(32)
     
     if modo == 1:
         score_text = f"Jugador: {score1}"
@@ -283,7 +283,7 @@ def draw_hud(screen, modo, score1, score2, turn, moves, time_elapsed):
         
         for i, text in enumerate(texts):
             color = YELLOW if (i == 0 and turn == 1) or (i == 1 and turn == 2) else WHITE
-            rendered = font.render(text, True, color)
+            rendered = text_cache.render(font, text, color)
             x = spacing * i + spacing // 2 - rendered.get_width() // 2
             screen.blit(rendered, (x, H - 50))
     else:
@@ -292,14 +292,14 @@ def draw_hud(screen, modo, score1, score2, turn, moves, time_elapsed):
         turn_text = f"Turno: Jugador {turn}"
         
         color1 = YELLOW if turn == 1 else WHITE
-        p1_rendered = font.render(p1_text, True, color1)
+        p1_rendered = text_cache.render(font, p1_text, color1)
         screen.blit(p1_rendered, (20, H - 50))
         
         color2 = YELLOW if turn == 2 else WHITE
-        p2_rendered = font.render(p2_text, True, color2)
+        p2_rendered = text_cache.render(font, p2_text, color2)
         screen.blit(p2_rendered, (W - p2_rendered.get_width() - 20, H - 50))
         
-        turn_rendered = font.render(turn_text, True, CYAN)
+        turn_rendered = text_cache.render(font, turn_text, CYAN)
         turn_x = W // 2 - turn_rendered.get_width() // 2
         screen.blit(turn_rendered, (turn_x, H - 50))
 
@@ -311,7 +311,7 @@ class CPUPlayer:
     
     def remember_card(self, card_index, color):
         self.memory[card_index] = color
-        self.last_seen[card_index] = time.time()
+        self.last_seen[card_index] = game_loop.ticks() / 1000.0
     
     def choose_card(self, cards, first_card_idx=None):
         available = [i for i, c in enumerate(cards) if not c['flipped'] and not c['matched']]
@@ -358,17 +358,17 @@ def run_game(screen, modo):
     cpu_first_card = None
     
     all_particles = []
-    start_time = time.time()
+    start_time = game_loop.ticks() / 1000.0
     
     preview_time = 3.0
-    preview_start = time.time()
+    preview_start = start_time
     for card in cards:
         card['flipped'] = True
     
     running = True
     while running:
-        dt = clock.tick(FPS) / 1000.0
-        current_time = time.time()
+        dt = game_loop.tick(clock, FPS) / 1000.0
+        current_time = game_loop.ticks() / 1000.0
         time_elapsed = current_time - start_time
         
         if current_time - preview_start > preview_time and preview_time > 0:
@@ -377,9 +377,9 @@ def run_game(screen, modo):
                     card['flipped'] = False
             preview_time = 0
         
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = game_loop.mouse_pos()
         
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             
@@ -404,6 +404,7 @@ def run_game(screen, modo):
                             check_time = current_time
                             moves += 1
                         break
+        game_loop.fase("eventos")
         
         if modo == 1 and turn == 2 and not checking and preview_time == 0:
             if not cpu_thinking:
@@ -468,9 +469,10 @@ def run_game(screen, modo):
             cpu_thinking = False
         
         for card in cards:
-            update_card(card, dt)
+            update_card(card, dt, current_time)
         
         update_particles(all_particles, dt)
+        game_loop.fase("update")
         
         for y in range(H - 80):
             intensity = int(20 + 15 * math.sin(time_elapsed * 0.5 + y * 0.01))
@@ -487,34 +489,34 @@ def run_game(screen, modo):
         if preview_time > 0:
             remaining = preview_time - (current_time - preview_start)
             if remaining > 0:
-                font = pygame.font.Font(None, 72)
+                font = text_cache.fuente(72)
                 text = f"Memoriza: {int(remaining) + 1}"
-                rendered = font.render(text, True, YELLOW)
+                rendered = text_cache.render(font, text, YELLOW)
                 text_rect = rendered.get_rect(center=(W//2, 50))
                 
-                shadow = font.render(text, True, BLACK)
+                shadow = text_cache.render(font, text, BLACK)
                 shadow_rect = shadow.get_rect(center=(text_rect.centerx + 3, text_rect.centery + 3))
                 screen.blit(shadow, shadow_rect)
                 screen.blit(rendered, text_rect)
         
-        pygame.display.flip()
+        game_loop.flip()
         
         if matched_count == len(cards):
             try:
                 if modo == 1:
                     if score1 > score2:
-                        victory_image = pygame.image.load("image/jugador_1_victoria_memotest.png")
+                        victory_image = assets.cargar("image/jugador_1_victoria_memotest.png", (W, H), alpha=False)
                     elif score2 > score1:
-                        victory_image = pygame.image.load("image/cpu_victoria_memotest.png")
+                        victory_image = assets.cargar("image/cpu_victoria_memotest.png", (W, H), alpha=False)
                     else:
-                        victory_image = pygame.image.load("image/empate_memotest.png")
+                        victory_image = assets.cargar("image/empate_memotest.png", (W, H), alpha=False)
                 else:
                     if score1 > score2:
-                        victory_image = pygame.image.load("image/jugador_1_victoria_memotest.png")
+                        victory_image = assets.cargar("image/jugador_1_victoria_memotest.png", (W, H), alpha=False)
                     elif score2 > score1:
-                        victory_image = pygame.image.load("image/jugador_2_victoria_memotest.png")
+                        victory_image = assets.cargar("image/jugador_2_victoria_memotest.png", (W, H), alpha=False)
                     else:
-                        victory_image = pygame.image.load("image/empate_memotest.png")
+                        victory_image = assets.cargar("image/empate_memotest.png", (W, H), alpha=False)
                 use_victory_image = True
             except:
                 victory_image = None
@@ -531,28 +533,28 @@ def run_game(screen, modo):
             
             waiting_for_input = True
             while waiting_for_input:
-                dt = clock.tick(FPS) / 1000.0
+                dt = game_loop.tick(clock, FPS) / 1000.0
+                now = game_loop.ticks() / 1000.0
                 
-                for event in pygame.event.get():
+                for event in game_loop.eventos():
                     if event.type == pygame.QUIT:
                         pygame.quit(); sys.exit()
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_SPACE:
-                            return
+                            return True
                         elif event.key == pygame.K_ESCAPE:
-                            pygame.quit(); sys.exit()
+                            return False
                 
                 if use_victory_image and victory_image:
-                    scaled_image = pygame.transform.scale(victory_image, (W, H))
-                    screen.blit(scaled_image, (0, 0))
+                    screen.blit(victory_image, (0, 0))
                 else:
                     for y in range(H):
-                        intensity = int(30 + 20 * math.sin(time.time() * 2 + y * 0.02))
+                        intensity = int(30 + 20 * math.sin(now * 2 + y * 0.02))
                         color = (intensity//3, intensity//2, intensity)
                         pygame.draw.line(screen, color, (0, y), (W, y))
                     
-                    font_big = pygame.font.Font(None, 96)
-                    font_small = pygame.font.Font(None, 48)
+                    font_big = text_cache.fuente(96)
+                    font_small = text_cache.fuente(48)
                     
                     if modo == 1:
                         if score1 > score2:
@@ -571,36 +573,42 @@ def run_game(screen, modo):
                             win_text = "¡EMPATE!"
                         stats_text = f"Jugador 1: {score1} - Jugador 2: {score2}"
                     
-                    scale = 1.0 + 0.1 * math.sin(time.time() * 4)
-                    win_surface = font_big.render(win_text, True, GOLD)
+                    scale = 1.0 + 0.1 * math.sin(now * 4)
+                    win_surface = text_cache.render(font_big, win_text, GOLD)
                     win_w = int(win_surface.get_width() * scale)
                     win_h = int(win_surface.get_height() * scale)
                     win_scaled = pygame.transform.scale(win_surface, (win_w, win_h))
                     win_rect = win_scaled.get_rect(center=(W//2, H//2 - 50))
                     
-                    shadow = font_big.render(win_text, True, BLACK)
+                    shadow = text_cache.render(font_big, win_text, BLACK)
                     shadow_rect = shadow.get_rect(center=(win_rect.centerx + 4, win_rect.centery + 4))
                     screen.blit(shadow, shadow_rect)
                     screen.blit(win_scaled, win_rect)
                     
-                    stats_surface = font_small.render(stats_text, True, WHITE)
+                    stats_surface = text_cache.render(font_small, stats_text, WHITE)
                     stats_rect = stats_surface.get_rect(center=(W//2, H//2 + 50))
                     screen.blit(stats_surface, stats_rect)
                 
                 update_particles(victory_particles, dt)
                 draw_particles(screen, victory_particles)
                 
-                pygame.display.flip()
+                game_loop.flip()
             
             return
 
-def main():
-    screen = pygame.display.set_mode((W, H))
+def run(screen, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    screen = game_host.ajustar_pantalla(screen, (W, H), "Memotest Pro - Pygame")
     
     while True:
-        menu_principal(screen)
+        if not menu_principal(screen):
+            return
         modo = menu_modo(screen)
-        run_game(screen, modo)
+        if run_game(screen, modo) is False:
+            return
+
+def main():
+    run(pygame.display.set_mode((W, H)))
 
 if __name__ == "__main__":
     try:
@@ -1,9 +1,14 @@
 import pygame
-from button import Button
+from button import Button, ButtonGroup
 import os
 import sys
 import json
-import subprocess
+
+import assets
+import backgrounds
+import game_host
+import pantalla_de_inicio
+import text_cache
 
 pygame.init()
 
@@ -84,6 +89,13 @@ def load_image(filename, default_size=(100, 50)):
         
         return placeholder
 
+def load_background(filename):
+    """Carga un fondo ya escalado a la resolución actual (usa la variante precompilada si existe)"""
+    try:
+        return assets.cargar(crear_ruta_img(filename), (SCREEN_WIDTH, SCREEN_HEIGHT), alpha=False)
+    except (pygame.error, FileNotFoundError):
+        return pygame.transform.scale(load_image(filename), (SCREEN_WIDTH, SCREEN_HEIGHT))
+
 # Cargar imágenes con tamaños apropiados
 play_img = load_image("play.png", (150, 60))
 options_img = load_image("options.png", (150, 60))
@@ -95,8 +107,8 @@ back_img = load_image("back.png", (120, 50))
 huergo_img = load_image("huergo.png", (300, 300))
 
 # Cargar fondos
-fondo_menu = load_image("fondo_menu.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
-fondo_menu_option = load_image("fondo_menu_option.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
+fondo_menu = load_background("fondo_menu.png")
+fondo_menu_option = load_background("fondo_menu_option.png")
 
 # Sistema mejorado de control de clics
 last_click_time = 0
@@ -105,14 +117,43 @@ last_button_clicked = None
 
 def can_click():
     """Verifica si se puede hacer clic (cooldown global)"""
-    global last_click_time
     current_time = pygame.time.get_ticks()
     
     if current_time - last_click_time > CLICK_DELAY:
-        last_click_time = current_time
+        mark_click()
         return True
     return False
 
+def mark_click():
+    """Registra un clic de botón para que las opciones por sondeo respeten el cooldown"""
+    global last_click_time
+    last_click_time = pygame.time.get_ticks()
+
+# Botones de cada pantalla (se crean en build_widgets, una vez por resolución)
+widgets = {}
+
+def build_widgets():
+    """Crea los botones de todas las pantallas con sus imágenes ya escaladas"""
+    global widgets
+    back_x = SCREEN_WIDTH // 2 - back_img.get_width() // 2
+    
+    widgets = {
+        "main": ButtonGroup({
+            "play": Button(130, 125, play_img, 7),
+            "options": Button(450, 125, options_img, 7),
+            "exit": Button(300, 375, exit_img, 7),
+        }),
+        "options": ButtonGroup({
+            "video": Button(100, 120, video_img, 7),
+            "audio": Button(400, 120, audio_img, 7),
+            "credits": Button(100, 300, credit_img, 7),
+            "back": Button(400, 300, back_img, 7),
+        }),
+        "credits": ButtonGroup({"back": Button(back_x, SCREEN_HEIGHT - 70, back_img, 1)}),
+        "video": ButtonGroup({"back": Button(back_x, SCREEN_HEIGHT - 80, back_img, 1)}),
+        "audio": ButtonGroup({"back": Button(back_x, SCREEN_HEIGHT - 80, back_img, 1)}),
+    }
+
 # Variables para mensajes
 message_timer = 0
 current_message = ""
@@ -127,13 +168,13 @@ def show_message(text, color=TEXT_COL, duration=2000):
 
 def draw_text(text, font, text_col, x, y):
     """Dibuja texto en posición específica"""
-    img = font.render(str(text), True, text_col)
+    img = text_cache.render(font, text, text_col)
     screen.blit(img, (x, y))
     return img.get_rect(topleft=(x, y))
 
 def draw_centered_text(text, font, text_col, y):
     """Dibuja texto centrado horizontalmente"""
-    img = font.render(str(text), True, text_col)
+    img = text_cache.render(font, text, text_col)
     x = (SCREEN_WIDTH - img.get_width()) // 2
     screen.blit(img, (x, y))
     return img.get_rect(topleft=(x, y))
@@ -180,14 +221,13 @@ def apply_resolution():
             screen = pygame.display.set_mode((width, height))
         
         SCREEN_WIDTH, SCREEN_HEIGHT = width, height
+        # Los gradientes del tamaño anterior ya no sirven: se regeneran al próximo dibujo
+        backgrounds.limpiar()
         
         # Recargar fondos con nueva resolución
-        fondo_menu = load_image("fondo_menu.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
-        fondo_menu_option = load_image("fondo_menu_option.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
-        
-        # Escalar fondos si es necesario
-        fondo_menu = pygame.transform.scale(fondo_menu, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        fondo_menu_option = pygame.transform.scale(fondo_menu_option, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        fondo_menu = load_background("fondo_menu.png")
+        fondo_menu_option = load_background("fondo_menu_option.png")
+        build_widgets()
         
         show_message(f"Resolución aplicada: {res_str}", SUCCESS_COL)
         
@@ -199,49 +239,44 @@ def handle_main_menu():
     """Maneja la lógica del menú principal"""
     global game_paused, menu_state, game_running, last_button_clicked
     
-    # Dibujar fondo del menú principal (Minigames)
-    screen.blit(pygame.transform.scale(fondo_menu, (SCREEN_WIDTH, SCREEN_HEIGHT)), (0, 0))
+    # Dibujar fondo del menú principal (Minigames), ya escalado en apply_resolution/main
+    screen.blit(fondo_menu, (0, 0))
     
-    play_button = Button(130, 125, play_img, 7)
-    options_button = Button(450, 125, options_img, 7)
-    exit_button = Button(300, 375, exit_img, 7)
+    pressed = widgets["main"].draw(screen)
     
-    play_pressed = play_button.draw(screen)
-    options_pressed = options_button.draw(screen)
-    exit_pressed = exit_button.draw(screen)
-    
-    if can_click():
-        if play_pressed:
+    if any(pressed.values()):
+        mark_click()
+        if pressed["play"]:
             last_button_clicked = "play"
             try:
                 save_settings()
                 print("Iniciando pantalla_de_inicio.py...")
                 
-                if not os.path.exists("pantalla_de_inicio.py"):
-                    show_message("Error: pantalla_de_inicio.py no encontrado", ERROR_COL)
-                    print("Error: Asegúrate de que pantalla_de_inicio.py existe")
-                    return True
+                back_to_menu = pantalla_de_inicio.run(screen, game_settings)
+                if not back_to_menu or not pygame.display.get_init():
+                    return False
                 
-                pygame.quit()
-                subprocess.call([sys.executable, "pantalla_de_inicio.py"])
-                return False
+                # Volver a la ventana del menú principal
+                globals()['screen'] = game_host.ajustar_pantalla(None, (SCREEN_WIDTH, SCREEN_HEIGHT), "Main Menu")
+                pygame.event.clear()
+                # El MOUSEBUTTONUP del clic en Play lo consumió el lanzador: sin esto Play
+                # queda apretado y el próximo clic no cuenta
+                widgets["main"].reset()
                 
             except Exception as e:
                 show_message(f"Error: {str(e)}", ERROR_COL)
                 print(f"Error al abrir el juego: {e}")
-                try:
-                    pygame.init()
-                    globals()['screen'] = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-                except:
-                    pass
+                if pygame.display.get_init():
+                    globals()['screen'] = game_host.ajustar_pantalla(None, (SCREEN_WIDTH, SCREEN_HEIGHT), "Main Menu")
+                widgets["main"].reset()
             return True
         
-        if options_pressed:
+        if pressed["options"]:
             last_button_clicked = "options"
             menu_state = "options"
             return True
         
-        if exit_pressed:
+        if pressed["exit"]:
             last_button_clicked = "exit"
             return False
     
@@ -252,26 +287,19 @@ def handle_options_menu():
     global menu_state
     
     # Dibujar fondo del menú de opciones (OPTIONS)
-    screen.blit(pygame.transform.scale(fondo_menu_option, (SCREEN_WIDTH, SCREEN_HEIGHT)), (0, 0))
-    
-    video_button = Button(100, 120, video_img, 7)
-    audio_button = Button(400, 120, audio_img, 7)
-    credit_button = Button(100, 300, credit_img, 7)
-    back_button = Button(400, 300, back_img, 7)
+    screen.blit(fondo_menu_option, (0, 0))
     
-    video_pressed = video_button.draw(screen)
-    audio_pressed = audio_button.draw(screen)
-    credit_pressed = credit_button.draw(screen)
-    back_pressed = back_button.draw(screen)
+    pressed = widgets["options"].draw(screen)
     
-    if can_click():
-        if video_pressed:
+    if any(pressed.values()):
+        mark_click()
+        if pressed["video"]:
             menu_state = "video"
-        elif audio_pressed:
+        elif pressed["audio"]:
             menu_state = "audio"
-        elif credit_pressed:
+        elif pressed["credits"]:
             menu_state = "credits"
-        elif back_pressed:
+        elif pressed["back"]:
             menu_state = "main"
 
 def handle_credits():
@@ -304,15 +332,8 @@ def handle_credits():
     draw_centered_text("Ins. Ind. Luis A. Huergo", medium_font, TEXT_COL, y_pos + huergo_img.get_height() + 20)
     draw_centered_text("2025", small_font, TEXT_COL, SCREEN_HEIGHT - 80)
     
-    back_x = SCREEN_WIDTH // 2 - back_img.get_width() // 2
-    back_y = SCREEN_HEIGHT - 70
-    back_button = Button(back_x, back_y, back_img, 1)
-    
-    # Dibujar el botón SIEMPRE primero
-    back_button.draw(screen)
-    
-    # Luego verificar si fue clickeado
-    if back_button.clicked and can_click():
+    if widgets["credits"].draw(screen)["back"]:
+        mark_click()
         menu_state = "options"
 
 def handle_video_settings():
@@ -384,16 +405,9 @@ def handle_video_settings():
         status = "activado" if game_settings["vsync"] else "desactivado"
         show_message(f"V-Sync {status}", SUCCESS_COL)
     
-    # Botón back usando Button
-    back_x = SCREEN_WIDTH // 2 - back_img.get_width() // 2
-    back_y = SCREEN_HEIGHT - 80
-    back_button = Button(back_x, back_y, back_img, 1)
-    
-    # Dibujar el botón SIEMPRE primero
-    back_button.draw(screen)
-    
-    # Luego verificar si fue clickeado
-    if back_button.clicked and can_click():
+    # Botón back (creado en build_widgets)
+    if widgets["video"].draw(screen)["back"]:
+        mark_click()
         menu_state = "options"
 
 def handle_audio_settings():
@@ -461,16 +475,9 @@ def handle_audio_settings():
         elif test_music_rect.collidepoint(mouse_pos):
             show_message("Reproduciendo música", SUCCESS_COL)
     
-    # Botón back usando Button
-    back_x = SCREEN_WIDTH // 2 - back_img.get_width() // 2
-    back_y = SCREEN_HEIGHT - 80
-    back_button = Button(back_x, back_y, back_img, 1)
-    
-    # Dibujar el botón SIEMPRE primero
-    back_button.draw(screen)
-    
-    # Luego verificar si fue clickeado
-    if back_button.clicked and can_click():
+    # Botón back (creado en build_widgets)
+    if widgets["audio"].draw(screen)["back"]:
+        mark_click()
         menu_state = "options"
 
 def handle_events():
@@ -493,6 +500,15 @@ def handle_events():
             
             elif event.key == pygame.K_c:
                 menu_state = "credits"
+        
+        # Los botones de la pantalla actual reciben hover y clics por eventos
+        if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
+            if menu_state in widgets:
+                widgets[menu_state].handle_event(event)
+        elif event.type == pygame.MOUSEBUTTONUP:
+            # Soltar el botón llega a todas las pantallas: el clic pudo empezar en la anterior
+            for group in widgets.values():
+                group.handle_event(event)
     
     return True
 
@@ -539,11 +555,13 @@ def main():
         save_settings()
 
     try:
-        # Escalar fondos a la resolución actual
-        fondo_menu = pygame.transform.scale(fondo_menu, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        fondo_menu_option = pygame.transform.scale(fondo_menu_option, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Fondos a la resolución actual
+        fondo_menu = load_background("fondo_menu.png")
+        fondo_menu_option = load_background("fondo_menu_option.png")
     except:
         print("⚠️ Error escalando fondos")
+    
+    build_widgets()
 
     run = True
 
@@ -556,6 +574,8 @@ def main():
     print("   • Click: Interactuar con elementos")
     print("=" * 50)
 
+    estado_anterior = menu_state
+
     while run:
         clock.tick(FPS)
 
@@ -582,6 +602,12 @@ def main():
         elif menu_state == "credits":
             handle_credits()
 
+        # Al cambiar de pantalla sus botones arrancan sin clics a medias
+        if menu_state != estado_anterior:
+            if menu_state in widgets:
+                widgets[menu_state].reset()
+            estado_anterior = menu_state
+
         # ✅ Verificar otra vez antes de dibujar o actualizar
         if not pygame.display.get_init():
             break
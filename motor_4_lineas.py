@@ -0,0 +1,445 @@
+"""Tablero en bitboards y motor negamax/alfa-beta para la CPU de 4_lineas.py.
+
+Cada columna ocupa ALTO = FILAS + 1 bits (la fila extra de arriba queda siempre
+vacía y separa una columna de la siguiente), así que el tablero de 6x7 entra en
+un int de 49 bits. Con eso, poner una ficha es una suma y ver si hay cuatro en
+línea son cuatro pares de shifts, sin recorrer el tablero.
+
+La búsqueda sigue el esquema de un resolvedor clásico de 4 en línea:
+  - nunca considera jugadas que le dejan al rival ganar en la jugada siguiente,
+  - ordena las jugadas por cuántas amenazas crean (y el centro primero),
+  - guarda en una tabla de transposición el valor y la mejor jugada de cada posición,
+  - profundiza de a un nivel (iterative deepening) hasta la profundidad o el tiempo pedidos.
+"""
+import random
+import threading
+import time
+
+FILAS, COLUMNAS = 6, 7
+ALTO = FILAS + 1
+CASILLAS = FILAS * COLUMNAS
+
+# Un bit por columna en la fila de abajo, y todas las casillas jugables
+ABAJO = sum(1 << (c * ALTO) for c in range(COLUMNAS))
+TABLERO = ABAJO * ((1 << FILAS) - 1)
+COLUMNA = [((1 << FILAS) - 1) << (c * ALTO) for c in range(COLUMNAS)]
+ARRIBA = [1 << (FILAS - 1 + c * ALTO) for c in range(COLUMNAS)]
+CENTRO = COLUMNA[COLUMNAS // 2]
+
+# Del centro hacia los costados: a igual puntaje se prueba primero lo del medio
+ORDEN_COLUMNAS = sorted(range(COLUMNAS), key=lambda c: abs(c - COLUMNAS // 2))
+
+# Valor de ganar con la ficha número n: GANA + CASILLAS + 1 - n (ganar antes vale más,
+# y toda victoria vale más que GANA). La heurística de las hojas queda muy por debajo.
+GANA = 1000
+INFINITO = 10 ** 6
+
+# Tipo de valor guardado en la tabla de transposición
+EXACTO, INFERIOR, SUPERIOR = 0, 1, 2
+
+# Cada cuántos nodos (~1 ms) se mira el reloj, si pidieron cancelar la búsqueda y, si se
+# busca en un hilo, se suelta el GIL para que el bucle del juego no espere su turno
+_CONTROL_TIEMPO = 255
+
+# Nodos que equivalen a un segundo de búsqueda (lo que recorre el motor en un
+# equipo común). Con determinista=True el límite de tiempo se pasa a nodos: la
+# misma posición da siempre la misma jugada, sin importar la máquina ni la carga.
+NODOS_POR_SEGUNDO = 150_000
+
+
+def hay_cuatro(fichas):
+    """True si `fichas` tiene cuatro en línea (vertical, horizontal o diagonal)"""
+    m = fichas & (fichas >> 1)
+    if m & (m >> 2):
+        return True
+    m = fichas & (fichas >> ALTO)
+    if m & (m >> 2 * ALTO):
+        return True
+    m = fichas & (fichas >> (ALTO - 1))
+    if m & (m >> 2 * (ALTO - 1)):
+        return True
+    m = fichas & (fichas >> (ALTO + 1))
+    return bool(m & (m >> 2 * (ALTO + 1)))
+
+
+def _lineas_abiertas(fichas):
+    """Casillas (ocupadas o no, incluso fuera del tablero) que completarían cuatro en línea.
+
+    Es la parte cara de amenazas(); no depende de la máscara, así que la
+    búsqueda la calcula una vez por hijo y se la pasa. Los shifts están
+    escritos como números (ALTO = 7) porque esto corre en cada nodo.
+    """
+    # Vertical: solo se puede completar hacia arriba
+    r = (fichas << 1) & (fichas << 2) & (fichas << 3)
+    # Horizontal (ALTO)
+    p = (fichas << 7) & (fichas << 14)
+    r |= p & ((fichas << 21) | (fichas >> 7))
+    p = (fichas >> 7) & (fichas >> 14)
+    r |= p & ((fichas << 7) | (fichas >> 21))
+    # Diagonal / (ALTO + 1)
+    p = (fichas << 8) & (fichas << 16)
+    r |= p & ((fichas << 24) | (fichas >> 8))
+    p = (fichas >> 8) & (fichas >> 16)
+    r |= p & ((fichas << 8) | (fichas >> 24))
+    # Diagonal \ (ALTO - 1)
+    p = (fichas << 6) & (fichas << 12)
+    r |= p & ((fichas << 18) | (fichas >> 6))
+    p = (fichas >> 6) & (fichas >> 12)
+    r |= p & ((fichas << 6) | (fichas >> 18))
+    return r
+
+
+assert ALTO == 7, "_lineas_abiertas tiene los shifts escritos para ALTO = 7"
+
+
+def amenazas(fichas, mascara):
+    """Casillas vacías (no necesariamente jugables todavía) que le dan cuatro en línea a `fichas`"""
+    return _lineas_abiertas(fichas) & (TABLERO ^ mascara)
+
+
+def jugables(mascara):
+    """Un bit por columna no llena: la casilla donde caería la próxima ficha"""
+    return (mascara + ABAJO) & TABLERO
+
+
+class Tablero:
+    """Estado de una partida: las fichas de cada jugador (1 y 2) como bitboards"""
+
+    def __init__(self):
+        self.fichas = {1: 0, 2: 0}
+        self.mascara = 0
+        self.jugadas = 0
+
+    def puede_jugar(self, col):
+        return 0 <= col < COLUMNAS and not self.mascara & ARRIBA[col]
+
+    def columnas_validas(self):
+        return [c for c in range(COLUMNAS) if self.puede_jugar(c)]
+
+    def fila_libre(self, col):
+        """Fila (0 = la de arriba, como en la matriz del juego) donde caería una ficha en `col`"""
+        ocupadas = (self.mascara & COLUMNA[col]).bit_count()
+        return FILAS - 1 - ocupadas
+
+    def jugar(self, col, pieza):
+        """Suelta una ficha de `pieza` en `col` y devuelve la fila donde quedó"""
+        fila = self.fila_libre(col)
+        bit = (self.mascara + (1 << (col * ALTO))) & COLUMNA[col]
+        self.fichas[pieza] |= bit
+        self.mascara |= bit
+        self.jugadas += 1
+        return fila
+
+    def gano(self, pieza):
+        return hay_cuatro(self.fichas[pieza])
+
+    def lleno(self):
+        return self.jugadas == CASILLAS
+
+    def copia(self):
+        tablero = Tablero()
+        tablero.fichas = dict(self.fichas)
+        tablero.mascara = self.mascara
+        tablero.jugadas = self.jugadas
+        return tablero
+
+    @classmethod
+    def desde_matriz(cls, matriz):
+        """Arma el tablero desde la lista de listas de 4_lineas.py (fila 0 arriba, 0 = vacío)"""
+        tablero = cls()
+        for col in range(COLUMNAS):
+            for fila in range(FILAS - 1, -1, -1):
+                pieza = matriz[fila][col]
+                if pieza == 0:
+                    break
+                tablero.jugar(col, pieza)
+        return tablero
+
+
+class _TiempoAgotado(Exception):
+    pass
+
+
+class Motor:
+    """Busca la mejor columna con negamax y poda alfa-beta.
+
+    La tabla de transposición se conserva entre jugadas de la misma partida
+    (las posiciones que se vuelven a ver ya tienen valor y mejor jugada).
+    `libro` es un libro de aperturas (libro_4_lineas.Libro) que la dificultad
+    máxima consulta antes de buscar.
+    """
+
+    def __init__(self, max_entradas=2_000_000, libro=None):
+        self.max_entradas = max_entradas
+        self.libro = libro
+        self.tabla = {}
+        self.nodos = 0
+        self.profundidad = 0
+        self.segundos = 0.0
+        self._limite = float("inf")
+        self._max_nodos = float("inf")
+        self._cancelar = None
+
+    def limpiar(self):
+        self.tabla.clear()
+
+    # ------------------------------------------------------------------
+
+    def _negamax(self, actual, mascara, jugadas, profundidad, alfa, beta, lineas_propias, lineas_rival):
+        """Valor de la posición para el que mueve. Supone que no puede ganar en esta jugada
+        (el padre ya lo descartó al elegir solo jugadas que no pierden).
+        `lineas_propias` y `lineas_rival` son _lineas_abiertas() de cada lado, que ya tiene el padre."""
+        self.nodos += 1
+        if not self.nodos & _CONTROL_TIEMPO:
+            if self._cancelar is not None:
+                if self._cancelar.is_set():
+                    raise _TiempoAgotado()
+                time.sleep(0)
+            if time.perf_counter() > self._limite or self.nodos > self._max_nodos:
+                raise _TiempoAgotado()
+
+        libres = TABLERO ^ mascara
+        posibles = (mascara + ABAJO) & TABLERO
+        rival_gana = lineas_rival & libres
+        forzadas = posibles & rival_gana
+        if forzadas:
+            if forzadas & (forzadas - 1):
+                # Dos amenazas inmediatas del rival: no se pueden tapar las dos
+                return -(GANA + CASILLAS - jugadas - 1)
+            posibles = forzadas
+        # Jugar debajo de una amenaza del rival le deja la casilla servida
+        posibles &= ~(rival_gana >> 1)
+        if not posibles:
+            return -(GANA + CASILLAS - jugadas - 1)
+        if jugadas >= CASILLAS - 2:
+            return 0
+
+        # Lo mejor posible es ganar con la ficha siguiente a la próxima
+        maximo = GANA + CASILLAS - jugadas - 2
+        if beta > maximo:
+            beta = maximo
+            if alfa >= beta:
+                return beta
+
+        clave = actual + mascara
+        entrada = self.tabla.get(clave)
+        mejor_col = -1
+        if entrada is not None:
+            e_profundidad, tipo, valor, mejor_col = entrada
+            if e_profundidad >= profundidad:
+                if tipo == EXACTO:
+                    return valor
+                if tipo == INFERIOR:
+                    if valor > alfa:
+                        alfa = valor
+                elif valor < beta:
+                    beta = valor
+                if alfa >= beta:
+                    return valor
+
+        rival = actual ^ mascara
+        if profundidad <= 0:
+            # Hoja: amenazas propias menos las del rival, y control del centro
+            return (4 * ((lineas_propias & libres).bit_count() - rival_gana.bit_count())
+                    + (actual & CENTRO).bit_count() - (rival & CENTRO).bit_count())
+
+        # Orden: jugada de la tabla, después las que más amenazas crean, del centro hacia afuera.
+        # Las líneas de cada hijo se calculan una vez y sirven para ordenar y para el hijo;
+        # cerca de las hojas no vale la pena ordenar y se calculan solo para los hijos que se visitan.
+        candidatas = []
+        for col in ORDEN_COLUMNAS:
+            bit = posibles & COLUMNA[col]
+            if bit:
+                if profundidad > 2:
+                    lineas = _lineas_abiertas(actual | bit)
+                    puntaje = 1000 if col == mejor_col else (lineas & libres).bit_count()
+                else:
+                    lineas = None
+                    puntaje = col == mejor_col
+                candidatas.append((puntaje, bit, col, lineas))
+        if len(candidatas) > 1:
+            candidatas.sort(key=_puntaje, reverse=True)
+
+        alfa_original = alfa
+        mejor = -INFINITO
+        for _, bit, col, lineas in candidatas:
+            if lineas is None:
+                lineas = _lineas_abiertas(actual | bit)
+            valor = -self._negamax(rival, mascara | bit, jugadas + 1, profundidad - 1, -beta, -alfa,
+                                   lineas_rival, lineas)
+            if valor > mejor:
+                mejor, mejor_col = valor, col
+                if valor > alfa:
+                    alfa = valor
+                    if alfa >= beta:
+                        break
+
+        if mejor <= alfa_original:
+            tipo = SUPERIOR
+        elif mejor >= beta:
+            tipo = INFERIOR
+        else:
+            tipo = EXACTO
+        if len(self.tabla) >= self.max_entradas:
+            self.tabla.clear()
+        self.tabla[clave] = (profundidad, tipo, mejor, mejor_col)
+        return mejor
+
+    # ------------------------------------------------------------------
+
+    def buscar(self, tablero, pieza, profundidad=CASILLAS, segundos=None, cancelar=None, nodos=None):
+        """Devuelve (columna, valor) para que `pieza` juegue en `tablero`.
+
+        Profundiza de a un nivel hasta `profundidad` o hasta que se acaben los
+        `segundos` o los `nodos` (o hasta que se active el threading.Event
+        `cancelar`); si se corta una iteración a la mitad se usa la anterior completa.
+        valor > GANA: gana seguro; valor < -GANA: pierde seguro (si había una
+        sola jugada que no pierde se devuelve sin buscar, con valor 0).
+        """
+        inicio = time.perf_counter()
+        self._limite = inicio + segundos if segundos else float("inf")
+        self._max_nodos = nodos if nodos else float("inf")
+        self._cancelar = cancelar
+        self.nodos = 0
+        self.profundidad = 0
+
+        actual, mascara, jugadas = tablero.fichas[pieza], tablero.mascara, tablero.jugadas
+        rival = actual ^ mascara
+        posibles = jugables(mascara)
+        try:
+            # Ganar ya
+            ganadoras = posibles & amenazas(actual, mascara)
+            for col in ORDEN_COLUMNAS:
+                if ganadoras & COLUMNA[col]:
+                    return col, GANA + CASILLAS - jugadas
+
+            rival_gana = amenazas(rival, mascara)
+            forzadas = posibles & rival_gana
+            seguras = (forzadas or posibles) & ~(rival_gana >> 1)
+            candidatas = [c for c in ORDEN_COLUMNAS if seguras & COLUMNA[c]]
+            if forzadas & (forzadas - 1) or not candidatas:
+                # Se pierde igual: se tapa una amenaza (o cualquier jugada válida)
+                col = next(c for c in ORDEN_COLUMNAS if (forzadas or posibles) & COLUMNA[c])
+                return col, -(GANA + CASILLAS - jugadas - 1)
+            if len(candidatas) == 1:
+                return candidatas[0], 0
+
+            mejor_col, mejor_valor = candidatas[0], 0
+            for nivel in range(1, min(profundidad, CASILLAS - jugadas) + 1):
+                try:
+                    col, valor = self._raiz(actual, mascara, jugadas, nivel, candidatas)
+                except _TiempoAgotado:
+                    break
+                mejor_col, mejor_valor = col, valor
+                self.profundidad = nivel
+                # La mejor de esta iteración se prueba primero en la siguiente
+                candidatas.remove(col)
+                candidatas.insert(0, col)
+                if abs(valor) > GANA:
+                    break
+            return mejor_col, mejor_valor
+        finally:
+            self.segundos = time.perf_counter() - inicio
+
+    def _raiz(self, actual, mascara, jugadas, profundidad, candidatas):
+        alfa, mejor_col = -INFINITO, candidatas[0]
+        rival = actual ^ mascara
+        lineas_rival = _lineas_abiertas(rival)
+        for col in candidatas:
+            bit = jugables(mascara) & COLUMNA[col]
+            valor = -self._negamax(rival, mascara | bit, jugadas + 1, profundidad - 1, -INFINITO, -alfa,
+                                   lineas_rival, _lineas_abiertas(actual | bit))
+            if valor > alfa:
+                alfa, mejor_col = valor, col
+        return mejor_col, alfa
+
+    def nodos_por_segundo(self):
+        return self.nodos / self.segundos if self.segundos else 0.0
+
+
+def _puntaje(candidata):
+    return candidata[0]
+
+
+def parametros_dificultad(factor):
+    """(profundidad máxima, segundos, probabilidad de jugar al azar) para el factor de menu_dificultad.
+
+    Fácil (0.4) mira 2 jugadas y a veces se distrae, media (0.7) mira 6 y
+    difícil (1.0) busca sin límite de profundidad durante un segundo.
+    """
+    if factor >= 1.0:
+        return CASILLAS, 1.0, 0.0
+    return max(1, round(factor * factor * 12)), None, (1.0 - factor) / 2
+
+
+def elegir_columna(motor, tablero, pieza, factor, cancelar=None, determinista=False, rng=random):
+    """Columna que juega la CPU con la dificultad `factor`.
+
+    Con `determinista` el límite de tiempo se cambia por NODOS_POR_SEGUNDO
+    nodos por segundo; `rng` es de donde salen las jugadas al azar.
+    """
+    profundidad, segundos, azar = parametros_dificultad(factor)
+    nodos = None
+    if determinista and segundos:
+        nodos, segundos = int(segundos * NODOS_POR_SEGUNDO), None
+    if motor.libro is not None and factor >= 1.0:
+        col = motor.libro.jugada(tablero, pieza)
+        if col is not None and tablero.puede_jugar(col):
+            return col
+    if azar and rng.random() < azar:
+        # Jugada distraída, pero nunca regala una victoria inmediata ni deja de ganar
+        col, valor = motor.buscar(tablero, pieza, profundidad=1)
+        if valor <= GANA:
+            rival = tablero.fichas[pieza] ^ tablero.mascara
+            rival_gana = amenazas(rival, tablero.mascara)
+            opciones = [c for c in tablero.columnas_validas()
+                        if not (jugables(tablero.mascara) & COLUMNA[c]) & (rival_gana >> 1)]
+            if opciones and not jugables(tablero.mascara) & rival_gana:
+                return rng.choice(opciones)
+        return col
+    return motor.buscar(tablero, pieza, profundidad, segundos, cancelar, nodos)[0]
+
+
+class BusquedaEnHilo:
+    """Corre elegir_columna en un hilo aparte para que el juego siga dibujando y
+    atendiendo eventos; el bucle principal pregunta terminada() en cada frame.
+
+    Con en_hilo=False se busca en el momento (simulaciones y replays). Con
+    determinista=True la búsqueda se corta por nodos y no por reloj, para que
+    una partida grabada y su replay elijan la misma jugada. El sorteo de las
+    jugadas al azar sale del random del juego, pero se hace acá y no en el
+    hilo, para no mezclarse con lo que el juego sortea mientras tanto.
+    """
+
+    def __init__(self, motor, tablero, pieza, factor, en_hilo=True, determinista=False):
+        self.columna = None
+        self._cancelar = threading.Event()
+        self._hilo = None
+        argumentos = (motor, tablero.copia() if en_hilo else tablero, pieza, factor, determinista,
+                      random.Random(random.getrandbits(64)))
+        if en_hilo:
+            self._hilo = threading.Thread(target=self._correr, args=argumentos, daemon=True)
+            self._hilo.start()
+        else:
+            self._correr(*argumentos)
+
+    def _correr(self, motor, tablero, pieza, factor, determinista, rng):
+        try:
+            self.columna = elegir_columna(motor, tablero, pieza, factor, self._cancelar, determinista, rng)
+        except Exception as e:
+            # Que la partida siga aunque falle el motor: se juega la columna válida más central
+            print(f"Error buscando la jugada de la CPU: {e}")
+            self.columna = next(c for c in ORDEN_COLUMNAS if tablero.puede_jugar(c))
+
+    def terminada(self):
+        return self._hilo is None or not self._hilo.is_alive()
+
+    def esperar(self):
+        """Espera a que la búsqueda termine"""
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def cancelar(self):
+        """Corta la búsqueda (al salir de la partida) y espera a que el hilo termine"""
+        self._cancelar.set()
+        self.esperar()
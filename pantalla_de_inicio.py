@@ -1,9 +1,12 @@
 import pygame
 import os
 import sys
-import subprocess
 from datetime import datetime
 
+import backgrounds
+import game_host
+import text_cache
+
 pygame.init()
 
 
@@ -20,8 +23,9 @@ GRADIENT_START = (25, 25, 45)
 GRADIENT_END = (15, 15, 25)
 
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption(" Minigames - Selecciona tu Juego")
+CAPTION = " Minigames - Selecciona tu Juego"
+
+screen = None
 clock = pygame.time.Clock()
 
 
@@ -133,24 +137,15 @@ scroll_offset = 0
 max_scroll = 0
 
 def draw_gradient_background():
-    """Dibuja un fondo con gradiente"""
-    if not pygame.display.get_init():
+    """Dibuja un fondo con gradiente (se genera una vez por tamaño de ventana)"""
+    if not pygame.display.get_init() or not screen:
         return
 
-    for y in range(SCREEN_HEIGHT):
-        ratio = y / SCREEN_HEIGHT
-        r = int(GRADIENT_START[0] * (1 - ratio) + GRADIENT_END[0] * ratio)
-        g = int(GRADIENT_START[1] * (1 - ratio) + GRADIENT_END[1] * ratio)
-        b = int(GRADIENT_START[2] * (1 - ratio) + GRADIENT_END[2] * ratio)
-
-        if screen:
-            pygame.draw.line(screen, (r, g, b), (0, y), (SCREEN_WIDTH, y))
-        else:
-            break
+    screen.blit(backgrounds.gradiente(screen.get_size(), GRADIENT_START, GRADIENT_END), (0, 0))
 
 def draw_text(text, font, color, x, y, center=False):
     """Dibuja texto en pantalla"""
-    text_surface = font.render(text, True, color)
+    text_surface = text_cache.render(font, text, color)
     if center:
         text_rect = text_surface.get_rect(center=(x, y))
         screen.blit(text_surface, text_rect)
@@ -221,13 +216,15 @@ def draw_game_card(game, x, y, width, height, hovered=False):
     
     return None
 
-def launch_game(game_file):
-    """Lanza un juego específico"""
+def launch_game(game_file, settings=None):
+    """Lanza un juego específico dentro del mismo proceso"""
+    global screen
     try:
         if os.path.exists(game_file):
             print(f" Lanzando: {game_file}")
 
-            subprocess.Popen([sys.executable, game_file])
+            game_host.ejecutar_juego(game_file, screen, settings)
+            screen = pygame.display.get_surface()
             return True
         else:
             print(f" Archivo no encontrado: {game_file}")
@@ -272,10 +269,13 @@ def handle_scroll(event):
         scroll_offset -= event.y * scroll_speed
         scroll_offset = max(0, min(scroll_offset, max_scroll))
 
-def main():
-    global mouse_pos, selected_game, scroll_offset, max_scroll
+def run(surface, settings=None):
+    """Bucle del launcher. Devuelve True si se pidió volver al menú principal"""
+    global screen, mouse_pos, selected_game, scroll_offset, max_scroll
     
+    screen = game_host.ajustar_pantalla(surface, (SCREEN_WIDTH, SCREEN_HEIGHT), CAPTION)
     running = True
+    back_to_menu = False
     
     print("=== GAME LAUNCHER INICIADO ===")
     print(" Juegos disponibles:")
@@ -286,6 +286,11 @@ def main():
     
     while running:
         clock.tick(FPS)
+
+        # Un juego pudo haber cerrado la ventana
+        if not pygame.display.get_init():
+            return False
+
         mouse_pos = pygame.mouse.get_pos()
         
 
@@ -298,8 +303,8 @@ def main():
                     running = False
                 elif event.key == pygame.K_q:
                     print("Volviendo al menú principal...")
-                    pygame.quit()  # Cierra la ventana actual
-                    subprocess.Popen([sys.executable, "menu.py"])  # Ejecuta menu.py
+                    back_to_menu = True
+                    running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  
 
@@ -329,8 +334,8 @@ def main():
                                 
                                 if play_button_rect.collidepoint(mouse_pos):
                                     print(f" Intentando lanzar: {game['title']}")
-                                    if launch_game(game["file"]):
-                                        print(f" {game['title']} lanzado exitosamente")
+                                    if launch_game(game["file"], settings):
+                                        print(f" {game['title']} terminado")
                                     else:
                                         print(f" No se pudo lanzar {game['title']}")
                                         print(f"   Verifica que {game['file']} existe")
@@ -402,6 +407,10 @@ def main():
         
         pygame.display.flip()
     
+    return back_to_menu
+
+def main():
+    run(pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT)))
     print(" Cerrando Game Launcher...")
     pygame.quit()
     sys.exit()
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+import player_index
+from player_index import normalizar, clubes_de, nacionalidades_de, formas_escritas
+
+# Versión del formato compilado: si cambia el esquema, se recompila
+VERSION = 2
+
+# Bases ya abiertas (ruta del json -> PlayerDB o PlayerIndex)
+_abiertas = {}
+
+
+def ruta_compilada(ruta_json):
+    """basededatos.json -> basededatos.sqlite (al lado del json, que sigue siendo la fuente editable)"""
+    return os.path.splitext(ruta_json)[0] + ".sqlite"
+
+
+def hash_archivo(ruta):
+    with open(ruta, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _leer_meta(ruta_db):
+    """Devuelve {clave: valor} de la tabla meta, o {} si el archivo no existe o no es válido"""
+    if not os.path.exists(ruta_db):
+        return {}
+    try:
+        conexion = sqlite3.connect(f"file:{ruta_db}?mode=ro", uri=True)
+        try:
+            return dict(conexion.execute("SELECT clave, valor FROM meta"))
+        finally:
+            conexion.close()
+    except sqlite3.Error:
+        return {}
+
+
+def compilar(ruta_json, ruta_db=None):
+    """Compila el json de jugadores a SQLite con textos (clubes, países, posiciones) internados"""
+    ruta_db = ruta_db or ruta_compilada(ruta_json)
+    with open(ruta_json, "rb") as f:
+        contenido = f.read()
+    datos = json.loads(contenido.decode("utf-8"))
+    jugadores = datos["jugadores"] if isinstance(datos, dict) and "jugadores" in datos else datos
+
+    # Mismo orden alfabético que usa PlayerIndex para devolver resultados
+    ordenados = sorted(range(len(jugadores)), key=lambda i: normalizar(jugadores[i].get("nombre", "")))
+    orden_de = {i: orden for orden, i in enumerate(ordenados)}
+
+    temporal = ruta_db + ".tmp"
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    conexion = sqlite3.connect(temporal)
+    try:
+        conexion.executescript("""
+            CREATE TABLE meta (clave TEXT PRIMARY KEY, valor TEXT);
+            CREATE TABLE textos (id INTEGER PRIMARY KEY, texto TEXT UNIQUE);
+            CREATE TABLE jugadores (
+                orden INTEGER PRIMARY KEY,
+                id INTEGER,
+                posicion_base INTEGER,
+                nombre_norm TEXT,
+                apellido_norm TEXT,
+                apodo_norm TEXT,
+                club_actual INTEGER,
+                datos TEXT
+            );
+            CREATE TABLE jugador_club (texto INTEGER, orden INTEGER, PRIMARY KEY (texto, orden)) WITHOUT ROWID;
+            CREATE TABLE jugador_nacion (texto INTEGER, orden INTEGER, PRIMARY KEY (texto, orden)) WITHOUT ROWID;
+            CREATE TABLE jugador_posicion (texto INTEGER, orden INTEGER, PRIMARY KEY (texto, orden)) WITHOUT ROWID;
+            CREATE TABLE palabras (palabra TEXT, orden INTEGER, PRIMARY KEY (palabra, orden)) WITHOUT ROWID;
+        """)
+
+        textos = {}
+
+        def internar(texto):
+            if texto not in textos:
+                textos[texto] = len(textos) + 1
+            return textos[texto]
+
+        filas, clubes, naciones, posiciones, palabras = [], [], [], [], []
+        for i, jugador in enumerate(jugadores):
+            orden = orden_de[i]
+            nombre = normalizar(jugador.get("nombre", ""))
+            apodo = normalizar(jugador["apodo"]) if "apodo" in jugador else None
+            filas.append((orden, jugador.get("id"), i, nombre, nombre.split()[-1] if nombre else "",
+                          apodo, internar(jugador.get("club actual", "")),
+                          json.dumps(jugador, ensure_ascii=False, separators=(",", ":"))))
+            clubes += [(internar(c), orden) for c in set(clubes_de(jugador))]
+            naciones += [(internar(n), orden) for n in set(nacionalidades_de(jugador))]
+            posiciones += [(internar(p), orden) for p in set(jugador.get("posicion", []))]
+            palabras += [(p, orden) for p in set(nombre.split() + (apodo or "").split())]
+
+        conexion.executemany("INSERT INTO jugadores VALUES (?, ?, ?, ?, ?, ?, ?, ?)", filas)
+        conexion.executemany("INSERT INTO textos VALUES (?, ?)", [(i, t) for t, i in textos.items()])
+        conexion.executemany("INSERT INTO jugador_club VALUES (?, ?)", clubes)
+        conexion.executemany("INSERT INTO jugador_nacion VALUES (?, ?)", naciones)
+        conexion.executemany("INSERT INTO jugador_posicion VALUES (?, ?)", posiciones)
+        conexion.executemany("INSERT INTO palabras VALUES (?, ?)", palabras)
+        conexion.executescript("""
+            CREATE INDEX idx_jugadores_id ON jugadores (id);
+            CREATE INDEX idx_jugadores_nombre ON jugadores (nombre_norm);
+            CREATE INDEX idx_jugadores_apellido ON jugadores (apellido_norm);
+            CREATE INDEX idx_jugadores_apodo ON jugadores (apodo_norm);
+            CREATE INDEX idx_jugadores_club_actual ON jugadores (club_actual);
+        """)
+        conexion.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("version", str(VERSION)),
+            ("hash_fuente", hashlib.sha256(contenido).hexdigest()),
+            ("jugadores", str(len(jugadores))),
+        ])
+        conexion.commit()
+        conexion.execute("VACUUM")
+    finally:
+        conexion.close()
+
+    os.replace(temporal, ruta_db)
+    print(f"Base compilada: {len(jugadores)} jugadores -> {ruta_db}")
+    return ruta_db
+
+
+def asegurar_compilada(ruta_json, ruta_db=None):
+    """Recompila la base si no existe, si cambió el hash del json o si cambió el formato"""
+    ruta_db = ruta_db or ruta_compilada(ruta_json)
+    meta = _leer_meta(ruta_db)
+    if meta.get("version") != str(VERSION) or meta.get("hash_fuente") != hash_archivo(ruta_json):
+        compilar(ruta_json, ruta_db)
+    return ruta_db
+
+
+class PlayerDB:
+    """Base de jugadores compilada: las consultas leen de SQLite solo los registros que necesitan.
+
+    Ofrece las mismas búsquedas que player_index.PlayerIndex.
+    """
+
+    def __init__(self, ruta_db):
+        self.ruta_db = ruta_db
+        self._conexion = None
+        # orden -> jugador ya leído, para no decodificar dos veces el mismo registro
+        self._leidos = {}
+
+    def _db(self):
+        if self._conexion is None:
+            self._conexion = sqlite3.connect(f"file:{self.ruta_db}?mode=ro", uri=True)
+        return self._conexion
+
+    def _jugadores(self, filas):
+        """Convierte filas (orden, datos) en diccionarios, reutilizando los ya leídos"""
+        resultado = []
+        for orden, datos in filas:
+            if orden not in self._leidos:
+                self._leidos[orden] = json.loads(datos)
+            resultado.append(self._leidos[orden])
+        return resultado
+
+    def _por_texto(self, tabla, texto):
+        return self._jugadores(self._db().execute(
+            f"SELECT j.orden, j.datos FROM {tabla} r JOIN textos t ON t.id = r.texto "
+            f"JOIN jugadores j ON j.orden = r.orden WHERE t.texto = ? ORDER BY j.posicion_base", (texto,)))
+
+    def contar(self):
+        return self._db().execute("SELECT COUNT(*) FROM jugadores").fetchone()[0]
+
+    def todos(self):
+        """Todos los jugadores en el orden de la base (lee la tabla completa)"""
+        return self._jugadores(self._db().execute("SELECT orden, datos FROM jugadores ORDER BY posicion_base"))
+
+    def obtener(self, id_jugador):
+        filas = self._db().execute("SELECT orden, datos FROM jugadores WHERE id = ? LIMIT 1", (id_jugador,))
+        jugadores = self._jugadores(filas)
+        return jugadores[0] if jugadores else None
+
+    def buscar_prefijo(self, texto, limite=None, excluir_ids=()):
+        """Jugadores cuyo nombre o apodo tiene palabras que empiezan con cada palabra de `texto`"""
+        palabras = normalizar(texto).split()
+        if not palabras:
+            return []
+
+        subconsultas = " INTERSECT ".join(
+            "SELECT orden FROM palabras WHERE palabra >= ? AND palabra < ?" for _ in palabras)
+        parametros = []
+        for palabra in palabras:
+            # Todo lo que empieza con `palabra` queda entre palabra y palabra + el mayor carácter
+            parametros += [palabra, palabra + "\U0010ffff"]
+
+        consulta = f"SELECT orden, datos FROM jugadores WHERE orden IN ({subconsultas})"
+        excluir_ids = list(excluir_ids)
+        if excluir_ids:
+            consulta += f" AND id NOT IN ({', '.join('?' * len(excluir_ids))})"
+            parametros += excluir_ids
+        consulta += " ORDER BY orden"
+        if limite is not None:
+            consulta += " LIMIT ?"
+            parametros.append(limite)
+        return self._jugadores(self._db().execute(consulta, parametros))
+
+    def buscar_exacto(self, texto):
+        """Primer jugador (en el orden de la base) cuyo nombre, apellido o apodo coincide con `texto`"""
+        clave = normalizar(texto)
+        if not clave:
+            return None
+        filas = self._db().execute(
+            "SELECT orden, datos FROM jugadores WHERE nombre_norm = ? OR apellido_norm = ? OR apodo_norm = ? "
+            "ORDER BY posicion_base", (clave, clave, clave))
+        candidatos = self._jugadores(filas)
+        if not candidatos:
+            return None
+
+        # Si alguno coincide escrito igual (con tildes) tiene prioridad
+        texto = " ".join(texto.lower().split())
+        exactos = [j for j in candidatos if texto in formas_escritas(j)]
+        return (exactos or candidatos)[0]
+
+    def jugadores_de_club(self, club):
+        return self._por_texto("jugador_club", club)
+
+    def jugadores_de_nacionalidad(self, nacionalidad):
+        return self._por_texto("jugador_nacion", nacionalidad)
+
+    def jugadores_en_posicion(self, posicion):
+        return self._por_texto("jugador_posicion", posicion)
+
+    def jugadores_de_club_actual(self, club):
+        return self._jugadores(self._db().execute(
+            "SELECT j.orden, j.datos FROM jugadores j JOIN textos t ON t.id = j.club_actual "
+            "WHERE t.texto = ? ORDER BY j.posicion_base", (club,)))
+
+    def bitsets(self, clubes, nacionalidades):
+        """(tipo, texto) -> int con el bit posicion_base de cada jugador del club o la nacionalidad.
+
+        Sale de las tablas de relación sin leer los registros de los jugadores.
+        """
+        resultado = {("equipo", c): 0 for c in clubes}
+        resultado.update({("seleccion", n): 0 for n in nacionalidades})
+        for tabla, tipo, textos in (("jugador_club", "equipo", clubes), ("jugador_nacion", "seleccion", nacionalidades)):
+            textos = list(textos)
+            if not textos:
+                continue
+            filas = self._db().execute(
+                f"SELECT t.texto, j.posicion_base FROM {tabla} r JOIN textos t ON t.id = r.texto "
+                f"JOIN jugadores j ON j.orden = r.orden WHERE t.texto IN ({', '.join('?' * len(textos))})", textos)
+            for texto, posicion in filas:
+                resultado[(tipo, texto)] |= 1 << posicion
+        return resultado
+
+    def posiciones_en_base(self):
+        """id de jugador -> posición en la base (el bit que le corresponde en bitsets())"""
+        return dict(self._db().execute("SELECT id, posicion_base FROM jugadores ORDER BY posicion_base"))
+
+
+def abrir(ruta="basededatos.json"):
+    """Abre la base compilada del json (compilándola si hace falta) y la comparte entre juegos.
+
+    Si no se puede escribir el archivo compilado se usa el índice en memoria de
+    player_index, que responde a las mismas consultas.
+    """
+    if not os.path.isabs(ruta):
+        ruta = os.path.join(player_index.BASE_DIR, ruta)
+    ruta = os.path.normpath(ruta)
+
+    if ruta not in _abiertas:
+        try:
+            _abiertas[ruta] = PlayerDB(asegurar_compilada(ruta))
+        except (OSError, sqlite3.Error) as e:
+            if isinstance(e, FileNotFoundError) and not os.path.exists(ruta):
+                raise
+            print(f"No se pudo usar la base compilada ({e}), se carga el json en memoria")
+            _abiertas[ruta] = player_index.cargar(ruta)
+    return _abiertas[ruta]
+
+
+if __name__ == "__main__":
+    compilar(os.path.join(player_index.BASE_DIR, "basededatos.json"))
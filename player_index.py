@@ -0,0 +1,213 @@
+import json
+import os
+import unicodedata
+
+# Carpeta del proyecto: las rutas relativas se resuelven contra ella
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Índices ya construidos (ruta absoluta -> PlayerIndex), compartidos entre juegos
+_indices = {}
+
+
+def normalizar(texto):
+    """Pasa a minúsculas, quita tildes y espacios repetidos ("Julián  Álvarez" -> "julian alvarez")"""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.lower().split())
+
+
+def clubes_de(jugador):
+    """Devuelve los clubes de un jugador (la base usa 'clubes totales' y a veces 'clubes_totales')"""
+    return jugador.get("clubes totales") or jugador.get("clubes_totales") or []
+
+
+def nacionalidades_de(jugador):
+    """Devuelve las nacionalidades de un jugador como lista (en la base puede ser texto o lista)"""
+    nacionalidad = jugador.get("nacionalidad", "")
+    if isinstance(nacionalidad, list):
+        return nacionalidad
+    return [nacionalidad]
+
+
+def formas_escritas(jugador):
+    """Nombre, apellido y apodo en minúsculas pero con tildes, para preferir coincidencias exactas"""
+    nombre = " ".join(jugador.get("nombre", "").lower().split())
+    formas = {nombre, nombre.split()[-1] if nombre else ""}
+    if "apodo" in jugador:
+        formas.add(" ".join(jugador["apodo"].lower().split()))
+    return formas
+
+
+class _NodoTrie:
+    __slots__ = ("hijos", "rangos")
+
+    def __init__(self):
+        self.hijos = {}
+        # Posiciones (en orden alfabético) de los jugadores con alguna palabra que pasa por este nodo
+        self.rangos = []
+
+
+class PlayerIndex:
+    """Índices de la base de jugadores construidos una sola vez al cargarla"""
+
+    def __init__(self, jugadores):
+        self.jugadores = jugadores
+        # Orden alfabético por nombre normalizado: las búsquedas devuelven en este orden
+        self.ordenados = sorted(jugadores, key=lambda j: normalizar(j.get("nombre", "")))
+
+        self.por_id = {}
+        self.por_nombre = {}
+        self.por_apodo = {}
+        self.por_apellido = {}
+        self.por_club = {}
+        self.por_nacionalidad = {}
+        self.por_posicion = {}
+        self.por_club_actual = {}
+        self._posicion_en_base = {}
+        self._palabras = []
+        self._raiz = _NodoTrie()
+
+        for i, jugador in enumerate(jugadores):
+            self._posicion_en_base[id(jugador)] = i
+            self.por_id[jugador.get("id")] = jugador
+
+            nombre = normalizar(jugador.get("nombre", ""))
+            if nombre:
+                self.por_nombre.setdefault(nombre, []).append(jugador)
+                self.por_apellido.setdefault(nombre.split()[-1], []).append(jugador)
+            if "apodo" in jugador:
+                self.por_apodo.setdefault(normalizar(jugador["apodo"]), []).append(jugador)
+
+            for club in clubes_de(jugador):
+                self.por_club.setdefault(club, []).append(jugador)
+            for nacionalidad in nacionalidades_de(jugador):
+                self.por_nacionalidad.setdefault(nacionalidad, []).append(jugador)
+            for posicion in jugador.get("posicion", []):
+                self.por_posicion.setdefault(posicion, []).append(jugador)
+            self.por_club_actual.setdefault(jugador.get("club actual", ""), []).append(jugador)
+
+        for rango, jugador in enumerate(self.ordenados):
+            palabras = normalizar(jugador.get("nombre", "")).split()
+            palabras += normalizar(jugador.get("apodo", "")).split()
+            self._palabras.append(palabras)
+            for palabra in palabras:
+                self._insertar(palabra, rango)
+
+    def _insertar(self, palabra, rango):
+        nodo = self._raiz
+        for letra in palabra:
+            nodo = nodo.hijos.setdefault(letra, _NodoTrie())
+            # Cada jugador se inserta completo antes que el siguiente, así que
+            # basta mirar el último para no repetirlo y la lista queda ordenada
+            if not nodo.rangos or nodo.rangos[-1] != rango:
+                nodo.rangos.append(rango)
+
+    def _rangos_prefijo(self, prefijo):
+        nodo = self._raiz
+        for letra in prefijo:
+            nodo = nodo.hijos.get(letra)
+            if nodo is None:
+                return []
+        return nodo.rangos
+
+    def contar(self):
+        return len(self.jugadores)
+
+    def todos(self):
+        """Todos los jugadores en el orden de la base"""
+        return self.jugadores
+
+    def obtener(self, id_jugador):
+        return self.por_id.get(id_jugador)
+
+    def buscar_prefijo(self, texto, limite=None, excluir_ids=()):
+        """Jugadores cuyo nombre o apodo tiene palabras que empiezan con cada palabra de `texto`.
+
+        El resultado sale en orden alfabético por nombre; `excluir_ids` permite
+        saltear jugadores ya usados.
+        """
+        palabras = normalizar(texto).split()
+        if not palabras:
+            return []
+
+        # Se recorre la lista de la palabra más selectiva y el resto se
+        # comprueba contra las palabras ya normalizadas de cada candidato
+        listas = [(self._rangos_prefijo(p), p) for p in palabras]
+        listas.sort(key=lambda par: len(par[0]))
+        candidatos = listas[0][0]
+        resto = [p for _, p in listas[1:]]
+
+        resultado = []
+        for rango in candidatos:
+            if resto and not all(any(palabra.startswith(p) for palabra in self._palabras[rango]) for p in resto):
+                continue
+            jugador = self.ordenados[rango]
+            if jugador.get("id") in excluir_ids:
+                continue
+            resultado.append(jugador)
+            if limite is not None and len(resultado) >= limite:
+                break
+        return resultado
+
+    def buscar_exacto(self, texto):
+        """Primer jugador (en el orden de la base) cuyo nombre, apellido o apodo coincide con `texto`"""
+        clave = normalizar(texto)
+        if not clave:
+            return None
+        candidatos = [j for indice in (self.por_nombre, self.por_apellido, self.por_apodo)
+                      for j in indice.get(clave, [])]
+        if not candidatos:
+            return None
+
+        # Si alguno coincide escrito igual (con tildes) tiene prioridad
+        texto = " ".join(texto.lower().split())
+        exactos = [j for j in candidatos if texto in formas_escritas(j)]
+        return min(exactos or candidatos, key=lambda j: self._posicion_en_base[id(j)])
+
+    def jugadores_de_club(self, club):
+        return self.por_club.get(club, [])
+
+    def jugadores_de_nacionalidad(self, nacionalidad):
+        return self.por_nacionalidad.get(nacionalidad, [])
+
+    def jugadores_en_posicion(self, posicion):
+        return self.por_posicion.get(posicion, [])
+
+    def jugadores_de_club_actual(self, club):
+        return self.por_club_actual.get(club, [])
+
+    def bitsets(self, clubes, nacionalidades):
+        """(tipo, texto) -> int con el bit i puesto si el i-ésimo jugador de la base es del club o la nacionalidad"""
+        resultado = {}
+        for tipo, textos, indice in (("equipo", clubes, self.por_club), ("seleccion", nacionalidades, self.por_nacionalidad)):
+            for texto in textos:
+                bits = 0
+                for jugador in indice.get(texto, []):
+                    bits |= 1 << self._posicion_en_base[id(jugador)]
+                resultado[(tipo, texto)] = bits
+        return resultado
+
+    def posiciones_en_base(self):
+        """id de jugador -> posición en la base (el bit que le corresponde en bitsets())"""
+        return {jugador.get("id"): i for i, jugador in enumerate(self.jugadores)}
+
+
+def cargar(ruta="basededatos.json"):
+    """Carga la base de jugadores y devuelve su índice (se construye una sola vez por archivo).
+
+    Propaga FileNotFoundError y json.JSONDecodeError para que cada juego
+    informe el error como ya lo hacía.
+    """
+    if not os.path.isabs(ruta):
+        ruta = os.path.join(BASE_DIR, ruta)
+    ruta = os.path.normpath(ruta)
+
+    if ruta not in _indices:
+        with open(ruta, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+        if isinstance(datos, dict) and "jugadores" in datos:
+            jugadores = datos["jugadores"]
+        else:
+            jugadores = datos
+        _indices[ruta] = PlayerIndex(jugadores)
+    return _indices[ruta]
@@ -1,9 +1,17 @@
 import pygame
 import sys
+import os
+import json
 import random
 import math
 from dataclasses import dataclass
 
+import assets
+import game_host
+import game_loop
+import pong_ia
+import text_cache
+
 # ---------------------------
 # Configuración general
 # ---------------------------
@@ -22,12 +30,34 @@ W, H = 800, 600
 WIN_SCORE = 7
 
 # Dificultades CPU mejoradas (más realistas)
+# aim_chance: probabilidad de que, en cada pelota, la CPU busque un tiro en vez de solo atajar
 DIFICULTADES = {
-    "1": ("Fácil",   {"speed_factor": 0.4, "reaction_time": 0.5, "error_chance": 0.3, "prediction_error": 60}),
-    "2": ("Media",   {"speed_factor": 0.6, "reaction_time": 0.25, "error_chance": 0.15, "prediction_error": 30}),
-    "3": ("Difícil", {"speed_factor": 0.8, "reaction_time": 0.1, "error_chance": 0.05, "prediction_error": 15})
+    "1": ("Fácil",   {"speed_factor": 0.4, "reaction_time": 0.5, "error_chance": 0.3, "prediction_error": 60, "aim_chance": 0.0}),
+    "2": ("Media",   {"speed_factor": 0.6, "reaction_time": 0.25, "error_chance": 0.15, "prediction_error": 30, "aim_chance": 0.35}),
+    "3": ("Difícil", {"speed_factor": 0.8, "reaction_time": 0.1, "error_chance": 0.05, "prediction_error": 15, "aim_chance": 0.75})
 }
 
+# Dificultades calibradas con python pong_calibrar.py (si no existe se usan las de arriba)
+DIFICULTADES_CALIBRADAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pong_dificultades.json")
+
+def cargar_dificultades(ruta=DIFICULTADES_CALIBRADAS):
+    """Reemplaza los parámetros de DIFICULTADES por los calibrados en `ruta`, si el archivo existe"""
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            calibradas = json.load(f)["dificultades"]
+    except OSError:
+        return False
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Ignorando {ruta}: {e}")
+        return False
+    for tecla, (nombre, parametros) in DIFICULTADES.items():
+        nuevos = calibradas.get(tecla, {}).get("params", {})
+        if set(nuevos) >= set(parametros):
+            DIFICULTADES[tecla] = (nombre, {clave: float(nuevos[clave]) for clave in parametros})
+    return True
+
+cargar_dificultades()
+
 # ---------------------------
 # Dataclasses
 # ---------------------------
@@ -68,13 +98,15 @@ class AIState:
     reaction_timer: float = 0
     error_offset: float = 0
     next_error_time: float = 0
+    aim_shot: bool = False
 
 # ---------------------------
 # Carga de imágenes
 # ---------------------------
 def load_image(filename):
+    """Carga un fondo ya escalado a la ventana (usa la variante precompilada si existe)"""
     try:
-        return pygame.image.load(f"image/{filename}")
+        return assets.cargar(f"image/{filename}", (W, H), alpha=False)
     except:
         print(f"Error cargando {filename}")
         return None
@@ -84,30 +116,69 @@ def load_image(filename):
 # ---------------------------
 def menu_modo(screen):
     img = load_image("menu_eleccion_pong.png")
-    if img:
-        img = pygame.transform.scale(img, (W, H))
+    # La imagen solo trae 1 y 2: la opción en red va escrita abajo
+    txt_red = text_cache.render(text_cache.fuente(28, sysfont=True), "3) 2 Jugadores en red", GRAY)
     while True:
         screen.fill(BLACK)
         if img:
             screen.blit(img, (0, 0))
-        pygame.display.flip()
-        for event in pygame.event.get():
+        screen.blit(txt_red, (W//2 - txt_red.get_width()//2, H - 40))
+        game_loop.flip()
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
-                if event.unicode in ("1","2"):
+                if event.unicode in ("1","2","3"):
                     return int(event.unicode)
 
+def menu_red(screen):
+    """Pide ser host o la IP[:PUERTO] a la que unirse; devuelve las opciones de pong_red (None con ESC)"""
+    import pong_red
+    font = text_cache.fuente(32, sysfont=True)
+    ip = None    # None mientras se elige entre host y unirse; después, lo que se va escribiendo
+    error = ""
+    while True:
+        screen.fill(BLACK)
+        if ip is None:
+            lineas = ["H) Ser host (paleta izquierda)", "U) Unirse a un host (paleta derecha)", "ESC) Volver"]
+        else:
+            lineas = ["IP[:PUERTO] del host:", ip + "_", "ENTER=conectar  ESC=volver"]
+        if error:
+            lineas.append(error)
+        for i, linea in enumerate(lineas):
+            txt = text_cache.render(font, linea, RED if linea == error else WHITE)
+            screen.blit(txt, (W//2 - txt.get_width()//2, H//3 + i * 50))
+        game_loop.flip()
+        for event in game_loop.eventos():
+            if event.type == pygame.QUIT:
+                pygame.quit(); sys.exit()
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_ESCAPE:
+                return None
+            if ip is None:
+                if event.key == pygame.K_h:
+                    return {"host": True}
+                if event.key == pygame.K_u:
+                    ip = ""
+            elif event.key == pygame.K_RETURN and ip:
+                try:
+                    return pong_red.leer_argumentos(["--unirse", ip])
+                except ValueError:
+                    error = f"Dirección inválida: {ip}"
+            elif event.key == pygame.K_BACKSPACE:
+                ip = ip[:-1]
+            elif event.unicode and (event.unicode.isalnum() or event.unicode in ".:-"):
+                ip += event.unicode
+
 def menu_dificultad(screen):
     img = load_image("menu_eleccion_dificultad_pong.png")
-    if img:
-        img = pygame.transform.scale(img, (W, H))
     while True:
         screen.fill(BLACK)
         if img:
             screen.blit(img, (0, 0))
-        pygame.display.flip()
-        for event in pygame.event.get():
+        game_loop.flip()
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
@@ -124,6 +195,86 @@ def reset_ball(ball: Ball, direction: int, base_speed: float):
     ball.vy = (base_speed * 0.5) * (1 if random.random() < 0.5 else -1)
     ball.color = WHITE
 
+# Máximo de choques que se resuelven en un mismo frame (esquinas, pelota muy rápida)
+MAX_BOUNCES = 16
+
+def sweep_box(x, y, vx, vy, max_t, box):
+    """Primer instante en [0, max_t] en que el punto (x, y) que se mueve a (vx, vy) entra a `box`.
+
+    `box` es (x0, y0, x1, y1). Devuelve (t, eje) con eje "x" si entra por
+    una cara vertical e "y" si entra por arriba o por abajo; t es 0 si el
+    punto ya estaba adentro. None si no entra en ese tiempo, o si solo lo
+    roza o ya está saliendo (como la pelota que acaba de rebotar en el borde).
+    """
+    x0, y0, x1, y1 = box
+    # t_in arranca en -inf para que el eje sea el de la última cara cruzada aunque ya esté adentro
+    t_in, t_out, axis = -math.inf, max_t, "x"
+    for pos, vel, low, high, name in ((x, vx, x0, x1, "x"), (y, vy, y0, y1, "y")):
+        if vel == 0:
+            if not low <= pos <= high:
+                return None
+            continue
+        t_low = (low - pos) / vel
+        t_high = (high - pos) / vel
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        if t_low > t_in:
+            t_in, axis = t_low, name
+        t_out = min(t_out, t_high)
+        if t_in >= t_out or t_out <= 0:
+            return None
+    return max(t_in, 0.0), axis
+
+def move_ball(ball: Ball, paddles, dt: float, base_speed: float) -> int:
+    """Avanza la pelota `dt` segundos con choques continuos y devuelve cuántos hubo.
+
+    En vez de mover y después mirar si quedó encima de algo, busca el primer
+    choque del tramo (paredes o paletas agrandadas en el radio de la pelota),
+    lleva la pelota hasta ese instante, rebota y sigue con el tiempo que
+    queda. Así no atraviesa paletas por rápida que vaya ni por largo que
+    sea el frame.
+    """
+    remaining = dt
+    bounces = 0
+    while remaining > 0 and bounces < MAX_BOUNCES:
+        first_t, hit = remaining, None
+        # Paredes: solo si la pelota va hacia ellas
+        if ball.vy < 0:
+            t = (ball.r - ball.y) / ball.vy
+            if t < first_t:
+                first_t, hit = max(t, 0.0), ("wall", None)
+        elif ball.vy > 0:
+            t = (H - ball.r - ball.y) / ball.vy
+            if t < first_t:
+                first_t, hit = max(t, 0.0), ("wall", None)
+        for paddle in paddles:
+            # La paleta izquierda solo frena pelotas que van a la izquierda y viceversa
+            if (paddle.x + paddle.w / 2 < W / 2) != (ball.vx < 0):
+                continue
+            box = (paddle.x - ball.r, paddle.y - ball.r, paddle.x + paddle.w + ball.r, paddle.y + paddle.h + ball.r)
+            impact = sweep_box(ball.x, ball.y, ball.vx, ball.vy, first_t, box)
+            if impact is not None and (hit is None or impact[0] < first_t):
+                first_t, hit = impact[0], (impact[1], paddle)
+        ball.x += ball.vx * first_t
+        ball.y += ball.vy * first_t
+        remaining -= first_t
+        if hit is None:
+            break
+
+        kind, paddle = hit
+        if kind == "x":
+            # Cara de la paleta: vx cambia de sentido y vy suma efecto según dónde pegó
+            overlap = (ball.y - (paddle.y + paddle.h / 2)) / (paddle.h / 2)
+            ball.vx, ball.vy = pong_ia.rebote(ball.vx, ball.vy, overlap, base_speed)
+        else:
+            # Pared, o punta de arriba/abajo de la paleta
+            ball.vy = -ball.vy
+        bounces += 1
+    if remaining > 0 and bounces >= MAX_BOUNCES:
+        ball.x += ball.vx * remaining
+        ball.y = min(max(ball.y + ball.vy * remaining, ball.r), H - ball.r)
+    return bounces
+
 def draw_center_line(screen, offset):
     dash_h = 16
     gap = 10
@@ -134,33 +285,26 @@ def draw_center_line(screen, offset):
         y += dash_h + gap
 
 def draw_score(screen, score_left, score_right):
-    font = pygame.font.SysFont(None, 64)
-    txtL = font.render(str(score_left), True, WHITE)
-    txtR = font.render(str(score_right), True, WHITE)
+    font = text_cache.fuente(64, sysfont=True)
+    txtL = text_cache.render(font, score_left, WHITE)
+    txtR = text_cache.render(font, score_right, WHITE)
     screen.blit(txtL, (W*0.25 - txtL.get_width()/2, 20))
     screen.blit(txtR, (W*0.75 - txtR.get_width()/2, 20))
 
-def predict_ball_y(ball: Ball, paddle_x: float) -> float:
-    """Predice dónde estará la pelota cuando llegue al paddle"""
-    if ball.vx == 0:
+def predict_ball_y(ball: Ball, paddle: Paddle) -> float:
+    """Predice dónde estará la pelota cuando toque la cara del paddle (en forma cerrada, ver pong_ia)"""
+    contacto = pong_ia.llegada(ball, pong_ia.x_contacto(paddle, ball, ball.vx > 0), H)
+    if contacto is None:
         return ball.y
-    
-    time_to_paddle = (paddle_x - ball.x) / ball.vx
-    if time_to_paddle <= 0:
-        return ball.y
-    
-    future_y = ball.y + ball.vy * time_to_paddle
-    
-    while future_y < 0 or future_y > H:
-        if future_y < 0:
-            future_y = -future_y
-        elif future_y > H:
-            future_y = 2*H - future_y
-    
-    return future_y
+    return contacto[1]
 
-def update_ai(ai_state: AIState, ball: Ball, right: Paddle, difficulty: dict, dt: float):
-    """Actualiza el comportamiento de la IA de manera más realista"""
+def update_ai(ai_state: AIState, ball: Ball, right: Paddle, difficulty: dict, dt: float,
+              left: Paddle = None, ball_speed: float = 0):
+    """Actualiza el comportamiento de la IA de manera más realista.
+
+    Con `left` la CPU puede además elegir dónde pegarle a la pelota para
+    mandarla lejos de esa paleta (según difficulty["aim_chance"]).
+    """
     
     ball_approaching = ball.vx > 0
     ball_direction_changed = (ball.x - ai_state.last_ball_x) * ball.vx < 0
@@ -169,8 +313,15 @@ def update_ai(ai_state: AIState, ball: Ball, right: Paddle, difficulty: dict, dt
     
     if ball_approaching and (ball_direction_changed or ai_state.reaction_timer <= 0):
         ai_state.reaction_timer = difficulty["reaction_time"]
+        if ball_direction_changed:
+            # Se decide una vez por pelota, para no cambiar de plan a mitad de camino
+            ai_state.aim_shot = left is not None and random.random() < difficulty.get("aim_chance", 0)
         
-        predicted_y = predict_ball_y(ball, right.x)
+        predicted_y = predict_ball_y(ball, right)
+        if ai_state.aim_shot:
+            tiro = pong_ia.elegir_tiro(ball, right, left, H, ball_speed, right.speed * difficulty["speed_factor"])
+            if tiro is not None:
+                predicted_y = tiro[0]
         
         if random.random() < difficulty["error_chance"]:
             error_range = difficulty["prediction_error"]
@@ -210,29 +361,27 @@ def victory_screen(screen, winner_name):
     else:  # CPU
         img = load_image("victoria_cpu_pong.png")
     
-    if img:
-        img = pygame.transform.scale(img, (W, H))
     
     waiting = True
     while waiting:
         screen.fill(BLACK)
         if img:
             screen.blit(img, (0, 0))
-        pygame.display.flip()
-        for event in pygame.event.get():
+        game_loop.flip()
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     return
                 if event.key == pygame.K_ESCAPE:
-                    pygame.quit(); sys.exit()
+                    return
 
 # ---------------------------
 # Juego principal
 # ---------------------------
-def run_game(screen, modo, dificultad_cpu=("Media", {})):
-    clock = pygame.time.Clock()
+def new_court():
+    """Paletas y pelota de una partida nueva, y la velocidad base de la pelota"""
     pad_w = max(10, W // 80)
     pad_h = max(80, H // 5)
     pad_speed = H * 1.0
@@ -242,6 +391,11 @@ def run_game(screen, modo, dificultad_cpu=("Media", {})):
     left = Paddle(x=30, y=H/2 - pad_h/2, w=pad_w, h=pad_h, speed=pad_speed)
     right = Paddle(x=W-30-pad_w, y=H/2 - pad_h/2, w=pad_w, h=pad_h, speed=pad_speed)
     ball = Ball(x=W/2, y=H/2, r=ball_r, vx=ball_speed, vy=ball_speed * 0.5)
+    return left, right, ball, ball_speed
+
+def run_game(screen, modo, dificultad_cpu=("Media", {})):
+    clock = pygame.time.Clock()
+    left, right, ball, ball_speed = new_court()
 
     score_left = 0
     score_right = 0
@@ -253,10 +407,10 @@ def run_game(screen, modo, dificultad_cpu=("Media", {})):
     colors = [WHITE, RED, BLUE, YELLOW, GREEN]
 
     while running:
-        dt = clock.tick(FPS)/1000.0
+        dt = game_loop.tick(clock, FPS)/1000.0
         center_offset = (center_offset+200*dt) % (16+10)
 
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
@@ -265,17 +419,19 @@ def run_game(screen, modo, dificultad_cpu=("Media", {})):
                 if event.key == pygame.K_ESCAPE:
                     return
 
+        game_loop.fase("eventos")
+
         if paused:
             screen.fill(BLACK)
             draw_center_line(screen, center_offset)
             draw_score(screen, score_left, score_right)
-            font = pygame.font.SysFont(None, 48)
-            txt = font.render("PAUSA (P=continuar ESC=salir)", True, YELLOW)
+            font = text_cache.fuente(48, sysfont=True)
+            txt = text_cache.render(font, "PAUSA (P=continuar ESC=salir)", YELLOW)
             screen.blit(txt, (W//2 - txt.get_width()//2, H//2 - 20))
-            pygame.display.flip()
+            game_loop.flip()
             continue
 
-        keys = pygame.key.get_pressed()
+        keys = game_loop.teclas()
         dy_left = 0
         if keys[pygame.K_w]: dy_left -= left.speed*dt
         if keys[pygame.K_s]: dy_left += left.speed*dt
@@ -286,26 +442,11 @@ def run_game(screen, modo, dificultad_cpu=("Media", {})):
             if keys[pygame.K_UP]: dy_right -= right.speed*dt
             if keys[pygame.K_DOWN]: dy_right += right.speed*dt
         else:
-            dy_right = update_ai(ai_state, ball, right, cpu_difficulty, dt)
+            dy_right = update_ai(ai_state, ball, right, cpu_difficulty, dt, left, ball_speed)
         
         right.move(dy_right, 0, H)
 
-        ball.x += ball.vx*dt
-        ball.y += ball.vy*dt
-
-        if ball.y - ball.r <=0 or ball.y + ball.r >= H:
-            ball.vy*=-1
-            ball.color = random.choice(colors)
-
-        if ball.rect().colliderect(left.rect()) and ball.vx<0:
-            overlap = (ball.y - (left.y + left.h/2)) / (left.h/2)
-            ball.vx = abs(ball.vx) * 1.03
-            ball.vy += overlap * (ball_speed*0.6)
-            ball.color = random.choice(colors)
-        if ball.rect().colliderect(right.rect()) and ball.vx>0:
-            overlap = (ball.y - (right.y + right.h/2)) / (right.h/2)
-            ball.vx = -abs(ball.vx) * 1.03
-            ball.vy += overlap * (ball_speed*0.6)
+        if move_ball(ball, (left, right), dt, ball_speed):
             ball.color = random.choice(colors)
 
         punto = 0
@@ -329,54 +470,157 @@ def run_game(screen, modo, dificultad_cpu=("Media", {})):
             victory_screen(screen, winner)
             return
 
-        screen.fill(BLACK)
-        draw_center_line(screen, center_offset)
-        pygame.draw.rect(screen, WHITE, left.rect(), border_radius=6)
-        pygame.draw.rect(screen, WHITE, right.rect(), border_radius=6)
-        pygame.draw.circle(screen, ball.color, (int(ball.x), int(ball.y)), ball.r)
-        draw_score(screen, score_left, score_right)
+        game_loop.fase("update")
 
-        small = pygame.font.SysFont(None, 24)
         if modo==1:
             info = f"CPU: {cpu_name} - P=pausa ESC=menú"
         else:
             info = "2 Jugadores (W/S y ↑/↓) - P=pausa ESC=menú"
-        info_txt = small.render(info, True, GRAY)
-        screen.blit(info_txt, (W//2 - info_txt.get_width()//2, H-30))
-        pygame.display.flip()
+        draw_court(screen, left, right, ball, score_left, score_right, center_offset, info)
+        game_loop.flip()
+
+def draw_court(screen, left, right, ball, score_left, score_right, center_offset, info):
+    """Cancha, paletas, pelota, puntaje y la línea de ayuda de abajo"""
+    screen.fill(BLACK)
+    draw_center_line(screen, center_offset)
+    pygame.draw.rect(screen, WHITE, left.rect(), border_radius=6)
+    pygame.draw.rect(screen, WHITE, right.rect(), border_radius=6)
+    pygame.draw.circle(screen, ball.color, (int(ball.x), int(ball.y)), ball.r)
+    draw_score(screen, score_left, score_right)
+
+    small = text_cache.fuente(24, sysfont=True)
+    info_txt = text_cache.render(small, info, GRAY)
+    screen.blit(info_txt, (W//2 - info_txt.get_width()//2, H-30))
+
+# ---------------------------
+# Partido en red
+# ---------------------------
+def run_netplay(screen, sesion):
+    """2 jugadores en red (ver pong_red): cada uno mueve su paleta con W/S o ↑/↓"""
+    clock = pygame.time.Clock()
+    colors = [WHITE, RED, BLUE, YELLOW, GREEN]
+    center_offset = 0
+    font = text_cache.fuente(22)
+    lado = "izquierda" if sesion.lado == 0 else "derecha"
+
+    try:
+        while True:
+            dt = game_loop.tick(clock, FPS)/1000.0
+            center_offset = (center_offset+200*dt) % (16+10)
+
+            for event in game_loop.eventos():
+                if event.type == pygame.QUIT:
+                    pygame.quit(); sys.exit()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    return
+
+            game_loop.fase("eventos")
+
+            # La simulación no usa dt: avanza un paso fijo por frame (o espera al rival)
+            keys = game_loop.teclas()
+            entrada = int(keys[pygame.K_s] or keys[pygame.K_DOWN]) - int(keys[pygame.K_w] or keys[pygame.K_UP])
+            sesion.actualizar(entrada)
+
+            game_loop.fase("update")
+
+            winner = sesion.ganador()
+            if winner is not None:
+                victory_screen(screen, "Jugador 1" if winner == 0 else "Jugador 2")
+                return
+
+            if sesion.cortada or not sesion.conectada:
+                screen.fill(BLACK)
+                if sesion.cortada:
+                    mensaje = "Se cortó la conexión con el rival (ESC=salir)"
+                elif sesion.lado == 0:
+                    mensaje = f"Esperando al rival en el puerto {sesion.conexion.sock.getsockname()[1]}... (ESC=salir)"
+                else:
+                    mensaje = "Conectando... (ESC=salir)"
+                txt = text_cache.render(font, mensaje, YELLOW)
+                screen.blit(txt, (W//2 - txt.get_width()//2, H//2 - 10))
+                game_loop.flip()
+                continue
+
+            partido = sesion.partido
+            partido.ball.color = colors[partido.golpes % len(colors)]
+            draw_court(screen, partido.left, partido.right, partido.ball, partido.score[0], partido.score[1],
+                       center_offset, f"En red: paleta {lado} (W/S o ↑/↓) - ESC=salir")
+            for i, linea in enumerate(sesion.lineas_estadisticas()):
+                txt = text_cache.render(font, linea, RED if linea.startswith("¡") else GRAY)
+                screen.blit(txt, (10, H - 80 + i * 18))
+            game_loop.flip()
+    finally:
+        sesion.cerrar()
 
 # ---------------------------
 # Bucle principal
 # ---------------------------
-def main():
-    pygame.display.set_mode((W, H))
-    pygame.display.set_caption("Pong - Pygame")
-    screen = pygame.display.get_surface()
+def run(screen, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    screen = game_host.ajustar_pantalla(screen, (W, H), "Pong - Pygame")
 
     while True:
         img_menu = load_image("menu_pong.png")
-        if img_menu:
-            img_menu = pygame.transform.scale(img_menu, (W, H))
         waiting = True
         while waiting:
             screen.fill(BLACK)
             if img_menu:
                 screen.blit(img_menu, (0, 0))
-            pygame.display.flip()
-            for event in pygame.event.get():
+            game_loop.flip()
+            for event in game_loop.eventos():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         waiting = False
+                    elif event.key == pygame.K_ESCAPE:
+                        return
 
         modo = menu_modo(screen)
+        if modo==3:
+            opciones = menu_red(screen)
+            if opciones:
+                jugar_en_red(screen, opciones)
+            continue
         dificultad = ("Media", DIFICULTADES["2"][1])
         if modo==1:
             dificultad = menu_dificultad(screen)
         run_game(screen, modo, dificultad)
 
+def jugar_en_red(screen, opciones):
+    """Abre la sesión de pong_red con las opciones de leer_argumentos/menu_red y juega el partido"""
+    import pong_red
+    try:
+        sesion = pong_red.crear_sesion(host=opciones.get("host", False), unirse=opciones.get("unirse"),
+                                       puerto=opciones.get("puerto", pong_red.PUERTO),
+                                       latencia=opciones.get("latencia", 0.0), perdida=opciones.get("perdida", 0.0))
+    except OSError as e:
+        print(f"No se pudo abrir la conexión: {e}")
+        return
+    run_netplay(screen, sesion)
+
+def main():
+    # python pong.py --host / --unirse IP[:PUERTO]: 2 jugadores en red (ver pong_red)
+    opciones = {}
+    if len(sys.argv) > 1:
+        import pong_red
+        try:
+            opciones = pong_red.leer_argumentos(sys.argv[1:])
+        except ValueError as e:
+            print(e)
+            return
+    if not (opciones.get("host") or opciones.get("unirse")):
+        run(pygame.display.set_mode((W, H)))
+        return
+
+    screen = game_host.ajustar_pantalla(pygame.display.set_mode((W, H)), (W, H),
+                                        "Pong en red - " + ("host" if opciones.get("host") else "invitado"))
+    jugar_en_red(screen, opciones)
+
 if __name__ == "__main__":
+    # pong_red hace `import pong`: que encuentre este mismo módulo y no lo cargue otra vez
+    # (duplicaría el estado, cargar_dificultades() y pygame.init())
+    sys.modules.setdefault("pong", sys.modules[__name__])
     try:
         main()
     except Exception as e:
@@ -0,0 +1,173 @@
+"""Calibra las dificultades de la CPU de pong jugando puntos sin ventana.
+
+Uso: python pong_calibrar.py [--puntos N] [--iteraciones K] [--procesos P]
+
+La CPU (paleta derecha, pong.update_ai) juega contra un rival de referencia
+con reflejos y puntería de persona (paleta izquierda). Los parámetros de la
+CPU se mueven todos juntos con una sola "fuerza" entre DEBIL y FUERTE, y para
+cada dificultad se busca por bisección la fuerza con la que la CPU gana la
+fracción OBJETIVOS de los puntos. Cada evaluación juega N puntos repartidos
+en un pool de procesos, siempre con las mismas semillas para que dos fuerzas
+se comparen sobre los mismos saques. El resultado queda en
+pong_dificultades.json, que pong.py carga al arrancar.
+"""
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Sin esto SDL se queda con SIGTERM y SIGINT: los procesos del pool se cuelgan y no se pueden cerrar
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+import pong
+from pong import H, W
+
+# Fracción de puntos que tiene que ganar la CPU en cada dificultad del menú
+OBJETIVOS = {"1": 0.25, "2": 0.5, "3": 0.75}
+
+# Extremos de la fuerza: 0 es DEBIL y 1 es FUERTE
+DEBIL = {"speed_factor": 0.2, "reaction_time": 0.8, "error_chance": 0.5, "prediction_error": 120, "aim_chance": 0.0}
+FUERTE = {"speed_factor": 1.0, "reaction_time": 0.05, "error_chance": 0.0, "prediction_error": 5, "aim_chance": 1.0}
+
+# Rival de referencia: cada cuánto mira la pelota, cuánto le erra (desvío en px con la
+# pelota a velocidad base; crece con la velocidad) y qué fracción de la velocidad de la paleta usa
+REACCION_RIVAL = 0.25
+ERROR_RIVAL = 30
+VELOCIDAD_RIVAL = 0.7
+
+# Paso fijo de la simulación (el del juego) y duración máxima de un punto
+DT = 1 / pong.FPS
+MAX_SEGUNDOS = 120
+
+
+def parametros(fuerza):
+    """Dificultad de update_ai interpolada entre DEBIL (0) y FUERTE (1)"""
+    return {clave: DEBIL[clave] + (FUERTE[clave] - DEBIL[clave]) * fuerza for clave in DEBIL}
+
+
+class Rival:
+    """Paleta izquierda de referencia: predice la llegada cada REACCION_RIVAL s con un error normal"""
+
+    def __init__(self, rng, velocidad_base):
+        self.rng = rng
+        self.velocidad_base = velocidad_base
+        self.objetivo = H / 2
+        self.espera = 0.0
+
+    def mover(self, ball, paleta, dt):
+        self.espera -= dt
+        if self.espera <= 0:
+            self.espera = REACCION_RIVAL
+            if ball.vx < 0:
+                error = ERROR_RIVAL * abs(ball.vx) / self.velocidad_base
+                self.objetivo = pong.predict_ball_y(ball, paleta) + self.rng.gauss(0, error)
+            else:
+                self.objetivo = H / 2
+        distancia = self.objetivo - (paleta.y + paleta.h / 2)
+        paso = paleta.speed * VELOCIDAD_RIVAL * dt
+        return max(-paso, min(paso, distancia))
+
+
+def jugar_punto(tarea):
+    """Juega un punto con los parámetros dados: 1 si lo gana la CPU, 0 si el rival, None si no termina"""
+    params, semilla = tarea
+    # update_ai y reset_ball usan el random del módulo: se fija para que el punto sea reproducible
+    random.seed(semilla)
+    rng = random.Random(semilla + 1)
+    left, right, ball, ball_speed = pong.new_court()
+    pong.reset_ball(ball, rng.choice((-1, 1)), ball_speed)
+    ai_state = pong.AIState()
+    rival = Rival(rng, ball_speed)
+
+    for _ in range(int(MAX_SEGUNDOS / DT)):
+        left.move(rival.mover(ball, left, DT), 0, H)
+        right.move(pong.update_ai(ai_state, ball, right, params, DT, left, ball_speed), 0, H)
+        pong.move_ball(ball, (left, right), DT, ball_speed)
+        if ball.x + ball.r < 0:
+            return 1
+        if ball.x - ball.r > W:
+            return 0
+    return None
+
+
+def tasa_cpu(pool, fuerza, puntos, semilla=0):
+    """Fracción de los puntos terminados que gana la CPU con esa fuerza"""
+    params = parametros(fuerza)
+    tareas = [(params, semilla + i) for i in range(puntos)]
+    resultados = [r for r in pool.imap_unordered(jugar_punto, tareas, chunksize=16) if r is not None]
+    return sum(resultados) / len(resultados) if resultados else 0.5
+
+
+def calibrar(objetivo, medir, iteraciones):
+    """(fuerza, tasa) con la que la CPU gana cerca de `objetivo` de los puntos; medir(fuerza) da la tasa"""
+    bajo, alto = 0.0, 1.0
+    tasa_bajo = medir(bajo)
+    tasa_alto = medir(alto)
+    if objetivo <= tasa_bajo:
+        return bajo, tasa_bajo
+    if objetivo >= tasa_alto:
+        return alto, tasa_alto
+    for _ in range(iteraciones):
+        medio = (bajo + alto) / 2
+        tasa = medir(medio)
+        if tasa < objetivo:
+            bajo, tasa_bajo = medio, tasa
+        else:
+            alto, tasa_alto = medio, tasa
+    # De los dos extremos que quedaron, el más cercano al objetivo
+    if objetivo - tasa_bajo < tasa_alto - objetivo:
+        return bajo, tasa_bajo
+    return alto, tasa_alto
+
+
+def redondear(params):
+    return {clave: round(valor, 3) for clave, valor in params.items()}
+
+
+def main(argumentos):
+    opciones = {"--puntos": 1000, "--iteraciones": 7, "--procesos": None}
+    i = 0
+    while i < len(argumentos):
+        if argumentos[i] in opciones and i + 1 < len(argumentos):
+            opciones[argumentos[i]] = int(argumentos[i + 1])
+            i += 2
+        else:
+            print(__doc__.strip().splitlines()[2])
+            return 2
+
+    puntos, iteraciones = opciones["--puntos"], opciones["--iteraciones"]
+    inicio = time.perf_counter()
+    dificultades = {}
+    # Tasa ya medida de cada fuerza (las dificultades comparten los extremos)
+    tasas = {}
+    with multiprocessing.Pool(opciones["--procesos"]) as pool:
+        def medir(fuerza):
+            if fuerza not in tasas:
+                tasas[fuerza] = tasa_cpu(pool, fuerza, puntos)
+            return tasas[fuerza]
+
+        for tecla, objetivo in OBJETIVOS.items():
+            nombre = pong.DIFICULTADES[tecla][0]
+            fuerza, tasa = calibrar(objetivo, medir, iteraciones)
+            print(f"{nombre:<8} objetivo {objetivo:.0%}  fuerza {fuerza:.3f}  la CPU gana {tasa:.1%} "
+                  f"({time.perf_counter() - inicio:.0f} s)")
+            dificultades[tecla] = {"nombre": nombre, "objetivo": objetivo, "tasa_cpu": round(tasa, 4),
+                                   "fuerza": round(fuerza, 4), "params": redondear(parametros(fuerza))}
+
+    datos = {"puntos_por_evaluacion": puntos,
+             "rival": {"reaccion": REACCION_RIVAL, "error": ERROR_RIVAL, "velocidad": VELOCIDAD_RIVAL},
+             "dificultades": dificultades}
+    temporal = pong.DIFICULTADES_CALIBRADAS + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=1)
+    os.replace(temporal, pong.DIFICULTADES_CALIBRADAS)
+    print(f"Dificultades guardadas en {pong.DIFICULTADES_CALIBRADAS}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
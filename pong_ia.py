@@ -0,0 +1,124 @@
+"""Predicción de la pelota de pong en forma cerrada y elección de tiros para la CPU.
+
+Entre las dos paredes la altura de la pelota es una onda triangular del tiempo:
+en vez de ir rebotando hasta caer dentro de la cancha, se toma la altura sin
+paredes módulo dos veces el alto útil y se espeja la mitad de vuelta. Eso da
+la altura y el sentido de vy al llegar a cualquier x en tiempo constante, sin
+importar cuántos rebotes haya en el medio.
+
+El rebote en la paleta sigue la misma regla que pong.py (ACELERACION_REBOTE y
+EFECTO): vx cambia de signo y crece, y vy suma el efecto según dónde pegó la
+pelota. Con eso elegir_tiro() prueba muchos puntos de contacto a la vez (con
+numpy si está instalado) y se queda con el que deja la pelota más lejos del
+alcance de la paleta rival.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Regla del rebote en la paleta (la usa pong.py)
+ACELERACION_REBOTE = 1.03
+# vy que suma pegar en el borde de la paleta, como fracción de la velocidad base
+EFECTO = 0.6
+
+# Puntos de contacto que se prueban, entre -MARGEN y MARGEN del medio alto de la paleta
+CANDIDATOS = 33
+# No se apunta justo al borde: un frame de diferencia y la pelota no toca la paleta
+MARGEN = 0.85
+# La paleta de la CPU no llega a su velocidad máxima (frena al acercarse al objetivo)
+ALCANCE_EFECTIVO = 0.8
+
+
+def reflejar(y, bajo, alto):
+    """(altura, sentido) tras rebotar entre `bajo` y `alto`; sentido es -1 si vy quedó invertida"""
+    largo = alto - bajo
+    if largo <= 0:
+        return bajo, 1
+    u = (y - bajo) % (2 * largo)
+    if u > largo:
+        return bajo + 2 * largo - u, -1
+    return bajo + u, 1
+
+
+def llegada(ball, x_contacto, alto_cancha):
+    """(tiempo, y, vy) con que el centro de la pelota llega a `x_contacto`, o None si se aleja"""
+    if ball.vx == 0:
+        return None
+    tiempo = (x_contacto - ball.x) / ball.vx
+    if tiempo < 0:
+        return None
+    y, sentido = reflejar(ball.y + ball.vy * tiempo, ball.r, alto_cancha - ball.r)
+    return tiempo, y, ball.vy * sentido
+
+
+def x_contacto(paddle, ball, hacia_derecha):
+    """x del centro de la pelota cuando toca la cara de `paddle` (la pelota tiene radio)"""
+    if hacia_derecha:
+        return paddle.x - ball.r
+    return paddle.x + paddle.w + ball.r
+
+
+def rebote(vx, vy, desvio, velocidad_base):
+    """Velocidad después de pegar en la paleta a `desvio` (-1 arriba, 1 abajo) de su centro"""
+    return -vx * ACELERACION_REBOTE, vy + desvio * velocidad_base * EFECTO
+
+
+def _reflejar_lote(y, bajo, alto):
+    largo = alto - bajo
+    u = numpy.mod(y - bajo, 2 * largo)
+    return bajo + numpy.where(u > largo, 2 * largo - u, u)
+
+
+def elegir_tiro(ball, propia, rival, alto_cancha, velocidad_base, velocidad_propia, candidatos=CANDIDATOS):
+    """Centro al que conviene llevar `propia` para devolver la pelota que se acerca.
+
+    Para cada punto de contacto posible calcula el rebote, dónde cruza la
+    pelota la cara de `rival` y cuánto le falta a esa paleta para llegar a
+    tiempo moviéndose a su velocidad máxima. Descarta los contactos a los que
+    `propia` no llega antes que la pelota y devuelve (centro, falta) del
+    mejor; falta > 0 es un tiro que el rival no alcanza. None si la pelota
+    no viene hacia `propia`.
+    """
+    hacia_derecha = ball.vx > 0
+    primera = llegada(ball, x_contacto(propia, ball, hacia_derecha), alto_cancha)
+    if primera is None:
+        return None
+    t1, y1, vy1 = primera
+    medio = propia.h / 2
+    centro = propia.y + medio
+    alcance = velocidad_propia * ALCANCE_EFECTIVO * t1
+    x_desde = x_contacto(propia, ball, hacia_derecha)
+    x_hasta = x_contacto(rival, ball, not hacia_derecha)
+    centro_rival = rival.y + rival.h / 2
+    radio_rival = rival.h / 2 + ball.r
+    bajo, alto = ball.r, alto_cancha - ball.r
+
+    if numpy is not None:
+        desvios = numpy.linspace(-MARGEN, MARGEN, candidatos)
+        objetivos = y1 - desvios * medio
+        posibles = (numpy.abs(objetivos - centro) <= alcance) & \
+                   (objetivos >= medio) & (objetivos <= alto_cancha - medio)
+        vx2, vy2 = rebote(ball.vx, vy1, desvios, velocidad_base)
+        t2 = (x_hasta - x_desde) / vx2
+        y2 = _reflejar_lote(y1 + vy2 * t2, bajo, alto)
+        falta = numpy.abs(y2 - centro_rival) - radio_rival - rival.speed * (t1 + t2)
+        if not posibles.any():
+            return None
+        falta = numpy.where(posibles, falta, -numpy.inf)
+        mejor = int(numpy.argmax(falta))
+        return float(objetivos[mejor]), float(falta[mejor])
+
+    resultado = None
+    for i in range(candidatos):
+        desvio = -MARGEN + 2 * MARGEN * i / (candidatos - 1)
+        objetivo = y1 - desvio * medio
+        if abs(objetivo - centro) > alcance or not medio <= objetivo <= alto_cancha - medio:
+            continue
+        vx2, vy2 = rebote(ball.vx, vy1, desvio, velocidad_base)
+        t2 = (x_hasta - x_desde) / vx2
+        y2, _ = reflejar(y1 + vy2 * t2, bajo, alto)
+        falta = abs(y2 - centro_rival) - radio_rival - rival.speed * (t1 + t2)
+        if resultado is None or falta > resultado[1]:
+            resultado = (objetivo, falta)
+    return resultado
@@ -0,0 +1,528 @@
+"""Pong para dos en red local: se mandan solo las entradas y cada lado simula el partido entero.
+
+Uso: python pong.py --host [PUERTO] [--latencia MS] [--perdida P]
+     python pong.py --unirse IP[:PUERTO] [--latencia MS] [--perdida P]
+     python pong_red.py prueba [--latencia MS] [--perdida P] [--sin-ventana SEGUNDOS]
+     o, dentro del juego, la opción 3 del menú de modo de pong.py
+
+El que hace de host juega con la paleta izquierda y el que se une con la
+derecha (W/S o flechas en los dos). La simulación es de paso fijo (1/FPS) y
+determinista, así que con las mismas entradas los dos procesos calculan
+exactamente el mismo partido. Cada frame se manda la entrada propia junto con
+las que el rival todavía no confirmó (si se pierde un paquete, el siguiente
+trae lo mismo) y para el rival se supone que sigue apretando lo último que se
+supo. Cuando llega su entrada real y no coincide con la supuesta, se vuelve al
+estado guardado de ese frame y se resimula hasta el actual (rollback): con
+hasta ~100 ms de latencia se juega como en local. La entrada propia se aplica
+RETARDO_ENTRADA frames más tarde, lo que acorta los rollbacks.
+
+--latencia y --perdida demoran y descartan a propósito los paquetes que manda
+cada proceso (la latencia de ida y vuelta queda en el doble). `prueba` abre
+los dos procesos en esta máquina; con --sin-ventana juega con entradas al azar
+sin pygame y verifica que los dos lados terminen con el mismo partido.
+"""
+import heapq
+import os
+import random
+import socket
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+import pong
+from pong import H, W
+
+PUERTO = 50505
+VERSION = 1
+DT = 1 / pong.FPS
+
+# Frames que se demora la entrada propia antes de aplicarse
+RETARDO_ENTRADA = 2
+# Máximo de frames que se simulan sin la entrada real del rival (después se espera)
+MAX_ROLLBACK = 30
+# Sin paquetes del rival por este tiempo, la partida se da por cortada
+TIEMPO_DESCONEXION = 5.0
+# Cada cuántos frames se compara el estado con el del rival para detectar desincronización
+FRAMES_VERIFICACION = 60
+
+# Tipos de paquete
+_HOLA = b"H"
+_BIENVENIDA = b"B"
+_ENTRADAS = b"E"
+_ADIOS = b"Q"
+# tipo, versión
+_PAQUETE_HOLA = struct.Struct("<cB")
+# tipo, versión, semilla, retardo de entrada
+_PAQUETE_BIENVENIDA = struct.Struct("<cBIB")
+# tipo, cantidad de entradas, primer frame, último frame del rival recibido, hora de envío,
+# eco de la hora del rival, tiempo que se retuvo el eco, frame y suma del último estado verificado
+_PAQUETE_ENTRADAS = struct.Struct("<cBiiddiiI")
+_ESTADO = struct.Struct("<8d2I")
+
+
+class Partido:
+    """Estado determinista del partido (paletas, pelota, puntaje) y su paso fijo"""
+
+    def __init__(self, semilla):
+        self.left, self.right, self.ball, self.ball_speed = pong.new_court()
+        self.score = [0, 0]
+        self.golpes = 0
+        self.saques = semilla & 0x7FFFFFFF
+        self._sacar(1 if semilla & 1 else -1)
+
+    def _sacar(self, direccion):
+        # Como pong.reset_ball, pero el sentido de vy sale de un contador y no de random
+        self.saques = (self.saques * 1103515245 + 12345) & 0x7FFFFFFF
+        ball = self.ball
+        ball.x = W / 2
+        ball.y = H / 2
+        ball.vx = self.ball_speed * direccion
+        ball.vy = self.ball_speed * 0.5 * (1 if self.saques & 0x10000 else -1)
+
+    def paso(self, entrada_izquierda, entrada_derecha):
+        """Avanza un frame; las entradas son -1 (arriba), 0 o 1 (abajo)"""
+        self.left.move(entrada_izquierda * self.left.speed * DT, 0, H)
+        self.right.move(entrada_derecha * self.right.speed * DT, 0, H)
+        self.golpes += pong.move_ball(self.ball, (self.left, self.right), DT, self.ball_speed)
+        if self.ball.x + self.ball.r < 0:
+            self.score[1] += 1
+            self._sacar(1)
+        elif self.ball.x - self.ball.r > W:
+            self.score[0] += 1
+            self._sacar(-1)
+
+    def guardar(self):
+        ball = self.ball
+        return (self.left.y, self.right.y, ball.x, ball.y, ball.vx, ball.vy,
+                self.score[0], self.score[1], self.golpes, self.saques)
+
+    def restaurar(self, estado):
+        (self.left.y, self.right.y, self.ball.x, self.ball.y, self.ball.vx, self.ball.vy,
+         self.score[0], self.score[1], self.golpes, self.saques) = estado
+
+
+def ganador(estado):
+    """0 (izquierda), 1 (derecha) o None según el puntaje de un estado guardado"""
+    if estado[6] >= pong.WIN_SCORE:
+        return 0
+    if estado[7] >= pong.WIN_SCORE:
+        return 1
+    return None
+
+
+def suma_estado(estado):
+    return zlib.crc32(_ESTADO.pack(*estado))
+
+
+class Conexion:
+    """Socket UDP hacia el rival que puede demorar y perder paquetes a propósito"""
+
+    def __init__(self, sock, destino=None, latencia=0.0, perdida=0.0, rng=None):
+        self.sock = sock
+        self.destino = destino
+        self.latencia = latencia
+        self.perdida = perdida
+        self.rng = rng or random.Random()
+        self._pendientes = []
+        self._orden = 0
+        self.enviados = 0
+        self.descartados = 0
+
+    def enviar(self, datos):
+        if self.destino is None:
+            return
+        self.enviados += 1
+        if self.perdida and self.rng.random() < self.perdida:
+            self.descartados += 1
+            return
+        if self.latencia <= 0:
+            self._mandar(datos)
+            return
+        self._orden += 1
+        heapq.heappush(self._pendientes, (time.perf_counter() + self.latencia, self._orden, datos))
+        self.bombear()
+
+    def bombear(self):
+        """Manda los paquetes demorados a los que ya les tocó salir"""
+        ahora = time.perf_counter()
+        while self._pendientes and self._pendientes[0][0] <= ahora:
+            self._mandar(heapq.heappop(self._pendientes)[2])
+
+    def _mandar(self, datos):
+        try:
+            self.sock.sendto(datos, self.destino)
+        except OSError:
+            pass  # el rival todavía no abrió su socket o la red no está: lo arregla el próximo paquete
+
+    def recibir(self):
+        """[(datos, dirección)] de todo lo que ya llegó, sin bloquear"""
+        paquetes = []
+        while True:
+            try:
+                paquetes.append(self.sock.recvfrom(2048))
+            except (BlockingIOError, InterruptedError):
+                return paquetes
+            except OSError:
+                # En Windows un ICMP "puerto cerrado" aparece como error en el siguiente recvfrom
+                continue
+
+    def cerrar(self):
+        self.sock.close()
+
+
+class Sesion:
+    """Partido en red con rollback: entradas por frame, estados guardados y estadísticas"""
+
+    def __init__(self, lado, conexion, semilla=None, retardo=RETARDO_ENTRADA):
+        self.lado = lado
+        self.rival = 1 - lado
+        self.conexion = conexion
+        self.semilla = semilla if semilla is not None else random.getrandbits(31)
+        self.retardo = retardo
+        self.partido = None
+        self.frame = 0
+        # entradas[lado][frame]; supuestas[frame] = entrada del rival con la que se simuló sin conocerla
+        self.entradas = ({}, {})
+        self.supuestas = {}
+        # estados[frame] = estado antes de simular ese frame
+        self.estados = {}
+        self.recibido = -1          # último frame del rival recibido sin huecos
+        self.confirmado_rival = -1  # último frame nuestro que el rival dice tener
+        self.final = None           # último estado que ya no puede cambiar
+        self.desincronizado = False
+        self.cortada = False
+        self._rollback_desde = None
+        self._sumas = {}
+        self._ultima_suma = (-1, 0)
+        self._eco = (0.0, 0.0)      # hora del rival en su último paquete y cuándo llegó
+        self._ultimo_paquete = time.perf_counter()
+        # Hasta que llega la primera entrada del rival no se cuenta el tiempo sin paquetes
+        self._hubo_entradas = False
+        self._ultimo_hola = 0.0
+        self._podado = 0
+        self._podado_propias = 0
+        # Estadísticas
+        self.rtt = None
+        self.rollback = 0
+        self._ventana = {"rollback_max": 0, "resimulados": 0, "esperas": 0, "frames": 0}
+        self._inicio_ventana = time.perf_counter()
+        self.estadisticas = {"rollback_max": 0, "resimulados": 0, "esperas": 0, "frames": 0}
+
+    @property
+    def conectada(self):
+        """True cuando ya hay rival: el host empieza con el primer HOLA y el invitado con la BIENVENIDA"""
+        return self.partido is not None
+
+    def _empezar(self, semilla, retardo):
+        self.semilla = semilla
+        self.retardo = retardo
+        self.partido = Partido(semilla)
+        # Los primeros frames no tienen entrada (nadie apretó nada RETARDO frames antes de empezar)
+        for frame in range(retardo):
+            self.entradas[0][frame] = self.entradas[1][frame] = 0
+        self.recibido = retardo - 1
+        self._ultimo_paquete = time.perf_counter()
+
+    # ------------------------------------------------------------------
+    # Paquetes
+    # ------------------------------------------------------------------
+
+    def _leer_paquetes(self):
+        for datos, origen in self.conexion.recibir():
+            if not datos:
+                continue
+            tipo = datos[:1]
+            if tipo == _HOLA and self.lado == 0 and len(datos) == _PAQUETE_HOLA.size:
+                if _PAQUETE_HOLA.unpack(datos)[1] != VERSION:
+                    continue
+                # El que se une puede haber perdido la bienvenida: se la manda de nuevo
+                self.conexion.destino = origen
+                self._ultimo_paquete = time.perf_counter()
+                if self.partido is None:
+                    self._empezar(self.semilla, self.retardo)
+                self.conexion.enviar(_PAQUETE_BIENVENIDA.pack(_BIENVENIDA, VERSION, self.semilla, self.retardo))
+            elif tipo == _BIENVENIDA and self.lado == 1 and len(datos) == _PAQUETE_BIENVENIDA.size:
+                _, version, semilla, retardo = _PAQUETE_BIENVENIDA.unpack(datos)
+                if version != VERSION:
+                    continue
+                self._ultimo_paquete = time.perf_counter()
+                if self.partido is None:
+                    self._empezar(semilla, retardo)
+            elif tipo == _ENTRADAS and self.partido is not None and len(datos) >= _PAQUETE_ENTRADAS.size:
+                self._recibir_entradas(datos)
+            elif tipo == _ADIOS and origen == self.conexion.destino:
+                self.cortada = True
+
+    def _recibir_entradas(self, datos):
+        (_, cantidad, primero, ack, enviado, eco, retenido,
+         frame_suma, suma) = _PAQUETE_ENTRADAS.unpack_from(datos)
+        valores = datos[_PAQUETE_ENTRADAS.size:_PAQUETE_ENTRADAS.size + cantidad]
+        ahora = time.perf_counter()
+        self._ultimo_paquete = ahora
+        self._hubo_entradas = True
+        if enviado > self._eco[0]:
+            self._eco = (enviado, ahora)
+        if eco > 0:
+            muestra = ahora - eco - retenido / 1e6
+            self.rtt = muestra if self.rtt is None else self.rtt * 0.9 + muestra * 0.1
+        self.confirmado_rival = max(self.confirmado_rival, ack)
+        if frame_suma in self._sumas and self._sumas[frame_suma] != suma:
+            self.desincronizado = True
+
+        entradas = self.entradas[self.rival]
+        for i, valor in enumerate(valores):
+            frame = primero + i
+            if frame <= self.recibido or frame in entradas:
+                continue
+            entradas[frame] = valor - 1
+            if frame in self.supuestas and self.supuestas[frame] != valor - 1:
+                if self._rollback_desde is None or frame < self._rollback_desde:
+                    self._rollback_desde = frame
+        while self.recibido + 1 in entradas:
+            self.recibido += 1
+
+    def _enviar_entradas(self):
+        ultimo = self.frame + self.retardo - 1
+        primero = max(self.confirmado_rival + 1, ultimo - 254)
+        propias = self.entradas[self.lado]
+        valores = bytes(propias[frame] + 1 for frame in range(primero, ultimo + 1))
+        ahora = time.perf_counter()
+        eco, recibido_en = self._eco
+        retenido = int((ahora - recibido_en) * 1e6) if eco else 0
+        self.conexion.enviar(_PAQUETE_ENTRADAS.pack(_ENTRADAS, len(valores), primero, self.recibido,
+                                                    ahora, eco, retenido, *self._ultima_suma) + valores)
+
+    # ------------------------------------------------------------------
+    # Simulación
+    # ------------------------------------------------------------------
+
+    def _simular(self, frame):
+        self.estados[frame] = self.partido.guardar()
+        rival = self.entradas[self.rival].get(frame)
+        if rival is None:
+            # Se supone que el rival sigue con lo último que se le conoce
+            rival = self.entradas[self.rival][self.recibido]
+            self.supuestas[frame] = rival
+        else:
+            self.supuestas.pop(frame, None)
+        propia = self.entradas[self.lado][frame]
+        if self.lado == 0:
+            self.partido.paso(propia, rival)
+        else:
+            self.partido.paso(rival, propia)
+
+    def actualizar(self, entrada):
+        """Un frame del juego: lee la red, corrige con rollback y avanza (o espera al rival).
+
+        Devuelve True si la simulación avanzó un frame.
+        """
+        self.conexion.bombear()
+        self._leer_paquetes()
+        self._medir_ventana()
+        if self.partido is None:
+            ahora = time.perf_counter()
+            if self.lado == 1 and ahora - self._ultimo_hola > 0.2:
+                self._ultimo_hola = ahora
+                self.conexion.enviar(_PAQUETE_HOLA.pack(_HOLA, VERSION))
+            return False
+        if self._hubo_entradas and time.perf_counter() - self._ultimo_paquete > TIEMPO_DESCONEXION:
+            self.cortada = True
+
+        if self._rollback_desde is not None:
+            desde = self._rollback_desde
+            self._rollback_desde = None
+            self.partido.restaurar(self.estados[desde])
+            for frame in range(desde, self.frame):
+                self._simular(frame)
+            self.rollback = self.frame - desde
+            self._ventana["rollback_max"] = max(self._ventana["rollback_max"], self.rollback)
+            self._ventana["resimulados"] += self.frame - desde
+
+        if self.frame - self.recibido > MAX_ROLLBACK:
+            # El rival quedó muy atrás: esperarlo en vez de suponer cada vez más
+            self._ventana["esperas"] += 1
+            self._enviar_entradas()
+            return False
+
+        self.entradas[self.lado][self.frame + self.retardo] = entrada
+        self._simular(self.frame)
+        self.frame += 1
+        self._ventana["frames"] += 1
+        self._enviar_entradas()
+        self._podar()
+        return True
+
+    def _podar(self):
+        """Descarta lo que ya no puede cambiar y verifica cada tanto contra el rival"""
+        hasta = min(self.recibido, self.frame - 1)
+        for frame in range(self._podado, hasta):
+            estado = self.estados.pop(frame)
+            self.supuestas.pop(frame, None)
+            self.entradas[self.rival].pop(frame - 1, None)
+            if frame % FRAMES_VERIFICACION == 0:
+                suma = suma_estado(estado)
+                self._sumas[frame] = suma
+                self._sumas.pop(frame - 10 * FRAMES_VERIFICACION, None)
+                self._ultima_suma = (frame, suma)
+            self.final = estado
+        self._podado = max(self._podado, hasta)
+        # Las propias hacen falta hasta que el rival las confirma (se reenvían) y mientras haya rollback
+        for frame in range(self._podado_propias, min(self.confirmado_rival + 1, self._podado)):
+            self.entradas[self.lado].pop(frame, None)
+        self._podado_propias = max(self._podado_propias, min(self.confirmado_rival + 1, self._podado))
+
+    def ganador(self):
+        """Ganador según el último estado que ya no puede cambiar (None si el partido sigue)"""
+        return ganador(self.final) if self.final else None
+
+    def _medir_ventana(self):
+        ahora = time.perf_counter()
+        if ahora - self._inicio_ventana >= 1.0:
+            self.estadisticas = self._ventana
+            self._ventana = {"rollback_max": 0, "resimulados": 0, "esperas": 0, "frames": 0}
+            self._inicio_ventana = ahora
+
+    def lineas_estadisticas(self):
+        """Texto del panel: RTT, rollback y frames resimulados en el último segundo"""
+        e = self.estadisticas
+        rtt = f"{self.rtt * 1000:.0f} ms" if self.rtt is not None else "-"
+        conexion = self.conexion
+        perdidos = f"{100 * conexion.descartados / conexion.enviados:.0f}%" if conexion.enviados else "-"
+        lineas = [f"RTT {rtt}   retardo {self.retardo} frames   perdidos (envío) {perdidos}",
+                  f"rollback {self.rollback} frames (máx del último segundo {e['rollback_max']})   "
+                  f"resimulados {e['resimulados']}/s   esperas {e['esperas']}/s"]
+        if self.desincronizado:
+            lineas.append("¡DESINCRONIZADO!")
+        return lineas
+
+    def cerrar(self):
+        for _ in range(3):
+            self.conexion.enviar(_ADIOS)
+        self.conexion.latencia = 0
+        self.conexion.bombear()
+        self.conexion.cerrar()
+
+
+# ---------------------------------------------------------------------------
+# Armado de la sesión
+# ---------------------------------------------------------------------------
+
+def crear_sesion(host=False, unirse=None, puerto=PUERTO, latencia=0.0, perdida=0.0):
+    """Sesión como host (escucha en `puerto`) o uniéndose a `unirse` = (ip, puerto)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if host:
+        sock.bind(("", puerto))
+        destino = None
+    else:
+        sock.bind(("", 0))
+        destino = (socket.gethostbyname(unirse[0]), unirse[1])
+    sock.setblocking(False)
+    conexion = Conexion(sock, destino, latencia, perdida)
+    return Sesion(0 if host else 1, conexion)
+
+
+def leer_argumentos(argumentos):
+    """Opciones de red de la línea de comandos ({} si no se pidió jugar en red)"""
+    opciones = {}
+    i = 0
+    while i < len(argumentos):
+        nombre = argumentos[i]
+        valor = argumentos[i + 1] if i + 1 < len(argumentos) and not argumentos[i + 1].startswith("--") else None
+        if nombre == "--host":
+            opciones["host"] = True
+            if valor:
+                opciones["puerto"] = int(valor)
+        elif nombre == "--unirse" and valor:
+            ip, _, puerto = valor.partition(":")
+            opciones["unirse"] = (ip, int(puerto) if puerto else PUERTO)
+        elif nombre == "--latencia" and valor:
+            opciones["latencia"] = float(valor) / 1000
+        elif nombre == "--perdida" and valor:
+            opciones["perdida"] = float(valor)
+        elif nombre == "--sin-ventana" and valor:
+            opciones["sin_ventana"] = float(valor)
+        else:
+            raise ValueError(f"Argumento desconocido: {nombre}")
+        i += 2 if valor is not None else 1
+    return opciones
+
+
+# ---------------------------------------------------------------------------
+# Prueba en esta máquina
+# ---------------------------------------------------------------------------
+
+def prueba_sin_ventana(segundos, latencia=0.0, perdida=0.0, puerto=PUERTO):
+    """Juega los dos lados en este proceso con entradas al azar y compara los partidos"""
+    host = crear_sesion(host=True, puerto=puerto, latencia=latencia, perdida=perdida)
+    invitado = crear_sesion(unirse=("127.0.0.1", puerto), latencia=latencia, perdida=perdida)
+    rng = random.Random(1)
+    entradas = [0, 0]
+    inicio = time.perf_counter()
+    proximo = inicio
+    rollback_max = resimulados = 0
+    while time.perf_counter() - inicio < segundos:
+        for i, sesion in enumerate((host, invitado)):
+            if rng.random() < 0.05:
+                entradas[i] = rng.choice((-1, 0, 1))
+            sesion.actualizar(entradas[i])
+            rollback_max = max(rollback_max, sesion.rollback)
+        resimulados = max(resimulados, host.estadisticas["resimulados"])
+        proximo += DT
+        time.sleep(max(0.0, proximo - time.perf_counter()))
+
+    # Sin más entradas nuevas, hasta que los dos confirmen lo mismo
+    for _ in range(int(2 / DT)):
+        for sesion in (host, invitado):
+            sesion.actualizar(0)
+        time.sleep(DT)
+    comun = min(host._podado, invitado._podado) - 1
+    comparado = [f for f in host._sumas if f in invitado._sumas and f <= comun]
+    iguales = all(host._sumas[f] == invitado._sumas[f] for f in comparado)
+    for sesion in (host, invitado):
+        print(f"lado {sesion.lado}: frame {sesion.frame}, RTT "
+              f"{sesion.rtt * 1000 if sesion.rtt else 0:.0f} ms, puntaje {sesion.final[6]}-{sesion.final[7]}")
+    print(f"rollback máximo {rollback_max} frames, hasta {resimulados} frames resimulados por segundo")
+    print(f"{len(comparado)} verificaciones de estado: {'iguales' if iguales else 'DISTINTAS'}"
+          f"{' (desincronizado)' if host.desincronizado or invitado.desincronizado else ''}")
+    host.cerrar()
+    invitado.cerrar()
+    return 0 if iguales and comparado else 1
+
+
+def prueba(opciones):
+    """Abre host e invitado como dos procesos de pong.py, uno al lado del otro"""
+    extra = []
+    if "latencia" in opciones:
+        extra += ["--latencia", str(opciones["latencia"] * 1000)]
+    if "perdida" in opciones:
+        extra += ["--perdida", str(opciones["perdida"])]
+    puerto = str(opciones.get("puerto", PUERTO))
+    pong_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pong.py")
+    procesos = []
+    for x, argumentos in ((0, ["--host", puerto]), (W + 10, ["--unirse", f"127.0.0.1:{puerto}"])):
+        entorno = dict(os.environ, SDL_VIDEO_WINDOW_POS=f"{x},40")
+        procesos.append(subprocess.Popen([sys.executable, pong_py] + argumentos + extra, env=entorno))
+    for proceso in procesos:
+        proceso.wait()
+    return 0
+
+
+def main(argumentos):
+    if not argumentos or argumentos[0] != "prueba":
+        print(__doc__.strip().splitlines()[4])
+        return 2
+    try:
+        opciones = leer_argumentos(argumentos[1:])
+    except ValueError as error:
+        print(error)
+        return 2
+    if "sin_ventana" in opciones:
+        return prueba_sin_ventana(opciones["sin_ventana"], opciones.get("latencia", 0.0),
+                                  opciones.get("perdida", 0.0), opciones.get("puerto", PUERTO))
+    return prueba(opciones)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
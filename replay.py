@@ -0,0 +1,307 @@
+"""Grabación y reproducción exacta de partidas.
+
+Un replay guarda la semilla de `random` y, frame a frame, todo lo que el juego
+leyó a través de game_loop: eventos de teclado y mouse, teclas mantenidas,
+posición y botones del mouse, y los valores devueltos por tick() y
+get_ticks(). Reproducirlo con la misma semilla vuelve a producir la misma
+partida, sin ventana y sin esperar al reloj.
+
+Uso:
+  python replay.py grabar snake.py [salida.rpl]
+  python replay.py reproducir partida.rpl [otra.rpl ...]
+
+Formato (little endian): b"RPLY", versión u8, semilla u64, largo u8 + nombre
+del juego en utf-8, cantidad de frames u32, y el resto comprimido con zlib:
+una secuencia de registros que empiezan con un byte
+  b"E" frame de entrada: flags u8 y, según los flags, mouse (i16, i16),
+       botones (u8), cambios de teclas mantenidas (u8 n + u32*n altas,
+       u8 n + u32*n bajas) y eventos (u8 n + eventos)
+  b"T" lo que devolvió tick(): u16 ms
+  b"R" lo que devolvió get_ticks(): u32 ms
+"""
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+
+import pygame
+
+import game_host
+import game_loop
+
+MAGICO = b"RPLY"
+VERSION = 1
+CARPETA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replays")
+
+# Flags de un frame
+_MOUSE, _BOTONES, _TECLAS, _EVENTOS = 1, 2, 4, 8
+# Tipos de evento guardados (QUIT no se guarda: al reproducir cerraría pygame)
+_KEYDOWN, _KEYUP, _BOTON_ABAJO, _BOTON_ARRIBA, _RUEDA = 1, 2, 3, 4, 5
+
+
+def _i16(valor):
+    return max(-32768, min(32767, int(valor)))
+
+
+class Grabadora:
+    """Recibe de game_loop la entrada real de cada frame y la codifica"""
+
+    def __init__(self, juego, semilla):
+        self.juego = juego
+        self.semilla = semilla
+        self.frames = 0
+        self._datos = bytearray()
+        self._mouse = (0, 0)
+        self._botones = 0
+        self._teclas = frozenset()
+
+    def frame(self, eventos):
+        self.frames += 1
+        flags = 0
+        cuerpo = bytearray()
+
+        mouse = pygame.mouse.get_pos()
+        if mouse != self._mouse:
+            flags |= _MOUSE
+            cuerpo += struct.pack("<hh", _i16(mouse[0]), _i16(mouse[1]))
+            self._mouse = mouse
+
+        botones = sum(1 << i for i, apretado in enumerate(pygame.mouse.get_pressed()) if apretado)
+        if botones != self._botones:
+            flags |= _BOTONES
+            cuerpo += struct.pack("<B", botones)
+            self._botones = botones
+
+        estado = pygame.key.get_pressed()
+        teclas = frozenset(evento.key for evento in eventos if evento.type == pygame.KEYDOWN and estado[evento.key])
+        teclas |= frozenset(t for t in self._teclas if estado[t])
+        if teclas != self._teclas:
+            flags |= _TECLAS
+            altas, bajas = sorted(teclas - self._teclas), sorted(self._teclas - teclas)
+            cuerpo += struct.pack(f"<B{len(altas)}I", len(altas), *altas)
+            cuerpo += struct.pack(f"<B{len(bajas)}I", len(bajas), *bajas)
+            self._teclas = teclas
+
+        codificados = [c for c in (self._evento(e) for e in eventos) if c]
+        if codificados:
+            flags |= _EVENTOS
+            cuerpo += struct.pack("<B", min(len(codificados), 255))
+            for codificado in codificados[:255]:
+                cuerpo += codificado
+
+        self._datos += b"E" + struct.pack("<B", flags) + cuerpo
+
+    def _evento(self, evento):
+        if evento.type == pygame.KEYDOWN:
+            texto = getattr(evento, "unicode", "").encode("utf-8")[:255]
+            return struct.pack("<BIB", _KEYDOWN, evento.key, len(texto)) + texto
+        if evento.type == pygame.KEYUP:
+            return struct.pack("<BI", _KEYUP, evento.key)
+        if evento.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            tipo = _BOTON_ABAJO if evento.type == pygame.MOUSEBUTTONDOWN else _BOTON_ARRIBA
+            return struct.pack("<BBhh", tipo, evento.button, _i16(evento.pos[0]), _i16(evento.pos[1]))
+        if evento.type == pygame.MOUSEWHEEL:
+            return struct.pack("<Bbb", _RUEDA, max(-128, min(127, evento.x)), max(-128, min(127, evento.y)))
+        return None
+
+    def tick(self, dt):
+        self._datos += b"T" + struct.pack("<H", max(0, min(65535, dt)))
+
+    def ticks(self, valor):
+        self._datos += b"R" + struct.pack("<I", valor & 0xFFFFFFFF)
+
+    def guardar(self, ruta):
+        nombre = self.juego.encode("utf-8")[:255]
+        with open(ruta, "wb") as f:
+            f.write(MAGICO + struct.pack("<BQB", VERSION, self.semilla, len(nombre)) + nombre)
+            f.write(struct.pack("<I", self.frames))
+            f.write(zlib.compress(bytes(self._datos), 9))
+
+
+class Replay:
+    """Replay leído de disco: semilla, juego y las tres secuencias (frames, ticks, get_ticks)"""
+
+    def __init__(self, juego, semilla, frames, dts, ticks):
+        self.juego = juego
+        self.semilla = semilla
+        self.frames = frames
+        self.dts = dts
+        self.ticks = ticks
+
+
+def cargar(ruta):
+    """Lee un archivo .rpl; lanza ValueError si no tiene el formato esperado"""
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    if contenido[:4] != MAGICO:
+        raise ValueError(f"{ruta} no es un replay")
+    version, semilla, largo = struct.unpack_from("<BQB", contenido, 4)
+    if version != VERSION:
+        raise ValueError(f"{ruta}: versión de replay {version} no soportada")
+    posicion = 4 + 10
+    juego = contenido[posicion:posicion + largo].decode("utf-8")
+    posicion += largo
+    (cantidad,) = struct.unpack_from("<I", contenido, posicion)
+    datos = zlib.decompress(contenido[posicion + 4:])
+
+    frames, dts, ticks = [], [], []
+    mouse, botones, teclas = (0, 0), (False, False, False), frozenset()
+    i = 0
+    while i < len(datos):
+        tipo = datos[i:i + 1]
+        i += 1
+        if tipo == b"T":
+            dts.append(struct.unpack_from("<H", datos, i)[0]); i += 2
+        elif tipo == b"R":
+            ticks.append(struct.unpack_from("<I", datos, i)[0]); i += 4
+        elif tipo == b"E":
+            flags = datos[i]; i += 1
+            eventos = []
+            if flags & _MOUSE:
+                mouse = struct.unpack_from("<hh", datos, i); i += 4
+            if flags & _BOTONES:
+                bits = datos[i]; i += 1
+                botones = tuple(bool(bits & (1 << b)) for b in range(3))
+            if flags & _TECLAS:
+                n = datos[i]; i += 1
+                altas = struct.unpack_from(f"<{n}I", datos, i); i += 4 * n
+                n = datos[i]; i += 1
+                bajas = struct.unpack_from(f"<{n}I", datos, i); i += 4 * n
+                teclas = (teclas | frozenset(altas)) - frozenset(bajas)
+            if flags & _EVENTOS:
+                n = datos[i]; i += 1
+                for _ in range(n):
+                    evento, i = _leer_evento(datos, i)
+                    eventos.append(evento)
+            frames.append((eventos, mouse, botones, teclas))
+        else:
+            raise ValueError(f"{ruta}: registro desconocido {tipo!r}")
+
+    if len(frames) != cantidad:
+        raise ValueError(f"{ruta}: se esperaban {cantidad} frames y hay {len(frames)}")
+    return Replay(juego, semilla, frames, dts, ticks)
+
+
+def _leer_evento(datos, i):
+    tipo = datos[i]
+    if tipo == _KEYDOWN:
+        _, tecla, largo = struct.unpack_from("<BIB", datos, i); i += 6
+        texto = datos[i:i + largo].decode("utf-8"); i += largo
+        return pygame.event.Event(pygame.KEYDOWN, key=tecla, unicode=texto, mod=0, scancode=0), i
+    if tipo == _KEYUP:
+        _, tecla = struct.unpack_from("<BI", datos, i)
+        return pygame.event.Event(pygame.KEYUP, key=tecla, mod=0, scancode=0), i + 5
+    if tipo in (_BOTON_ABAJO, _BOTON_ARRIBA):
+        _, boton, x, y = struct.unpack_from("<BBhh", datos, i)
+        tipo_pygame = pygame.MOUSEBUTTONDOWN if tipo == _BOTON_ABAJO else pygame.MOUSEBUTTONUP
+        return pygame.event.Event(tipo_pygame, button=boton, pos=(x, y)), i + 6
+    if tipo == _RUEDA:
+        _, x, y = struct.unpack_from("<Bbb", datos, i)
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=x, y=y, flipped=False), i + 3
+    raise ValueError(f"evento desconocido {tipo}")
+
+
+class EntradaReplay:
+    """Entrada para game_loop.simular() que devuelve exactamente lo grabado"""
+
+    def __init__(self, replay):
+        self._frames = deque(replay.frames)
+        self._dts = deque(replay.dts)
+        self._ticks = deque(replay.ticks)
+        self.apretadas = frozenset()
+        self.mouse = (0, 0)
+        self.botones = (False, False, False)
+
+    def siguiente_frame(self):
+        eventos, mouse, botones, teclas = self._frames.popleft()
+        lista = []
+        if mouse != self.mouse:
+            lista.append(pygame.event.Event(pygame.MOUSEMOTION, pos=mouse, buttons=botones,
+                                            rel=(mouse[0] - self.mouse[0], mouse[1] - self.mouse[1])))
+        self.mouse, self.botones, self.apretadas = mouse, botones, teclas
+        return lista + eventos
+
+    def dt(self, fps):
+        return self._dts.popleft() if self._dts else round(1000 / fps)
+
+    def ticks(self, tiempo_virtual):
+        return self._ticks.popleft() if self._ticks else tiempo_virtual
+
+    def sobrantes(self):
+        """Lecturas grabadas que no se consumieron (distinto de 0 = el replay se desincronizó)"""
+        return len(self._frames) + len(self._dts) + len(self._ticks)
+
+
+def grabar(archivo, pantalla, ruta=None, semilla=None, settings=None):
+    """Juega `archivo` con la entrada real y guarda el replay en `ruta`; devuelve la ruta"""
+    juego = game_host.nombre_modulo(archivo)
+    if ruta is None:
+        os.makedirs(CARPETA, exist_ok=True)
+        ruta = os.path.join(CARPETA, f"{juego}_{time.strftime('%Y%m%d_%H%M%S')}.rpl")
+    if semilla is None:
+        semilla = random.randrange(2 ** 63)
+
+    # El módulo se importa antes de sembrar: lo que use random al importarse no cuenta
+    game_host.cargar_juego(archivo)
+    grabadora = Grabadora(juego, semilla)
+    random.seed(semilla)
+    try:
+        with game_loop.grabar(grabadora):
+            game_host.ejecutar_juego(archivo, pantalla, settings)
+    finally:
+        grabadora.guardar(ruta)
+        print(f"Replay guardado: {ruta} ({grabadora.frames} frames)")
+    return ruta
+
+
+def reproducir(replay, pantalla=None, medidor=None, settings=None):
+    """Reproduce un Replay a máxima velocidad; devuelve la cantidad de lecturas sobrantes"""
+    archivo = replay.juego + ".py"
+    pantalla = pantalla or pygame.display.get_surface()
+    game_host.cargar_juego(archivo)
+    entrada = EntradaReplay(replay)
+    random.seed(replay.semilla)
+
+    with game_loop.simular(entrada, len(replay.frames)), game_loop.medir(medidor or game_loop.Medidor()):
+        try:
+            game_host.ejecutar_juego(archivo, pantalla, settings)
+        except game_loop.FinSimulacion:
+            pass
+    return entrada.sobrantes()
+
+
+def main(argumentos):
+    if len(argumentos) >= 2 and argumentos[0] == "grabar":
+        pygame.init()
+        pantalla = pygame.display.set_mode((800, 600))
+        grabar(argumentos[1], pantalla, argumentos[2] if len(argumentos) > 2 else None)
+        return 0
+
+    if len(argumentos) >= 2 and argumentos[0] == "reproducir":
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.init()
+        pygame.display.set_mode((800, 600))
+        for ruta in argumentos[1:]:
+            replay = cargar(ruta)
+            medidor = game_loop.Medidor()
+            inicio = time.perf_counter()
+            sobrantes = reproducir(replay, medidor=medidor)
+            segundos = time.perf_counter() - inicio
+
+            totales = [sum(frame.values()) for frame in medidor.frames] or [0.0]
+            peor = max(range(len(totales)), key=totales.__getitem__)
+            estado = "ok" if sobrantes == 0 else f"DESINCRONIZADO ({sobrantes} lecturas sin usar)"
+            print(f"{ruta}: {replay.juego}, {len(replay.frames)} frames en {segundos:.2f} s, "
+                  f"frame más lento #{peor} ({totales[peor] * 1000:.2f} ms), {estado}")
+        return 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,12 @@
 import pygame
 import random
 import math
+import sys
+
+import assets
+import game_host
+import game_loop
+import text_cache
 
 # Inicializar Pygame
 pygame.init()
@@ -76,32 +82,28 @@ img_menu = None
 img_menu_eleccion = None
 img_game_over = None
 
-def inicializar_pygame():
-    """Inicializa pygame y crea la ventana"""
+def inicializar_pygame(surface=None):
+    """Prepara la ventana recibida y carga los recursos"""
     global pantalla, reloj, fuente, img_menu, img_menu_eleccion, img_game_over
-    pantalla = pygame.display.set_mode((ANCHO, ALTO))
-    pygame.display.set_caption("Sky Hopper - Estilo Pou")
+    pantalla = game_host.ajustar_pantalla(surface, (ANCHO, ALTO), "Sky Hopper - Estilo Pou")
     reloj = pygame.time.Clock()
-    fuente = pygame.font.Font(None, 36)
+    fuente = text_cache.fuente(36)
     
     # Cargar imágenes
     try:
-        img_menu = pygame.image.load('image/menu_sky_hopper.png')
-        img_menu = pygame.transform.scale(img_menu, (ANCHO, ALTO))
+        img_menu = assets.cargar('image/menu_sky_hopper.png', (ANCHO, ALTO), alpha=False)
     except:
         img_menu = None
         print("No se pudo cargar menu_sky_hopper.png")
         
     try:
-        img_menu_eleccion = pygame.image.load('image/menu_eleccion_sky_hopper.png')
-        img_menu_eleccion = pygame.transform.scale(img_menu_eleccion, (ANCHO, ALTO))
+        img_menu_eleccion = assets.cargar('image/menu_eleccion_sky_hopper.png', (ANCHO, ALTO), alpha=False)
     except:
         img_menu_eleccion = None
         print("No se pudo cargar menu_eleccion_sky_hopper.png")
         
     try:
-        img_game_over = pygame.image.load('image/game_over_sky_hopper.png')
-        img_game_over = pygame.transform.scale(img_game_over, (ANCHO, ALTO))
+        img_game_over = assets.cargar('image/game_over_sky_hopper.png', (ANCHO, ALTO), alpha=False)
     except:
         img_game_over = None
         print("No se pudo cargar game_over_sky_hopper.png")
@@ -419,15 +421,15 @@ def dibujar_menu():
         # Fallback si no se carga la imagen
         pantalla.fill((50, 50, 100))
         
-        fuente_titulo = pygame.font.Font(None, 72)
-        titulo = fuente_titulo.render("SKY HOPPER", True, AMARILLO)
+        fuente_titulo = text_cache.fuente(72)
+        titulo = text_cache.render(fuente_titulo, "SKY HOPPER", AMARILLO)
         pantalla.blit(titulo, (ANCHO//2 - titulo.get_width()//2, 200))
         
-        fuente_inst = pygame.font.Font(None, 48)
-        texto_space = fuente_inst.render("PRESS SPACE TO CONTINUE", True, BLANCO)
+        fuente_inst = text_cache.fuente(48)
+        texto_space = text_cache.render(fuente_inst, "PRESS SPACE TO CONTINUE", BLANCO)
         pantalla.blit(texto_space, (ANCHO//2 - texto_space.get_width()//2, 400))
         
-        texto_esc = fuente_inst.render("ESC TO EXIT", True, BLANCO)
+        texto_esc = text_cache.render(fuente_inst, "ESC TO EXIT", BLANCO)
         pantalla.blit(texto_esc, (ANCHO//2 - texto_esc.get_width()//2, 500))
 
 def dibujar_menu_eleccion():
@@ -438,7 +440,7 @@ def dibujar_menu_eleccion():
         # Fallback si no se carga la imagen
         pantalla.fill((50, 50, 100))
         
-        fuente_titulo = pygame.font.Font(None, 72)
+        fuente_titulo = text_cache.fuente(72)
         titulo = fuente_titulo.render("CHOOSE DIFFICULTY", True, AMARILLO)
         pantalla.blit(titulo, (ANCHO//2 - titulo.get_width()//2, 100))
         
@@ -446,7 +448,7 @@ def dibujar_menu_eleccion():
         y_inicio = 300
         opciones = ["1. EASY", "2. MEDIUM", "3. HARD"]
         
-        fuente_opcion = pygame.font.Font(None, 64)
+        fuente_opcion = text_cache.fuente(64)
         for i, texto in enumerate(opciones):
             texto_render = fuente_opcion.render(texto, True, BLANCO)
             pantalla.blit(texto_render, (ANCHO//2 - texto_render.get_width()//2, y_inicio + i*100))
@@ -486,8 +488,8 @@ def dibujar_game_over():
         overlay.fill(NEGRO)
         pantalla.blit(overlay, (0, 0))
         
-        fuente_grande = pygame.font.Font(None, 72)
-        fuente_mediana = pygame.font.Font(None, 36)
+        fuente_grande = text_cache.fuente(72)
+        fuente_mediana = text_cache.fuente(36)
         
         texto_go = fuente_grande.render("GAME OVER", True, BLANCO)
         texto_reinicio = fuente_mediana.render("PRESS SPACE TO PLAY AGAIN", True, AMARILLO)
@@ -540,9 +542,10 @@ def manejar_eventos():
     """Maneja todos los eventos de pygame"""
     global game_over, en_menu, en_menu_eleccion, dificultad_actual
     
-    for evento in pygame.event.get():
+    for evento in game_loop.eventos():
         if evento.type == pygame.QUIT:
-            return False
+            pygame.quit()
+            sys.exit()
         elif evento.type == pygame.KEYDOWN:
             if en_menu and not en_menu_eleccion:
                 # Menú principal
@@ -581,30 +584,39 @@ def manejar_eventos():
                     game_over = False
     return True
 
-def ejecutar_juego():
+def run(surface, settings=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    global en_menu, en_menu_eleccion, game_over
+    en_menu = True
+    en_menu_eleccion = False
+    game_over = False
+    ejecutar_juego(surface)
+
+def ejecutar_juego(surface=None):
     """Función principal que ejecuta el bucle del juego"""
     global jugador
     
-    inicializar_pygame()
+    inicializar_pygame(surface)
     
     corriendo = True
     
     while corriendo:
         corriendo = manejar_eventos()
+        if not corriendo:
+            break
         
         if en_menu and not en_menu_eleccion:
             dibujar_menu()
         elif en_menu_eleccion:
             dibujar_menu_eleccion()
         else:
-            teclas = pygame.key.get_pressed()
+            teclas = game_loop.teclas()
             actualizar_juego(teclas)
             dibujar_juego()
         
-        pygame.display.flip()
-        reloj.tick(FPS)
-        
-    pygame.quit()
+        game_loop.flip()
+        game_loop.tick(reloj, FPS)
 
 if __name__ == "__main__":
-    ejecutar_juego()
\ No newline at end of file
+    run(pygame.display.set_mode((ANCHO, ALTO)))
+    pygame.quit()
\ No newline at end of file
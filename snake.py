@@ -13,11 +13,16 @@ def get_curve_image(dir_from_prev, dir_to_next):
     }
     return curve_map.get((dir_from_prev, dir_to_next), None)
 import pygame
-import random
 import sys
 import math
 import os
 
+import assets
+import game_host
+import game_loop
+import snake_tablero
+import text_cache
+
 
 pygame.init()
 
@@ -35,9 +40,8 @@ APPLE_RED = (220, 20, 20)
 APPLE_GREEN = (34, 139, 34)
 DARK_RED = (139, 0, 0)
 
-# Pantalla y reloj
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Snake")
+# Pantalla y reloj (la pantalla la entrega run())
+screen = None
 clock = pygame.time.Clock()
 font = pygame.font.SysFont(None, 35)
 
@@ -68,15 +72,13 @@ def cargar_imagenes():
         try:
             ruta = os.path.join(carpeta_img, nombre)
             if os.path.exists(ruta):
-                img = pygame.image.load(ruta).convert_alpha()
-                
                 # Escalar según el tipo de imagen
                 if key in ['menu', 'game_over']:
                     # Escalar fondos exactamente al tamaño de la pantalla
-                    imagenes[key] = pygame.transform.scale(img, (WIDTH, HEIGHT))
+                    imagenes[key] = assets.cargar(ruta, (WIDTH, HEIGHT), alpha=False)
                 else:
                     # Escalar partes de la serpiente y manzana al tamaño de la celda
-                    imagenes[key] = pygame.transform.scale(img, (CELL_SIZE, CELL_SIZE))
+                    imagenes[key] = assets.cargar(ruta, (CELL_SIZE, CELL_SIZE))
                 print(f"✓ {key} cargada")
             else:
                 print(f"✗ No se encontró: {ruta}")
@@ -85,10 +87,35 @@ def cargar_imagenes():
             print(f"Error cargando {key}: {e}")
             imagenes[key] = None
     
+    imagenes['orientaciones'] = construir_orientaciones(imagenes)
     return imagenes
 
-# Cargar todas las imágenes
-imagenes = cargar_imagenes()
+def construir_orientaciones(imagenes):
+    """Rota una sola vez cabeza, cola y cuerpo en las 4 direcciones y agrega las 8 curvas.
+
+    Las piezas son cuadradas (CELL_SIZE), así que rotadas 90° siguen
+    ocupando exactamente su celda y se dibujan en (x, y) sin recalcular el rect.
+    """
+    orientaciones = {}
+    for direction in ["RIGHT", "DOWN", "LEFT", "UP"]:
+        if imagenes.get('cabeza'):
+            orientaciones[('cabeza', direction)] = pygame.transform.rotate(imagenes['cabeza'], -get_direction_angle(direction))
+        if imagenes.get('cola'):
+            orientaciones[('cola', direction)] = pygame.transform.rotate(imagenes['cola'], -get_tail_angle(direction))
+        if imagenes.get('cuerpo'):
+            angle = 0 if direction in ["RIGHT", "LEFT"] else 90
+            orientaciones[('cuerpo', direction)] = pygame.transform.rotate(imagenes['cuerpo'], -angle)
+    
+    for dir_from_prev in ["RIGHT", "DOWN", "LEFT", "UP"]:
+        for dir_to_next in ["RIGHT", "DOWN", "LEFT", "UP"]:
+            curve_key = get_curve_image(dir_from_prev, dir_to_next)
+            if curve_key and imagenes.get(curve_key):
+                orientaciones[('curva', dir_from_prev, dir_to_next)] = imagenes[curve_key]
+    
+    return orientaciones
+
+# Las imágenes se cargan en run(), cuando ya existe la ventana
+imagenes = None
 
 def draw_text(text, color, x, y):
     img = font.render(text, True, color)
@@ -129,66 +156,42 @@ def get_tail_angle(direction):
     }
     return angles.get(direction, 0)
 
+def clave_pieza(anterior, pos, siguiente, current_direction):
+    """Clave en imagenes['orientaciones'] del segmento en `pos`.
+
+    `anterior` es el segmento hacia la cabeza (None si `pos` es la cabeza) y
+    `siguiente` el que va hacia la cola (None si `pos` es la cola).
+    """
+    if anterior is None:  # Cabeza - siempre mira a donde se está moviendo
+        return ('cabeza', current_direction)
+    dir_from_prev = get_direction_from_positions(anterior, pos)
+    if siguiente is None:  # Cola - dirección desde el penúltimo segmento
+        return ('cola', dir_from_prev)
+    # Cuerpo: recto o curva
+    dir_to_next = get_direction_from_positions(pos, siguiente)
+    if dir_from_prev == dir_to_next:
+        return ('cuerpo', dir_from_prev)
+    return ('curva', dir_from_prev, dir_to_next)
+
 def draw_snake(snake_body, current_direction):
-    """Dibuja la serpiente con imágenes de cabeza, cuerpo, cola y curvas"""
+    """Dibuja la serpiente con imágenes de cabeza, cuerpo, cola y curvas ya rotadas (un solo blits)"""
     if not snake_body:
         return
     
+    orientaciones = imagenes['orientaciones']
+    ultimo = len(snake_body) - 1
+    piezas = []
+    
     for i, pos in enumerate(snake_body):
-        x, y = pos
-        
-        if i == 0:  # Cabeza - siempre mira a donde se está moviendo
-            if imagenes['cabeza']:
-                angle = get_direction_angle(current_direction)
-                rotated = pygame.transform.rotate(imagenes['cabeza'], -angle)
-                rect = rotated.get_rect(center=(x + CELL_SIZE//2, y + CELL_SIZE//2))
-                screen.blit(rotated, rect)
-            else:
-                pygame.draw.rect(screen, GREEN, (x, y, CELL_SIZE, CELL_SIZE))
-        
-        elif i == len(snake_body) - 1:  # Cola
-            if imagenes['cola'] and len(snake_body) > 1:
-                # Dirección desde el penúltimo segmento hacia la cola
-                prev_pos = snake_body[i-1]
-                tail_direction = get_direction_from_positions(prev_pos, pos)
-                angle = get_tail_angle(tail_direction)
-                rotated = pygame.transform.rotate(imagenes['cola'], -angle)
-                rect = rotated.get_rect(center=(x + CELL_SIZE//2, y + CELL_SIZE//2))
-                screen.blit(rotated, rect)
-            else:
-                pygame.draw.rect(screen, GREEN, (x, y, CELL_SIZE, CELL_SIZE))
-        
-        else:  # Cuerpo
-            if len(snake_body) > 2:
-                prev_pos = snake_body[i-1]
-                next_pos = snake_body[i+1]
-                
-                dir_from_prev = get_direction_from_positions(prev_pos, pos)
-                dir_to_next = get_direction_from_positions(pos, next_pos)
-                
-                # Verificar si es una curva
-                if dir_from_prev != dir_to_next:
-                    # Es una curva
-                    curve_key = get_curve_image(dir_from_prev, dir_to_next)
-                    if curve_key and imagenes.get(curve_key):
-                        screen.blit(imagenes[curve_key], (x, y))
-                    else:
-                        pygame.draw.rect(screen, GREEN, (x, y, CELL_SIZE, CELL_SIZE))
-                else:
-                    # Es un segmento recto
-                    if imagenes['cuerpo']:
-                        if dir_from_prev in ["RIGHT", "LEFT"]:
-                            angle = 0  # Horizontal
-                        else:
-                            angle = 90  # Vertical
-                        
-                        rotated = pygame.transform.rotate(imagenes['cuerpo'], -angle)
-                        rect = rotated.get_rect(center=(x + CELL_SIZE//2, y + CELL_SIZE//2))
-                        screen.blit(rotated, rect)
-                    else:
-                        pygame.draw.rect(screen, GREEN, (x, y, CELL_SIZE, CELL_SIZE))
-            else:
-                pygame.draw.rect(screen, GREEN, (x, y, CELL_SIZE, CELL_SIZE))
+        clave = clave_pieza(snake_body[i-1] if i > 0 else None, pos,
+                            snake_body[i+1] if i < ultimo else None, current_direction)
+        imagen = orientaciones.get(clave)
+        if imagen:
+            piezas.append((imagen, pos))
+        else:
+            pygame.draw.rect(screen, GREEN, (pos[0], pos[1], CELL_SIZE, CELL_SIZE))
+    
+    screen.blits(piezas, doreturn=False)
 
 def draw_apple(pos):
     """Dibuja la manzana usando la imagen cargada o un diseño de respaldo"""
@@ -206,20 +209,144 @@ def draw_apple(pos):
         highlight_pos = (center_x - 3, center_y - 3)
         pygame.draw.circle(screen, (255, 100, 100), highlight_pos, radius // 3)
 
-def draw_grid():
+# Fondo negro con la grilla ya dibujada (se arma la primera vez que se usa)
+fondo = None
+
+def crear_fondo():
+    superficie = pygame.Surface((WIDTH, HEIGHT)).convert()
+    superficie.fill(BLACK)
     for x in range(0, WIDTH, CELL_SIZE):
-        pygame.draw.line(screen, GRAY, (x, 0), (x, HEIGHT))
+        pygame.draw.line(superficie, GRAY, (x, 0), (x, HEIGHT))
     for y in range(0, HEIGHT, CELL_SIZE):
-        pygame.draw.line(screen, GRAY, (0, y), (WIDTH, y))
+        pygame.draw.line(superficie, GRAY, (0, y), (WIDTH, y))
+    return superficie
 
-def generate_food(snake_body):
-    grid_w = WIDTH // CELL_SIZE
-    grid_h = HEIGHT // CELL_SIZE
-    while True:
-        x = random.randint(0, grid_w - 1) * CELL_SIZE
-        y = random.randint(0, grid_h - 1) * CELL_SIZE
-        if (x, y) not in snake_body:
-            return (x, y)
+def draw_grid():
+    global fondo
+    if fondo is None:
+        fondo = crear_fondo()
+    screen.blit(fondo, (0, 0))
+
+def a_pixeles(celda):
+    """Esquina superior izquierda, en píxeles, de una celda (columna, fila) de la grilla"""
+    return (celda[0] * CELL_SIZE, celda[1] * CELL_SIZE)
+
+class DibujoIncremental:
+    """Dibuja la partida repintando solo las celdas que cambiaron desde el frame anterior.
+
+    Cada celda sucia se tapa con su pedazo del fondo (que ya trae la grilla) y
+    se le dibuja encima la pieza de serpiente o la manzana que tenga; a
+    pygame.display.update le llegan solo esos rects. En un paso normal son la
+    cabeza nueva y la anterior, la cola que se fue, la nueva cola y la comida.
+    El texto del puntaje y el overlay de F3 tapan celdas: cuando cambian se
+    repintan las celdas que tocan.
+    """
+
+    def __init__(self, tablero):
+        self.tablero = tablero
+        self.completo = True  # el próximo frame se dibuja entero
+        self.sucias = set()
+        self._cabeza = self._cola = self._comida = None
+        self._puntaje = None
+        self._texto = None
+        self._zona_texto = None
+        self._celdas_texto = set()
+        self._zona_overlay = None
+
+    def celdas_en(self, rect):
+        """Índices de las celdas que toca `rect` (en píxeles)"""
+        tablero = self.tablero
+        rect = rect.clip(pygame.Rect(0, 0, tablero.ancho * CELL_SIZE, tablero.alto * CELL_SIZE))
+        if not rect.width or not rect.height:
+            return set()
+        columnas = range(rect.left // CELL_SIZE, (rect.right - 1) // CELL_SIZE + 1)
+        return {fila * tablero.ancho + col
+                for fila in range(rect.top // CELL_SIZE, (rect.bottom - 1) // CELL_SIZE + 1)
+                for col in columnas}
+
+    def _actualizar_texto(self):
+        """Vuelve a renderizar el puntaje si cambió; marca sucias las celdas de debajo"""
+        puntaje = self.tablero.puntaje
+        if puntaje == self._puntaje:
+            return
+        self._puntaje = puntaje
+        self._texto = text_cache.render(font, "Puntaje: " + str(puntaje), WHITE)
+        zona = self._texto.get_rect(topleft=(10, 10))
+        self.sucias |= self._celdas_texto
+        self._zona_texto = zona
+        self._celdas_texto = self.celdas_en(zona)
+
+    def dibujar(self, direction):
+        tablero = self.tablero
+        cuerpo = tablero.cuerpo
+        self._actualizar_texto()
+
+        if self.completo:
+            draw_grid()
+            draw_snake([a_pixeles(c) for c in tablero.celdas()], direction)
+            if tablero.comida is not None:
+                draw_apple(a_pixeles(tablero.celda(tablero.comida)))
+            screen.blit(self._texto, self._zona_texto)
+            self._zona_overlay = game_loop.flip()
+            self.completo = False
+        else:
+            sucias = self.sucias
+            sucias.update((self._cabeza, self._cola, self._comida, cuerpo[0], cuerpo[-1], tablero.comida))
+            sucias.discard(None)
+            if self._zona_overlay:
+                sucias |= self.celdas_en(self._zona_overlay)
+            # El texto se dibuja encima de las celdas: si alguna cambió, se repinta todo lo que tapa
+            if sucias & self._celdas_texto:
+                sucias |= self._celdas_texto
+            rects = self._repintar(sucias, direction)
+            if sucias & self._celdas_texto:
+                screen.blit(self._texto, self._zona_texto)
+            self._zona_overlay = game_loop.flip(rects)
+
+        self.sucias = set()
+        self._cabeza, self._cola, self._comida = cuerpo[0], cuerpo[-1], tablero.comida
+
+    def _repintar(self, sucias, direction):
+        """Repinta cada celda de `sucias` y devuelve sus rects"""
+        tablero = self.tablero
+        cuerpo = tablero.cuerpo
+        ancho = tablero.ancho
+        ultimo = len(cuerpo) - 1
+
+        # Posición en el cuerpo de cada celda sucia ocupada: las de las puntas
+        # salen directo y solo si hay otras (texto, overlay) se recorre el cuerpo
+        posiciones = {cuerpo[-1]: ultimo}
+        if ultimo:
+            posiciones[cuerpo[1]] = 1
+        posiciones[cuerpo[0]] = 0
+        faltan = {c for c in sucias if tablero.ocupada[c] and c not in posiciones}
+        if faltan:
+            for i, c in enumerate(cuerpo):
+                if c in faltan:
+                    posiciones[c] = i
+                    faltan.discard(c)
+                    if not faltan:
+                        break
+
+        orientaciones = imagenes['orientaciones']
+        rects = []
+        for c in sucias:
+            pos = (c % ancho * CELL_SIZE, c // ancho * CELL_SIZE)
+            rect = pygame.Rect(pos, (CELL_SIZE, CELL_SIZE))
+            screen.blit(fondo, pos, rect)
+            if tablero.ocupada[c]:
+                i = posiciones[c]
+                clave = clave_pieza(tablero.celda(cuerpo[i - 1]) if i > 0 else None, tablero.celda(c),
+                                    tablero.celda(cuerpo[i + 1]) if i < ultimo else None, direction)
+                imagen = orientaciones.get(clave)
+                if imagen:
+                    screen.blit(imagen, pos)
+                else:
+                    pygame.draw.rect(screen, GREEN, rect)
+            elif c == tablero.comida:
+                draw_apple(pos)
+            rects.append(rect)
+        return rects
 
 def get_speed(score):
     base_speed = 10
@@ -228,10 +355,10 @@ def get_speed(score):
     return min(base_speed + (score // increase_every) * 2, max_speed)
 
 def wait_for_start():
-    """Pantalla de inicio con imagen de menú"""
+    """Pantalla de inicio con imagen de menú. Devuelve False si se eligió salir"""
     waiting = True
     while waiting:
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -239,8 +366,7 @@ def wait_for_start():
                 if event.key == pygame.K_SPACE:
                     waiting = False
                 elif event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+                    return False
         
         screen.fill(BLACK)
         
@@ -254,33 +380,69 @@ def wait_for_start():
             draw_text("ESPACIO PARA JUGAR", GREEN, WIDTH//2 - 140, HEIGHT//2)
             draw_text("ESC PARA SALIR", WHITE, WIDTH//2 - 100, HEIGHT//2 + 40)
         
-        pygame.display.update()
-        clock.tick(30)
+        game_loop.flip()
+        game_loop.tick(clock, 30)
+    return True
 
-def main():
-    wait_for_start()
+def pantalla_final(score, gano):
+    """Game over (o victoria si se llenó el tablero). Devuelve True para jugar otra vez"""
+    screen.fill(BLACK)
+    
+    if imagenes['game_over'] and not gano:
+        # Mostrar la imagen de game over
+        screen.blit(imagenes['game_over'], (0, 0))
+    else:
+        # Game Over de respaldo
+        if gano:
+            draw_text("¡GANASTE! TABLERO LLENO", GREEN, WIDTH//2 - 170, HEIGHT//2 - 60)
+        else:
+            draw_text("GAME OVER!", RED, WIDTH//2 - 100, HEIGHT//2 - 60)
+        draw_text("Puntaje Final: " + str(score), WHITE, WIDTH//2 - 120, HEIGHT//2 - 20)
+        draw_text("ESPACIO PARA JUGAR", GREEN, WIDTH//2 - 140, HEIGHT//2 + 60)
+        draw_text("ESC PARA SALIR", WHITE, WIDTH//2 - 100, HEIGHT//2 + 100)
     
-    snake_pos = (100, 100)
-    snake_body = [snake_pos]
+    game_loop.flip()
+    
+    while True:
+        for event in game_loop.eventos():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    return True
+                elif event.key == pygame.K_ESCAPE:
+                    return False
+        game_loop.tick(clock, 30)
+
+def jugar_partida(controlador=None):
+    """Juega una partida. Devuelve True para jugar otra vez y False para salir.
+
+    Con `controlador` (ver snake_pilotos) la dirección de cada paso la decide
+    controlador.direccion(tablero, direccion_actual) en lugar de las flechas.
+    """
+    # Serpiente, comida y celdas libres (ver snake_tablero): todo en celdas, no en píxeles
+    tablero = snake_tablero.Tablero(WIDTH // CELL_SIZE, HEIGHT // CELL_SIZE, inicio=(100 // CELL_SIZE, 100 // CELL_SIZE))
     direction = "RIGHT"
     next_direction = "RIGHT"  # Dirección siguiente para cambios suave
-    food_pos = generate_food(snake_body)
     score = 0
 
     # Dibujar estado inicial
-    screen.fill(BLACK)
-    draw_grid()
-    draw_snake(snake_body, direction)
-    draw_apple(food_pos)
-    draw_text("Puntaje: " + str(score), WHITE, 10, 10)
-    pygame.display.update()
-    pygame.time.wait(1000)
+    dibujo = DibujoIncremental(tablero)
+    dibujo.dibujar(direction)
+    game_loop.esperar(1000)
 
     while True:
-        for event in pygame.event.get():
+        for event in game_loop.eventos():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # La ventana se volvió a mostrar: lo que no se repinta puede haberse perdido
+                dibujo.completo = True
+            elif event.type == pygame.KEYDOWN and controlador is not None:
+                if event.key == pygame.K_ESCAPE:
+                    return False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP and direction != "DOWN":
                     next_direction = "UP"
@@ -291,69 +453,49 @@ def main():
                 elif event.key == pygame.K_RIGHT and direction != "LEFT":
                     next_direction = "RIGHT"
                 elif event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+                    return False
+
+        game_loop.fase("eventos")
+
+        if controlador is not None:
+            next_direction = controlador.direccion(tablero, direction)
 
         # Actualizar dirección
         direction = next_direction
 
-        x, y = snake_pos
-        if direction == "UP":
-            y -= CELL_SIZE
-        elif direction == "DOWN":
-            y += CELL_SIZE
-        elif direction == "LEFT":
-            x -= CELL_SIZE
-        elif direction == "RIGHT":
-            x += CELL_SIZE
-
-        snake_pos = (x, y)
-        snake_body.insert(0, snake_pos)
-
-        if snake_pos == food_pos:
-            score += 1
-            food_pos = generate_food(snake_body)
-        else:
-            snake_body.pop()
-
-        if (x < 0 or x >= WIDTH or y < 0 or y >= HEIGHT or snake_pos in snake_body[1:]):
-            # Pantalla de Game Over con imagen
-            screen.fill(BLACK)
-            
-            if imagenes['game_over']:
-                # Mostrar la imagen de game over
-                screen.blit(imagenes['game_over'], (0, 0))
-            else:
-                # Game Over de respaldo
-                draw_text("GAME OVER!", RED, WIDTH//2 - 100, HEIGHT//2 - 60)
-                draw_text("Puntaje Final: " + str(score), WHITE, WIDTH//2 - 120, HEIGHT//2 - 20)
-                draw_text("ESPACIO PARA JUGAR", GREEN, WIDTH//2 - 140, HEIGHT//2 + 60)
-                draw_text("ESC PARA SALIR", WHITE, WIDTH//2 - 100, HEIGHT//2 + 100)
-            
-            pygame.display.update()
-            
-            waiting_restart = True
-            while waiting_restart:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        sys.exit()
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_SPACE:
-                            main()
-                        elif event.key == pygame.K_ESCAPE:
-                            pygame.quit()
-                            sys.exit()
-                clock.tick(30)
+        resultado = tablero.avanzar(direction)
+        score = tablero.puntaje
+        if resultado in (snake_tablero.CHOCO, snake_tablero.GANO):
+            return pantalla_final(score, resultado == snake_tablero.GANO)
 
-        screen.fill(BLACK)
-        draw_grid()
-        draw_snake(snake_body, direction)
-        draw_apple(food_pos)
-        draw_text("Puntaje: " + str(score), WHITE, 10, 10)
-        pygame.display.update()
+        game_loop.fase("update")
+
+        dibujo.dibujar(direction)
+
+        game_loop.tick(clock, get_speed(score))
 
-        clock.tick(get_speed(score))
+def run(surface, settings=None, controlador=None):
+    """Punto de entrada común: juega sobre la ventana recibida hasta que se sale con ESC"""
+    global screen, imagenes
+    screen = game_host.ajustar_pantalla(surface, (WIDTH, HEIGHT), "Snake")
+    if imagenes is None:
+        imagenes = cargar_imagenes()
+
+    while wait_for_start():
+        if not jugar_partida(controlador):
+            return
+
+def main():
+    # python snake.py --piloto bfs|hamilton: la serpiente se maneja sola
+    controlador = None
+    if "--piloto" in sys.argv[1:-1]:
+        import snake_pilotos
+        nombre = sys.argv[sys.argv.index("--piloto") + 1]
+        if nombre not in snake_pilotos.PILOTOS:
+            print(f"Piloto desconocido: {nombre} (pilotos: {', '.join(snake_pilotos.PILOTOS)})")
+            return
+        controlador = snake_pilotos.PILOTOS[nombre]()
+    run(pygame.display.set_mode((WIDTH, HEIGHT)), controlador=controlador)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""Pilotos automáticos para snake y corredor de partidas sin ventana.
+
+Uso: python snake_pilotos.py [bfs|hamilton ...] [--partidas N] [--procesos P]
+                             [--ancho W] [--alto H] [--semilla S]
+
+Un piloto es cualquier objeto con direccion(tablero, actual) -> "UP"/"DOWN"/
+"LEFT"/"RIGHT"; snake.jugar_partida() lo consulta en cada paso en lugar de
+leer las flechas (python snake.py --piloto hamilton). Sin argumentos corre
+todos los pilotos sobre snake_tablero, sin pygame, repartiendo las partidas
+en un pool de procesos, y muestra la distribución de puntajes y los pasos
+por segundo (sirve también para medir el costo de mover la serpiente
+cuando es muy larga).
+"""
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+from collections import deque
+
+import snake_tablero
+from snake_tablero import DIRECCIONES
+
+# Vecinos de cada celda por tamaño de tablero: vecinos[celda] = [(direccion, celda vecina), ...]
+_vecinos = {}
+# Ciclo hamiltoniano por tamaño de tablero: (orden de cada celda, celdas en orden) o None
+_ciclos = {}
+
+
+def vecinos(ancho, alto):
+    if (ancho, alto) not in _vecinos:
+        lista = []
+        for celda in range(ancho * alto):
+            fila, col = divmod(celda, ancho)
+            lista.append([(direccion, (fila + dy) * ancho + col + dx)
+                          for direccion, (dx, dy) in DIRECCIONES.items()
+                          if 0 <= col + dx < ancho and 0 <= fila + dy < alto])
+        _vecinos[(ancho, alto)] = lista
+    return _vecinos[(ancho, alto)]
+
+
+def _espacio(tablero, desde, bloqueada):
+    """Cantidad de celdas alcanzables desde `desde` sin pisar las marcadas en `bloqueada` (la modifica)"""
+    vec = vecinos(tablero.ancho, tablero.alto)
+    bloqueada[desde] = 1
+    pendientes = [desde]
+    total = 0
+    while pendientes:
+        celda = pendientes.pop()
+        total += 1
+        for _, otra in vec[celda]:
+            if not bloqueada[otra]:
+                bloqueada[otra] = 1
+                pendientes.append(otra)
+    return total
+
+
+def _bloqueadas(tablero):
+    """Copia de la ocupación donde la cola cuenta como libre (se corre en el próximo paso)"""
+    bloqueada = bytearray(tablero.ocupada)
+    if len(tablero.cuerpo) > 1:
+        bloqueada[tablero.cuerpo[-1]] = 0
+    return bloqueada
+
+
+def mas_espacio(tablero, actual):
+    """Dirección que deja más celdas alcanzables (para cuando no hay camino a la comida)"""
+    mejor, mejor_direccion = -1, actual
+    base = _bloqueadas(tablero)
+    for direccion, celda in vecinos(tablero.ancho, tablero.alto)[tablero.cuerpo[0]]:
+        if base[celda]:
+            continue
+        espacio = _espacio(tablero, celda, bytearray(base))
+        if espacio > mejor:
+            mejor, mejor_direccion = espacio, direccion
+    return mejor_direccion
+
+
+class CaminoMasCorto:
+    """Va a la comida por el camino más corto (BFS sobre las celdas libres).
+
+    Si la primera celda del camino deja menos lugar que el largo de la
+    serpiente, o no hay camino, elige la dirección con más espacio libre.
+    Ese control recorre todo el tablero, así que solo se hace cuando la
+    serpiente ya es tan larga como un lado del tablero y puede encerrarse.
+    """
+
+    def direccion(self, tablero, actual):
+        vec = vecinos(tablero.ancho, tablero.alto)
+        bloqueada = _bloqueadas(tablero)
+        comida = tablero.comida
+        # primera[celda] = dirección del primer paso del camino hasta esa celda
+        primera = {}
+        pendientes = deque()
+        for direccion, celda in vec[tablero.cuerpo[0]]:
+            if not bloqueada[celda]:
+                bloqueada[celda] = 1
+                primera[celda] = direccion
+                pendientes.append(celda)
+
+        encontrada = comida in primera
+        while pendientes and not encontrada:
+            celda = pendientes.popleft()
+            for _, otra in vec[celda]:
+                if not bloqueada[otra]:
+                    bloqueada[otra] = 1
+                    primera[otra] = primera[celda]
+                    if otra == comida:
+                        encontrada = True
+                        break
+                    pendientes.append(otra)
+
+        if encontrada:
+            direccion = primera[comida]
+            largo = len(tablero.cuerpo)
+            if largo < min(tablero.ancho, tablero.alto) or \
+                    _espacio(tablero, tablero.siguiente(direccion), _bloqueadas(tablero)) >= largo:
+                return direccion
+        return mas_espacio(tablero, actual)
+
+
+def ciclo_hamiltoniano(ancho, alto):
+    """(orden, ciclo): recorrido que pasa una vez por cada celda y vuelve al inicio.
+
+    Con alto par: la fila 0 de izquierda a derecha, después zigzag por las
+    columnas 1.. del resto de las filas y vuelta por la columna 0. Con alto
+    impar y ancho par se arma traspuesto. Si los dos son impares no existe
+    y devuelve None.
+    """
+    if (ancho, alto) in _ciclos:
+        return _ciclos[(ancho, alto)]
+
+    def por_filas(ancho, alto):
+        celdas = [(x, 0) for x in range(ancho)]
+        for y in range(1, alto):
+            xs = range(ancho - 1, 0, -1) if y % 2 else range(1, ancho)
+            celdas.extend((x, y) for x in xs)
+        celdas.extend((0, y) for y in range(alto - 1, 0, -1))
+        return celdas
+
+    resultado = None
+    if ancho >= 2 and alto >= 2:
+        if alto % 2 == 0:
+            celdas = por_filas(ancho, alto)
+        elif ancho % 2 == 0:
+            celdas = [(x, y) for y, x in por_filas(alto, ancho)]
+        else:
+            celdas = None
+        if celdas:
+            ciclo = [y * ancho + x for x, y in celdas]
+            orden = [0] * (ancho * alto)
+            for i, celda in enumerate(ciclo):
+                orden[celda] = i
+            resultado = (orden, ciclo)
+    _ciclos[(ancho, alto)] = resultado
+    return resultado
+
+
+class CicloHamiltoniano:
+    """Sigue un ciclo hamiltoniano, así que nunca choca y siempre termina llenando el tablero.
+
+    Mientras la serpiente ocupa menos de la mitad del tablero toma atajos:
+    salta hacia adelante en el ciclo (sin pasar la comida ni alcanzar la cola),
+    y como el cuerpo queda siempre entre la cola y la cabeza en el orden del
+    ciclo, el resto del recorrido hasta la cola sigue libre.
+    """
+
+    def __init__(self, atajos=True):
+        self.atajos = atajos
+        self._respaldo = CaminoMasCorto()
+
+    def direccion(self, tablero, actual):
+        ciclo = ciclo_hamiltoniano(tablero.ancho, tablero.alto)
+        if ciclo is None:
+            return self._respaldo.direccion(tablero, actual)
+        orden, recorrido = ciclo
+        total = len(recorrido)
+        cabeza = tablero.cuerpo[0]
+        desde = orden[cabeza]
+        siguiente = recorrido[(desde + 1) % total]
+
+        opciones = vecinos(tablero.ancho, tablero.alto)[cabeza]
+        elegida = next(d for d, celda in opciones if celda == siguiente)
+        if self.atajos and tablero.comida is not None and len(tablero.cuerpo) < total // 2:
+            hasta_cola = (orden[tablero.cuerpo[-1]] - desde) % total or total
+            hasta_comida = (orden[tablero.comida] - desde) % total
+            mejor = 1
+            for direccion, celda in opciones:
+                if tablero.ocupada[celda]:
+                    continue
+                salto = (orden[celda] - desde) % total
+                if mejor < salto <= hasta_comida and salto < hasta_cola:
+                    mejor, elegida = salto, direccion
+        return elegida
+
+
+PILOTOS = {
+    "bfs": CaminoMasCorto,
+    "hamilton": CicloHamiltoniano,
+}
+
+
+# ---------------------------------------------------------------------------
+# Partidas sin ventana
+# ---------------------------------------------------------------------------
+
+def jugar(piloto, ancho=40, alto=30, semilla=0, inicio=(5, 5), max_sin_comer=None):
+    """Juega una partida entera con `piloto` y devuelve {"puntaje", "pasos", "gano", "fin"}"""
+    tablero = snake_tablero.Tablero(ancho, alto, (min(inicio[0], ancho - 1), min(inicio[1], alto - 1)),
+                                    rng=random.Random(semilla))
+    # Un piloto que da vueltas sin llegar a la comida se corta (un ciclo completo alcanza siempre)
+    max_sin_comer = max_sin_comer or 2 * ancho * alto
+    direccion = "RIGHT"
+    pasos = sin_comer = 0
+    resultado = snake_tablero.MOVIO
+    while not tablero.terminado:
+        direccion = piloto.direccion(tablero, direccion)
+        resultado = tablero.avanzar(direccion)
+        pasos += 1
+        if resultado == snake_tablero.COMIO:
+            sin_comer = 0
+        else:
+            sin_comer += 1
+            if sin_comer > max_sin_comer:
+                resultado = "atascada"
+                break
+    return {"puntaje": tablero.puntaje, "pasos": pasos, "gano": tablero.gano, "fin": resultado}
+
+
+def _jugar_tarea(tarea):
+    nombre, ancho, alto, semilla = tarea
+    inicio = time.perf_counter()
+    partida = jugar(PILOTOS[nombre](), ancho, alto, semilla)
+    partida["segundos"] = time.perf_counter() - inicio
+    return nombre, partida
+
+
+def correr(nombres, partidas=1000, ancho=40, alto=30, semilla=0, procesos=None):
+    """Juega `partidas` partidas con cada piloto en un pool de procesos; devuelve un resumen por piloto"""
+    tareas = [(nombre, ancho, alto, semilla + i) for nombre in nombres for i in range(partidas)]
+    resultados = {nombre: [] for nombre in nombres}
+    inicio = time.perf_counter()
+    with multiprocessing.Pool(procesos) as pool:
+        for nombre, partida in pool.imap_unordered(_jugar_tarea, tareas, chunksize=8):
+            resultados[nombre].append(partida)
+    total_segundos = time.perf_counter() - inicio
+
+    resumen = []
+    for nombre in nombres:
+        lista = resultados[nombre]
+        puntajes = sorted(p["puntaje"] for p in lista)
+        pasos = sum(p["pasos"] for p in lista)
+        segundos = sum(p["segundos"] for p in lista)
+        deciles = statistics.quantiles(puntajes, n=10) if len(puntajes) > 1 else puntajes * 9
+        resumen.append({
+            "piloto": nombre,
+            "partidas": len(lista),
+            "ganadas": sum(1 for p in lista if p["gano"]),
+            "atascadas": sum(1 for p in lista if p["fin"] == "atascada"),
+            "promedio": statistics.fmean(puntajes),
+            "mediana": statistics.median(puntajes),
+            "p10": deciles[0],
+            "p90": deciles[-1],
+            "maximo": puntajes[-1],
+            "pasos": pasos,
+            # Pasos por segundo de un proceso (piloto + movimiento), sin contar el reparto del pool
+            "pasos_por_segundo": pasos / segundos if segundos else 0.0,
+            "puntajes": puntajes,
+        })
+    return resumen, total_segundos
+
+
+def imprimir(resumen, total_segundos, celdas):
+    print(f"{'piloto':<10}{'partidas':>9}{'ganadas':>8}{'atasc.':>7}{'prom':>8}{'mediana':>8}"
+          f"{'p10':>7}{'p90':>7}{'max':>6}{'pasos/s':>10}")
+    for r in resumen:
+        print(f"{r['piloto']:<10}{r['partidas']:>9}{r['ganadas']:>8}{r['atascadas']:>7}{r['promedio']:>8.1f}"
+              f"{r['mediana']:>8.1f}{r['p10']:>7.0f}{r['p90']:>7.0f}{r['maximo']:>6}{r['pasos_por_segundo']:>10.0f}")
+    # Histograma de puntajes en 10 franjas del tablero
+    for r in resumen:
+        print(f"\n{r['piloto']}: puntajes por franja (máximo posible {celdas - 1})")
+        franjas = [0] * 10
+        for puntaje in r["puntajes"]:
+            franjas[min(9, puntaje * 10 // celdas)] += 1
+        mayor = max(franjas) or 1
+        for i, cantidad in enumerate(franjas):
+            desde, hasta = i * celdas // 10, (i + 1) * celdas // 10 - 1
+            print(f"  {desde:>5}-{hasta:<5}{cantidad:>6} {'#' * round(40 * cantidad / mayor)}")
+    pasos = sum(r["pasos"] for r in resumen)
+    print(f"\n{pasos} pasos en {total_segundos:.1f} s ({pasos / total_segundos:.0f} pasos/s con todos los procesos)")
+
+
+def main(argumentos):
+    opciones = {"--partidas": 1000, "--procesos": None, "--ancho": 40, "--alto": 30, "--semilla": 0}
+    nombres = []
+    i = 0
+    while i < len(argumentos):
+        if argumentos[i] in opciones and i + 1 < len(argumentos):
+            opciones[argumentos[i]] = int(argumentos[i + 1])
+            i += 2
+        elif argumentos[i] in PILOTOS:
+            nombres.append(argumentos[i])
+            i += 1
+        else:
+            print(f"Argumento desconocido: {argumentos[i]} (pilotos: {', '.join(PILOTOS)})")
+            return 2
+    resumen, segundos = correr(nombres or list(PILOTOS), opciones["--partidas"], opciones["--ancho"],
+                               opciones["--alto"], opciones["--semilla"], opciones["--procesos"])
+    imprimir(resumen, segundos, opciones["--ancho"] * opciones["--alto"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
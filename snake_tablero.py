@@ -0,0 +1,118 @@
+"""Estado de una partida de snake sobre la grilla, sin nada de pygame.
+
+Las celdas se numeran fila * ancho + columna. La serpiente es un deque de
+celdas (cabeza a la izquierda), `ocupada` es un bytearray con un byte por
+celda y `libres` lista las celdas sin serpiente en cualquier orden, con
+`posicion[celda]` = su lugar en esa lista. Sacar una celda de `libres` es
+cambiarla por la última y hacer pop, así que mover, detectar choques y elegir
+dónde aparece la comida cuestan lo mismo con 3 segmentos que con 1000.
+"""
+import random
+from collections import deque
+
+# Desplazamiento (columna, fila) de cada dirección
+DIRECCIONES = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+OPUESTA = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+
+# Resultado de Tablero.avanzar()
+MOVIO = "movio"
+COMIO = "comio"
+CHOCO = "choco"
+GANO = "gano"
+
+
+class Tablero:
+    def __init__(self, ancho, alto, inicio=(0, 0), rng=random):
+        self.ancho = ancho
+        self.alto = alto
+        self.rng = rng
+        self.cuerpo = deque()
+        self.ocupada = bytearray(ancho * alto)
+        self.libres = list(range(ancho * alto))
+        self.posicion = list(range(ancho * alto))
+        self.puntaje = 0
+        self.terminado = False
+        self.gano = False
+        cabeza = self.indice(*inicio)
+        self._ocupar(cabeza)
+        self.cuerpo.append(cabeza)
+        self.comida = self.nueva_comida()
+
+    def indice(self, col, fila):
+        return fila * self.ancho + col
+
+    def celda(self, indice):
+        """(columna, fila) de la celda `indice`"""
+        fila, col = divmod(indice, self.ancho)
+        return col, fila
+
+    def cabeza(self):
+        return self.celda(self.cuerpo[0])
+
+    def celdas(self):
+        """(columna, fila) de cada segmento, de la cabeza a la cola"""
+        ancho = self.ancho
+        return [(i % ancho, i // ancho) for i in self.cuerpo]
+
+    def __len__(self):
+        return len(self.cuerpo)
+
+    def _ocupar(self, celda):
+        # Swap-remove: la última celda libre pasa al lugar de la que se ocupa
+        lugar = self.posicion[celda]
+        ultima = self.libres[-1]
+        self.libres[lugar] = ultima
+        self.posicion[ultima] = lugar
+        self.libres.pop()
+        self.posicion[celda] = -1
+        self.ocupada[celda] = 1
+
+    def _liberar(self, celda):
+        self.posicion[celda] = len(self.libres)
+        self.libres.append(celda)
+        self.ocupada[celda] = 0
+
+    def nueva_comida(self):
+        """Celda libre al azar para la comida (None si la serpiente llena el tablero)"""
+        if not self.libres:
+            return None
+        return self.libres[self.rng.randrange(len(self.libres))]
+
+    def siguiente(self, direccion):
+        """Celda a la que llegaría la cabeza yendo hacia `direccion` (None si sale del tablero)"""
+        dx, dy = DIRECCIONES[direccion]
+        fila, col = divmod(self.cuerpo[0], self.ancho)
+        col += dx
+        fila += dy
+        if 0 <= col < self.ancho and 0 <= fila < self.alto:
+            return fila * self.ancho + col
+        return None
+
+    def avanzar(self, direccion):
+        """Mueve la serpiente un paso y devuelve MOVIO, COMIO, CHOCO o GANO.
+
+        La cola se mueve antes de mirar el choque, así que se puede entrar a la
+        celda que deja la cola en este mismo paso.
+        """
+        nueva = self.siguiente(direccion)
+        if nueva is None:
+            self.terminado = True
+            return CHOCO
+
+        comio = nueva == self.comida
+        if not comio:
+            self._liberar(self.cuerpo.pop())
+        if self.ocupada[nueva]:
+            self.terminado = True
+            return CHOCO
+        self._ocupar(nueva)
+        self.cuerpo.appendleft(nueva)
+
+        if not comio:
+            return MOVIO
+        self.puntaje += 1
+        self.comida = self.nueva_comida()
+        if self.comida is None:
+            self.terminado = self.gano = True
+            return GANO
+        return COMIO
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+import pygame
+
+# Límite de memoria de las superficies de texto guardadas (bytes de píxeles)
+MAX_BYTES = 8 * 1024 * 1024
+
+# (nombre, tamaño, sysfont, negrita, cursiva) -> pygame.font.Font
+_fuentes = {}
+# (fuente, texto, color, antialias, fondo) -> superficie, en orden de uso (LRU)
+_textos = OrderedDict()
+_bytes = 0
+
+_stats = {"hits": 0, "misses": 0, "fuentes_creadas": 0, "descartados": 0}
+
+
+def fuente(tamaño, nombre=None, sysfont=False, negrita=False, cursiva=False):
+    """Devuelve una fuente del pool (se crea una sola vez por combinación).
+
+    Con sysfont=False equivale a pygame.font.Font(nombre, tamaño); con
+    sysfont=True, a pygame.font.SysFont(nombre, tamaño, negrita, cursiva).
+    """
+    clave = (nombre, tamaño, sysfont, negrita, cursiva)
+    if clave not in _fuentes:
+        if sysfont:
+            _fuentes[clave] = pygame.font.SysFont(nombre, tamaño, negrita, cursiva)
+        else:
+            _fuentes[clave] = pygame.font.Font(nombre, tamaño)
+            _fuentes[clave].set_bold(negrita)
+            _fuentes[clave].set_italic(cursiva)
+        _stats["fuentes_creadas"] += 1
+    return _fuentes[clave]
+
+
+def render(font, texto, color, antialias=True, fondo=None):
+    """Como font.render(), pero reutiliza la superficie si ya se dibujó el mismo texto.
+
+    Las superficies devueltas se comparten: no hay que modificarlas (usar
+    .copy() si se les va a cambiar el alpha o dibujar encima).
+    """
+    global _bytes
+    texto = str(texto)
+    clave = (font, texto, tuple(color), antialias, tuple(fondo) if fondo is not None else None)
+
+    superficie = _textos.get(clave)
+    if superficie is not None:
+        _textos.move_to_end(clave)
+        _stats["hits"] += 1
+        return superficie
+
+    _stats["misses"] += 1
+    if fondo is None:
+        superficie = font.render(texto, antialias, color)
+    else:
+        superficie = font.render(texto, antialias, color, fondo)
+    _textos[clave] = superficie
+    _bytes += _tamaño_en_bytes(superficie)
+
+    while _bytes > MAX_BYTES and len(_textos) > 1:
+        _, descartada = _textos.popitem(last=False)
+        _bytes -= _tamaño_en_bytes(descartada)
+        _stats["descartados"] += 1
+    return superficie
+
+
+def texto(texto, tamaño, color, nombre=None, antialias=True):
+    """Atajo para render(fuente(tamaño, nombre), texto, color)"""
+    return render(fuente(tamaño, nombre), texto, color, antialias)
+
+
+def _tamaño_en_bytes(superficie):
+    return superficie.get_pitch() * superficie.get_height()
+
+
+def estadisticas():
+    """Devuelve una copia de los contadores de la caché"""
+    datos = dict(_stats)
+    datos["fuentes"] = len(_fuentes)
+    datos["en_cache"] = len(_textos)
+    datos["bytes"] = _bytes
+    return datos
+
+
+def imprimir_estadisticas():
+    """Muestra por consola los aciertos y fallos de la caché de textos"""
+    datos = estadisticas()
+    print(f"Textos: {datos['hits']} hits, {datos['misses']} misses, {datos['en_cache']} en caché "
+          f"({datos['bytes'] // 1024} KB), {datos['fuentes']} fuentes, {datos['descartados']} descartados")
+
+
+def limpiar():
+    """Vacía la caché de textos (las fuentes del pool se conservan)"""
+    global _bytes
+    _textos.clear()
+    _bytes = 0